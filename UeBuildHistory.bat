@@ -0,0 +1,4 @@
+@echo off
+
+rem Build history of Unreal Engine project script
+python %~dp0\uet\build_history.py %cd% %*
@@ -0,0 +1,4 @@
+@echo off
+
+rem Crash report triage for Unreal Engine project/build script
+python %~dp0\uet\crash_triage.py %cd% %*
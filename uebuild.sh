@@ -5,4 +5,4 @@ BASEDIR=$(dirname "$0")
 #echo "$PWD"
 
 #Build Unreal Engine project script
-python3 "$BASEDIR/uet/build.py" "$PWD" "$@"
+python3 "$BASEDIR/uet/uet_client.py" build "$PWD" "$@"
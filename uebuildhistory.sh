@@ -0,0 +1,8 @@
+#!/bin/sh
+
+BASEDIR=$(dirname "$0")
+#echo "$BASEDIR"
+#echo "$PWD"
+
+#Build history of Unreal Engine project script
+python3 "$BASEDIR/uet/uet_client.py" build-history "$PWD" "$@"
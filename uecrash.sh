@@ -0,0 +1,8 @@
+#!/bin/sh
+
+BASEDIR=$(dirname "$0")
+#echo "$BASEDIR"
+#echo "$PWD"
+
+#Crash report triage for Unreal Engine project/build script
+python3 "$BASEDIR/uet/uet_client.py" crash "$PWD" "$@"
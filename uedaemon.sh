@@ -0,0 +1,8 @@
+#!/bin/sh
+
+BASEDIR=$(dirname "$0")
+#echo "$BASEDIR"
+#echo "$PWD"
+
+#Control uet daemon (start|stop|status|serve) script, other scripts use it when it is running
+python3 "$BASEDIR/uet/uet_daemon.py" "$@"
@@ -5,4 +5,4 @@ BASEDIR=$(dirname "$0")
 #echo "$PWD"
 
 #Info about Unreal Engine installations in system
-python3 "$BASEDIR/uet/info.py" "$PWD" "$@"
+python3 "$BASEDIR/uet/uet_client.py" info "$PWD" "$@"
@@ -5,4 +5,4 @@ BASEDIR=$(dirname "$0")
 #echo "$PWD"
 
 #Get status of Unreal Engine project/build script
-python3 "$BASEDIR/uet/status.py" "$PWD" "$@"
+python3 "$BASEDIR/uet/uet_client.py" status "$PWD" "$@"
@@ -1,14 +1,21 @@
-import re
 import os
 import sys
-from time import gmtime, strftime
-import subprocess as sp
+import signal
+import threading
 from argparse import ArgumentParser
 import logging
 import common as cm
 import ue
 from ue import platform as ue_pfm
 from build_config import BuildConfig
+import build_matrix as bm
+import build_runner
+import build_fingerprint as bf
+import build_cache as bc
+import build_history as bh
+import build_progress as bp
+import build_scheduler as bs
+import build_plan as bpl
 
 DEFAULT_TARGET = "Editor"
 DEFAULT_CONFIG = "Development"
@@ -18,17 +25,27 @@ DISABLE_UNITY_BUILD_ARG = "-DisableUnity"
 NO_PCH_ARG = "-NoPCH"
 NO_SHARED_PCH_ARG = "-NoSharedPCH"
 
+# CI stops jobs with these, UBT runs in its own session and would outlive the script without handling them
+CANCEL_SIGNALS = [getattr(signal, name) for name in ("SIGTERM", "SIGHUP") if hasattr(signal, name)]
+
+BUILD_LOGS_DIR = "UetBuild"
+BATCH_LOG_NAME = "Batch"
+
 class BuildError(Exception):
     """Custom exception for build-related errors"""
     pass
 
+def is_all_arg(argValue):
+    values = [argValue] if isinstance(argValue, str) else argValue
+    return isinstance(values, list) and len(values) == 1 and values[0].lower() == "all"
+
 def get_real_arg_values_list(argValue, allValue, dbgDescription):
     """Convert argument value to list with validation"""
     valuesList = None
     
     if isinstance(argValue, (list, str)):
         values = [argValue] if isinstance(argValue, str) else argValue
-        if len(values) == 1 and values[0].lower() == "all":
+        if is_all_arg(values):
             valuesList = allValue
         else:
             valuesList = values
@@ -44,16 +61,47 @@ def get_real_arg_values_list(argValue, allValue, dbgDescription):
 class ProjectBuilder:
     def __init__(self):
         self.config = None
+        self.enginePath = None
+        self.fingerprints = None
+        self.sourceDigest = None
+        self.fingerprintLock = threading.Lock()
+        self.artifactCache = None
+        self.buildHistory = None
+        self.cancelEvent = threading.Event()
+        self.scheduler = None
+        # Fingerprints and cache keys of cells a batch left to be built one by one, so they are not checked again
+        self.checkedCells = {}
 
     def run(self):
+        """Run build, return process exit code"""
         self.config = self.process_args()
         if not self.config:
-            return
+            return 0
             
         initResult = self.init(self.config.source_path)
         if initResult:
             buildFilePath, projectFilePath = initResult
-            self.run_build(buildFilePath, projectFilePath)
+            previousHandlers = self.install_signal_handlers()
+            try:
+                results = self.run_build(buildFilePath, projectFilePath)
+            finally:
+                for signum, handler in previousHandlers.items():
+                    signal.signal(signum, handler)
+            if results and bm.has_failed_cells(results):
+                return 1
+        return 0
+
+    def install_signal_handlers(self):
+        """Cancel the build on termination signals, return previous handlers"""
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        return {signum: signal.signal(signum, self.cancel_on_signal) for signum in CANCEL_SIGNALS}
+
+    def cancel_on_signal(self, signum, frame):
+        logging.warning(f"Received {signal.Signals(signum).name}, stopping the build")
+        self.cancelEvent.set()
+        # Killing takes locks the interrupted thread may hold
+        threading.Thread(target=build_runner.cancel_running_processes, daemon=True).start()
 
     def process_args(self):
         parser = ArgumentParser()
@@ -79,6 +127,39 @@ class ProjectBuilder:
         parser.add_argument("-i", "--noprecompiledheaders",
                             action="store_true", dest="noPrecompiledHeaders", default=False,
                             help="not use precompiled headers")
+        parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=1,
+                            help="number of platform/configuration/target combinations built in parallel",
+                            metavar="JOBS")
+        parser.add_argument("-f", "--force",
+                            action="store_true", dest="force", default=False,
+                            help="run UBT even for combinations whose inputs did not change since the last successful build")
+        parser.add_argument("--cache",
+                            action="store_true", dest="cache", default=False,
+                            help="restore binaries from the local artifact cache when possible, store built binaries in it")
+        parser.add_argument("--cache-dir", dest="cacheDir",
+                            help=f"artifact cache directory, default is ${bc.CACHE_DIR_ENV} or {bc.DEFAULT_CACHE_DIR}",
+                            metavar="CACHE_DIR")
+        parser.add_argument("--cache-size", dest="cacheSize", type=float, default=bc.DEFAULT_CACHE_SIZE_GB,
+                            help="artifact cache size budget in GB, least recently used entries are evicted",
+                            metavar="GB")
+        parser.add_argument("--cache-hardlinks",
+                            action="store_true", dest="cacheHardlinks", default=False,
+                            help="restore cached binaries as hardlinks when reflinks are not supported")
+        parser.add_argument("--fail-fast",
+                            action="store_true", dest="failFast", default=False,
+                            help="stop running builds and skip remaining combinations as soon as one fails")
+        parser.add_argument("--timeout-no-output", dest="noOutputTimeout", type=float,
+                            help="kill the build when UBT prints nothing for this number of seconds",
+                            metavar="SECONDS")
+        parser.add_argument("--no-scheduler",
+                            action="store_false", dest="scheduler", default=True,
+                            help="do not limit parallel builds and UBT actions by free cores and memory, only used with --jobs above 1")
+        parser.add_argument("--no-batch-targets",
+                            action="store_false", dest="batchTargets", default=True,
+                            help="run UBT separately for every combination instead of one run per platform")
+        parser.add_argument("--plan",
+                            action="store_true", dest="plan", default=False,
+                            help="only show combinations which would be built in build order with estimated durations")
 
         parsedArgs = parser.parse_args()
         self.onlyDebug = cm.process_parsed_args(parsedArgs)
@@ -97,6 +178,7 @@ class ProjectBuilder:
                 enginePath = ue.project.get_engine_root_path(projectFilePath)
                 logging.debug(f"EnginePath: {enginePath}")
                 if enginePath and os.path.isdir(enginePath):
+                    self.enginePath = enginePath
                     buildFilePath = os.path.normpath(os.path.join(enginePath, ue.path.get_relative_build_file_path()))
                     logging.debug(f"BuildFilePath: {buildFilePath}")
                     if buildFilePath and os.path.isfile(buildFilePath):
@@ -131,59 +213,281 @@ class ProjectBuilder:
         logging.info(f"Build configurations: {configurations}")
         logging.info(f"Build targets: {targets}\n")
 
-        for platform in platforms:
-            logging.info(f"\n{'#'*35} Building {platform} platform {'#'*35}\n")
-            for config in configurations:
-                for target in targets:
-                    self.run_single_build(buildFilePath, projectFilePath, projectName, config, target, platform)
+        def build_cell(cell):
+            return self.run_single_build(buildFilePath, projectFilePath, projectName, cell.config, cell.target, cell.platform)
+
+        def build_batch(cells):
+            return self.run_batch_build(buildFilePath, projectFilePath, projectName, cells)
+
+        plan = self.create_build_plan(projectFilePath, bm.create_build_cells(platforms, configurations, targets))
+        if self.config.plan:
+            bpl.log_plan(plan, self.config.jobs, self.config.batch_targets)
+            return []
+        bpl.log_pruned(plan)
+        cells = plan.get_cells()
+        if not cells:
+            logging.warning("No buildable combinations of platform, configuration and target")
+            return []
+
+        # Single build runs alone, UBT picks its parallel actions itself
+        if self.config.use_scheduler and self.config.jobs > 1 and not self.config.debug_only:
+            unitCount = len(bm.group_cells_by_platform(cells)) if self.config.batch_targets else len(cells)
+            self.scheduler = bs.ResourceScheduler(self.config.jobs, unitCount=unitCount)
+        executor = bm.BuildMatrixExecutor(build_cell, self.config.jobs, self.config.fail_fast, self.cancelEvent,
+                                          build_batch if self.config.batch_targets else None)
+        results = executor.run(cells)
+        bm.log_summary(results)
+        return results
+
+    def create_build_plan(self, projectFilePath, cells):
+        projectTargets = ue.project.get_build_targets(os.path.dirname(projectFilePath))
+        # Host support is a guess as toolchains vary, so only platforms expanded from 'all' are checked
+        hostPlatforms = None
+        if is_all_arg(self.config.platform):
+            hostInterface = ue_pfm.get_current_platform_interface()
+            hostPlatforms = hostInterface.get_supported_build_platforms() if hostInterface else None
+        return bpl.create_build_plan(cells, self.get_cell_estimates(projectFilePath), projectTargets, hostPlatforms)
+
+    def get_cell_estimates(self, projectFilePath):
+        """Typical build duration of every cell with successful builds in history"""
+        try:
+            return bpl.get_cell_estimates(self.get_build_history(projectFilePath).read())
+        except OSError as e:
+            logging.debug(f"Unable to read build history: {e}")
+            return {}
 
     def run_single_build(self, buildFilePath, projectFilePath, projectName, config, target, platform):
-        logging.info(f"\n{'='*35} Building {platform}_{config}_{target.capitalize()} {'='*35}\n")
+        cell = bm.BuildCell(platform, config, target)
+        cellName = cell.get_name()
+        logging.info(f"\n{'='*35} Building {cellName} {'='*35}\n")
         buildTarget = self.get_target_arg(projectName, target)
 
-        command = [buildFilePath, buildTarget, platform, config, projectFilePath]
+        command = [buildFilePath, buildTarget, platform, config, projectFilePath] + self.get_common_build_args()
 
-        if self.config.definitions:
-            command.append(f"-define:{' '.join(self.config.definitions)}")
+        logging.info(f"Running command: {command}")
+        
+        if not self.config.debug_only:
+            if cellName in self.checkedCells:
+                fingerprint, cacheKey = self.checkedCells.pop(cellName)
+            else:
+                status, fingerprint, cacheKey = self.check_cell(projectFilePath, projectName, cell)
+                if status:
+                    return status
 
-        if self.config.non_unity:
-            command.append(DISABLE_UNITY_BUILD_ARG)
+            self.run_ubt(command, projectFilePath, cell, cellName)
+            self.finish_built_cell(projectFilePath, cell, fingerprint, cacheKey)
 
-        if self.config.no_precompiled_headers:
-            command.append(NO_SHARED_PCH_ARG)
-            command.append(NO_PCH_ARG)
+    def run_batch_build(self, buildFilePath, projectFilePath, projectName, cells):
+        """Build cells of one platform by one UBT run with a `-Target` for each of them.
+
+        Return status of every cell, None for cells which should be built separately. When the batch fails, UBT does
+        not tell which targets failed, so all its cells are built separately, incremental build skips finished work.
+        """
+        statuses = [None] * len(cells)
+        pending = []
+        for index, cell in enumerate(cells):
+            if self.config.debug_only:
+                pending.append((index, cell, None, None))
+                continue
+            status, fingerprint, cacheKey = self.check_cell(projectFilePath, projectName, cell)
+            if status:
+                statuses[index] = status
+            else:
+                pending.append((index, cell, fingerprint, cacheKey))
+        for _, cell, fingerprint, cacheKey in pending:
+            self.checkedCells[cell.get_name()] = (fingerprint, cacheKey)
+        if len(pending) < 2:
+            return statuses
 
+        batch = bm.BuildBatch([cell for _, cell, _, _ in pending])
+        logging.info(f"\n{'='*35} Building {batch.get_name()} {'='*35}\n")
+        command = [buildFilePath]
+        command += [self.get_target_spec(projectName, projectFilePath, cell) for cell in batch.cells]
+        command += self.get_common_build_args()
         logging.info(f"Running command: {command}")
-        
+
         if not self.config.debug_only:
             try:
-                process = sp.Popen(command, stdout=sp.PIPE, stderr=sp.PIPE)
-                stdout, stderr = process.communicate()
-                
-                if process.returncode != 0:
-                    raise BuildError(f"Build failed with code {process.returncode}\n{stderr.decode()}")
-                    
-                if stdout:
-                    logging.info(stdout.decode())
-                if stderr:
-                    logging.error(stderr.decode())
-                    
-            except Exception as e:
-                raise BuildError(f"Build process failed: {e}")
+                self.run_ubt(command, projectFilePath, batch, f"{batch.platform}_{BATCH_LOG_NAME}")
+            except bm.CellCancelled:
+                for index, _, _, _ in pending:
+                    statuses[index] = bm.CellStatus.CANCELLED
+                return statuses
+            except BuildError as e:
+                logging.warning(f"Batch build of {batch.get_name()} failed, building its cells one by one: {e}")
+                return statuses
+
+        for index, cell, fingerprint, cacheKey in pending:
+            self.checkedCells.pop(cell.get_name(), None)
+            if not self.config.debug_only:
+                self.finish_built_cell(projectFilePath, cell, fingerprint, cacheKey)
+            statuses[index] = bm.CellStatus.SUCCEEDED
+        return statuses
+
+    def check_cell(self, projectFilePath, projectName, cell):
+        """Return (status, fingerprint, cache key), status is set when the cell does not need UBT run"""
+        cellName = cell.get_name()
+        fingerprint = self.get_cell_fingerprint(projectFilePath, cell)
+        if fingerprint and not self.config.force and self.fingerprints.is_up_to_date(cell, fingerprint):
+            logging.info(f"Inputs of {cellName} did not change since the last successful build, skipping")
+            return bm.CellStatus.UP_TO_DATE, fingerprint, None
+
+        cacheKey = None
+        if fingerprint and self.config.use_cache:
+            cacheKey = bc.compute_cache_key(projectName, fingerprint)
+            if self.restore_from_cache(cacheKey, projectFilePath, cell):
+                self.fingerprints.record(cell, fingerprint)
+                return bm.CellStatus.RESTORED, fingerprint, cacheKey
+        return None, fingerprint, cacheKey
+
+    def run_ubt(self, command, projectFilePath, unit, logName):
+        """Run UBT for a cell or a batch of cells, raise on failure"""
+        logFilePath = self.get_build_log_path(projectFilePath, logName)
+        logging.info(f"Build log: {logFilePath}")
+        linePrefix = f"[{logName}] " if self.config.jobs > 1 else ""
+        progress = bp.ProgressTracker(self.get_expected_duration(projectFilePath, unit))
+        reservation = self.acquire_resources(projectFilePath, unit)
+        if reservation:
+            command = command + [bs.get_max_parallel_actions_arg(reservation.actions)]
+        try:
+            result = build_runner.run_streamed(command, logFilePath, linePrefix, progress.on_line,
+                                               self.cancelEvent, self.config.no_output_timeout)
+        except Exception as e:
+            raise BuildError(f"Build process failed: {e}")
+        finally:
+            if reservation:
+                self.scheduler.release(reservation)
+
+        if result.cancelled:
+            raise bm.CellCancelled(f"Build was stopped, see {logFilePath}")
+
+        self.record_history(projectFilePath, unit, result, progress.total or None, reservation.actions if reservation else None)
+        progress.log_report()
+
+        if result.timed_out:
+            raise BuildError(f"Build printed nothing for {self.config.no_output_timeout:g}s and was killed, see {logFilePath}")
+
+        if result.returncode != 0:
+            errorTail = '\n'.join(result.error_tail)
+            raise BuildError(f"Build failed with code {result.returncode}, see {logFilePath}\n{errorTail}")
+
+    def finish_built_cell(self, projectFilePath, cell, fingerprint, cacheKey):
+        if fingerprint:
+            self.fingerprints.record(cell, fingerprint)
+
+        if cacheKey:
+            try:
+                self.get_artifact_cache().store(cacheKey, os.path.dirname(projectFilePath),
+                                               self.get_cell_build_name(projectFilePath, cell), cell.platform, cell.config)
+            except OSError as e:
+                logging.warning(f"Unable to store binaries of {cell.get_name()} in cache: {e}")
+
+    def get_common_build_args(self):
+        """UBT arguments applied to every target of the run"""
+        args = []
+        if self.config.definitions:
+            args.append(f"-define:{' '.join(self.config.definitions)}")
+
+        if self.config.non_unity:
+            args.append(DISABLE_UNITY_BUILD_ARG)
+
+        if self.config.no_precompiled_headers:
+            args.append(NO_SHARED_PCH_ARG)
+            args.append(NO_PCH_ARG)
+        return args
+
+    def get_build_history(self, projectFilePath):
+        with self.fingerprintLock:
+            if self.buildHistory is None:
+                self.buildHistory = bh.BuildHistory(os.path.dirname(projectFilePath))
+            return self.buildHistory
+
+    def get_expected_duration(self, projectFilePath, unit):
+        """Expected duration of a cell or a batch, sum of its cells, None when some of them was never built"""
+        try:
+            history = self.get_build_history(projectFilePath)
+            durations = [bp.get_expected_duration(history.get_cell_records(cell.get_name())) for cell in bm.get_unit_cells(unit)]
+        except OSError as e:
+            logging.debug(f"Unable to read build history: {e}")
+            return None
+        return None if None in durations else sum(durations)
+
+    def acquire_resources(self, projectFilePath, unit):
+        """Wait for cores and memory for a cell or a batch, None if builds are not scheduled"""
+        if not self.scheduler:
+            return None
+        memoryPerAction = None
+        try:
+            history = self.get_build_history(projectFilePath)
+            estimates = [bs.estimate_memory_per_action(history.get_cell_records(cell.get_name())) for cell in bm.get_unit_cells(unit)]
+            # Actions of the batch may come from any of its cells
+            memoryPerAction = max((estimate for estimate in estimates if estimate is not None), default=None)
+        except OSError as e:
+            logging.debug(f"Unable to read build history: {e}")
+        return self.scheduler.acquire(unit.get_name(), memoryPerAction, self.cancelEvent)
+
+    def record_history(self, projectFilePath, unit, result, actionCount, parallelActions=None):
+        try:
+            history = self.get_build_history(projectFilePath)
+            for record in bh.create_records(unit, result, self.config, actionCount, parallelActions):
+                history.append(record)
+        except OSError as e:
+            logging.warning(f"Unable to record build history of {unit.get_name()}: {e}")
+
+    def restore_from_cache(self, cacheKey, projectFilePath, cell):
+        cellName = cell.get_name()
+        try:
+            if self.get_artifact_cache().restore(cacheKey, os.path.dirname(projectFilePath),
+                                                 self.get_cell_build_name(projectFilePath, cell), cell.platform, cell.config):
+                logging.info(f"Binaries of {cellName} restored from cache")
+                return True
+        except OSError as e:
+            logging.warning(f"Unable to restore binaries of {cellName} from cache, building: {e}")
+        return False
+
+    def get_cell_build_name(self, projectFilePath, cell):
+        """Name of the cell target files, like `GameEditor`"""
+        return ue.project.create_build_name(ue.path.get_project_name_from_project_file_path(projectFilePath), cell.target)
+
+    def get_artifact_cache(self):
+        with self.fingerprintLock:
+            if self.artifactCache is None:
+                self.artifactCache = bc.ArtifactCache(self.config.cache_dir, self.config.cache_size_gb, self.config.cache_hardlinks)
+            return self.artifactCache
+
+    def get_cell_fingerprint(self, projectFilePath, cell):
+        """Fingerprint of the cell inputs, source files are hashed only once per run"""
+        try:
+            with self.fingerprintLock:
+                if self.sourceDigest is None:
+                    projectPath = os.path.dirname(projectFilePath)
+                    self.fingerprints = bf.BuildFingerprints(projectPath)
+                    self.sourceDigest = bf.compute_source_digest(projectPath)
+            return bf.compute_cell_fingerprint(self.sourceDigest, self.enginePath, cell, self.config)
+        except Exception as e:
+            logging.warning(f"Unable to compute inputs fingerprint for {cell.get_name()}: {e}")
+
+    def get_build_log_path(self, projectFilePath, cellName):
+        logsPath = ue.path.project.get_logs_path(os.path.dirname(projectFilePath))
+        return os.path.join(logsPath, BUILD_LOGS_DIR, cellName + cm.LogExtension)
 
     def get_target_arg(self, projectName, target):
         targetArg = ue.project.create_build_name(projectName, target)
         logging.debug("Target arg: " + str(targetArg))
         return targetArg
 
+    def get_target_spec(self, projectName, projectFilePath, cell):
+        """UBT `-Target` argument describing the cell, one run builds all targets given this way"""
+        return f'-Target={self.get_target_arg(projectName, cell.target)} {cell.platform} {cell.config} -Project="{projectFilePath}"'
+
 def main():
     print("Build Unreal Engine project")
     builder = ProjectBuilder()
-    builder.run()
+    return builder.run()
 
 if __name__ == '__main__':
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt:
         print('Interrupted by user')
         try:
@@ -0,0 +1,244 @@
+import os
+import re
+import sys
+import time
+import shutil
+import hashlib
+import logging
+import threading
+import ue
+import build_fingerprint as bf
+
+CACHE_DIR_ENV = "UET_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uet", "artifacts")
+DEFAULT_CACHE_SIZE_GB = 20
+OBJECTS_DIR = "objects"
+ENTRIES_DIR = "entries"
+ENTRY_EXTENSION = ".json"
+ARTIFACT_HASHES_FILE_NAME = "ArtifactHashes.json"
+BINARIES_DIR = "Binaries"
+RECEIPT_EXTENSION = ".target"
+PROJECT_DIR_VARIABLE = "$(ProjectDir)"
+DEVELOPMENT_CONFIG = "Development"
+# Configurations UBT adds to names of target files as `-<Platform>-<Config>`, Development has no suffix
+SUFFIXED_CONFIGS = ["Debug", "DebugGame", "Test", "Shipping"]
+# Editor module files are named after the engine executable, like `UnrealEditor-Game.dll`
+EDITOR_FILE_NAMES = ["UnrealEditor", "UE4Editor"]
+# Linux ioctl cloning file extents, see linux/fs.h
+FICLONE = 0x40049409
+
+def get_default_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+def compute_cache_key(projectName, cellFingerprint):
+    """Key of cell artifacts, the cell fingerprint already covers target, platform, config, flags and sources"""
+    return hashlib.sha256(f"{projectName}\n{cellFingerprint}".encode('utf-8')).hexdigest()
+
+def get_receipt_path(projectPath, buildName, platform, config):
+    """UBT target receipt listing build products of the target"""
+    fileName = buildName if config == DEVELOPMENT_CONFIG else f"{buildName}-{platform}-{config}"
+    return os.path.join(projectPath, BINARIES_DIR, platform, fileName + RECEIPT_EXTENSION)
+
+def is_target_file(fileName, buildName, platform, config):
+    """File name of the target or its editor modules with suffix of the configuration"""
+    stem = fileName.split('.', 1)[0]
+    if stem.startswith("lib"):
+        stem = stem[3:]
+    names = [buildName] + (EDITOR_FILE_NAMES if buildName.endswith("Editor") else [])
+    if not any(stem == name or stem.startswith(name + '-') for name in names):
+        return False
+    if config == DEVELOPMENT_CONFIG:
+        return not re.search(f"-{re.escape(platform)}-(?:{'|'.join(SUFFIXED_CONFIGS)})$", stem)
+    return stem.endswith(f"-{platform}-{config}")
+
+def get_receipt_files(projectPath, receiptPath):
+    """Relative paths of the receipt and its existing project build products, None without readable receipt"""
+    receipt = bf.read_json(receiptPath, None)
+    if not isinstance(receipt, dict):
+        return None
+    artifactFiles = [os.path.relpath(receiptPath, projectPath)]
+    for product in receipt.get('BuildProducts', []):
+        productPath = product.get('Path', '')
+        # Engine products are not outputs of the project
+        if productPath.startswith(PROJECT_DIR_VARIABLE):
+            relPath = os.path.normpath(productPath[len(PROJECT_DIR_VARIABLE):].lstrip('/\\'))
+            if os.path.isfile(os.path.join(projectPath, relPath)):
+                artifactFiles.append(relPath)
+    return artifactFiles
+
+def get_artifact_files(projectPath, buildName, platform, config):
+    """Relative paths of the target outputs, taken from its UBT receipt.
+
+    Without the receipt, files of project and project plugins `Binaries/<Platform>` directories named after the target
+    with the configuration suffix.
+    """
+    receiptFiles = get_receipt_files(projectPath, get_receipt_path(projectPath, buildName, platform, config))
+    if receiptFiles is not None:
+        return receiptFiles
+
+    artifactDirs = [os.path.join(projectPath, BINARIES_DIR, platform)]
+    pluginsPath = os.path.join(projectPath, ue.path.project.PLUGINS_DIR)
+    for dirPath, dirNames, fileNames in os.walk(pluginsPath):
+        if BINARIES_DIR in dirNames:
+            artifactDirs.append(os.path.join(dirPath, BINARIES_DIR, platform))
+        dirNames[:] = [dn for dn in dirNames if dn not in bf.SKIPPED_PLUGIN_DIRS]
+
+    artifactFiles = []
+    for artifactDir in artifactDirs:
+        for dirPath, dirNames, fileNames in os.walk(artifactDir):
+            artifactFiles.extend(os.path.relpath(os.path.join(dirPath, fn), projectPath)
+                                 for fn in fileNames if is_target_file(fn, buildName, platform, config))
+    return artifactFiles
+
+def clone_file(srcPath, dstPath):
+    """Copy-on-write copy of the file, raises OSError when the file system does not support it"""
+    if not sys.platform.startswith('linux'):
+        raise OSError("Reflinks are supported only on Linux")
+    import fcntl
+    with open(srcPath, 'rb') as src, open(dstPath, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+class ArtifactCache:
+    """Local content-addressed cache of build outputs.
+
+    Every file is stored once in `objects` under its content hash, `entries` keep manifests mapping cache keys to
+    the files. Least recently used entries are evicted when objects exceed the size budget.
+    """
+
+    def __init__(self, cacheDir=None, maxSizeGb=DEFAULT_CACHE_SIZE_GB, useHardlinks=False):
+        self.cacheDir = cacheDir or get_default_cache_dir()
+        self.maxSize = int(maxSizeGb * 1024 ** 3)
+        self.useHardlinks = useHardlinks
+        self.lock = threading.Lock()
+
+    def get_object_path(self, fileHash):
+        return os.path.join(self.cacheDir, OBJECTS_DIR, fileHash[:2], fileHash)
+
+    def get_entry_path(self, key):
+        return os.path.join(self.cacheDir, ENTRIES_DIR, key + ENTRY_EXTENSION)
+
+    def store(self, key, projectPath, buildName, platform, config):
+        """Store outputs of the target, unchanged files are not even rehashed"""
+        artifactFiles = get_artifact_files(projectPath, buildName, platform, config)
+        files = []
+        # Cells stored in parallel share the hashes file, it is read and written only under the lock
+        with self.lock:
+            hashCache = bf.FileHashCache(projectPath, ARTIFACT_HASHES_FILE_NAME)
+            for relPath in artifactFiles:
+                fullPath = os.path.join(projectPath, relPath)
+                fileHash = hashCache.get_hash(relPath)
+                fileStat = os.stat(fullPath)
+                self.store_object(fullPath, fileHash, fileStat)
+                files.append([relPath.replace(os.sep, '/'), fileHash, fileStat.st_mode & 0o777, fileStat.st_mtime_ns])
+
+            entry = {'files': files, 'last_used': time.time()}
+            bf.write_json(self.get_entry_path(key), entry)
+            self.evict()
+
+            # Hashes of other targets outputs are kept while the files exist
+            hashCache.prune({relPath for relPath in hashCache.entries if os.path.isfile(os.path.join(projectPath, relPath))})
+            hashCache.save()
+        logging.info(f"Stored {len(files)} artifact files in cache {self.cacheDir}")
+
+    def store_object(self, filePath, fileHash, fileStat):
+        objectPath = self.get_object_path(fileHash)
+        if os.path.isfile(objectPath):
+            return
+        os.makedirs(os.path.dirname(objectPath), exist_ok=True)
+        tmpObjectPath = f"{objectPath}.{os.getpid()}.tmp"
+        shutil.copyfile(filePath, tmpObjectPath)
+        # Objects are read-only, so hardlinked restores can not modify them in place
+        os.chmod(tmpObjectPath, fileStat.st_mode & 0o555)
+        # Object keeps mtime of the first stored file, restores of files with this mtime may be hardlinks to it
+        os.utime(tmpObjectPath, ns=(fileStat.st_mtime_ns, fileStat.st_mtime_ns))
+        os.replace(tmpObjectPath, objectPath)
+
+    def restore(self, key, projectPath, buildName, platform, config):
+        """Restore outputs of the target stored under the key, return False when the key is unknown or objects are lost.
+
+        Outputs in the current receipt of the target which are not in the cache entry are removed, so no stale files
+        stay next to them. Files are never removed only because of their names, they may belong to other targets.
+        """
+        entryPath = self.get_entry_path(key)
+        with self.lock:
+            entry = bf.read_json(entryPath, None)
+            if not entry:
+                return False
+            if not all(os.path.isfile(self.get_object_path(fileHash)) for _, fileHash, _, _ in entry['files']):
+                logging.warning(f"Cache entry {key} is incomplete, removing it")
+                os.remove(entryPath)
+                return False
+
+            entryFiles = {os.path.normpath(relPath) for relPath, _, _, _ in entry['files']}
+            receiptFiles = get_receipt_files(projectPath, get_receipt_path(projectPath, buildName, platform, config)) or []
+            for relPath in receiptFiles:
+                if relPath not in entryFiles:
+                    logging.debug(f"Removing stale artifact {relPath}")
+                    os.remove(os.path.join(projectPath, relPath))
+
+            for relPath, fileHash, mode, mtimeNs in entry['files']:
+                self.restore_file(self.get_object_path(fileHash), os.path.join(projectPath, relPath), mode, mtimeNs)
+
+            entry['last_used'] = time.time()
+            bf.write_json(entryPath, entry)
+
+        logging.info(f"Restored {len(entry['files'])} artifact files from cache {self.cacheDir}")
+        return True
+
+    def restore_file(self, objectPath, filePath, mode, mtimeNs):
+        os.makedirs(os.path.dirname(filePath), exist_ok=True)
+        if os.path.lexists(filePath):
+            os.remove(filePath)
+
+        try:
+            clone_file(objectPath, filePath)
+        except OSError:
+            if os.path.exists(filePath):
+                os.remove(filePath)
+            objectStat = os.stat(objectPath)
+            # Hardlink shares mtime of the object, which UBT checks, so it is used only when the recorded one is the same
+            if self.useHardlinks and (objectStat.st_mode & 0o111) == (mode & 0o111) and objectStat.st_mtime_ns == mtimeNs:
+                try:
+                    os.link(objectPath, filePath)
+                    return
+                except OSError:
+                    pass
+            shutil.copyfile(objectPath, filePath)
+
+        os.chmod(filePath, mode)
+        os.utime(filePath, ns=(mtimeNs, mtimeNs))
+
+    def evict(self):
+        """Remove least recently used entries until referenced objects fit the size budget, then unreferenced objects"""
+        entriesPath = os.path.join(self.cacheDir, ENTRIES_DIR)
+        entries = []
+        for fileName in os.listdir(entriesPath):
+            if fileName.endswith(ENTRY_EXTENSION):
+                entryPath = os.path.join(entriesPath, fileName)
+                entry = bf.read_json(entryPath, None)
+                if entry:
+                    entries.append((entry['last_used'], entryPath, {fileHash for _, fileHash, _, _ in entry['files']}))
+        entries.sort()
+
+        objectSizes = {}
+        objectsPath = os.path.join(self.cacheDir, OBJECTS_DIR)
+        for dirPath, dirNames, fileNames in os.walk(objectsPath):
+            for fileName in fileNames:
+                if fileName.endswith(".tmp"):
+                    continue
+                objectSizes[fileName] = os.path.getsize(os.path.join(dirPath, fileName))
+
+        referencedHashes = set().union(*(hashes for _, _, hashes in entries))
+        totalSize = sum(objectSizes.get(fileHash, 0) for fileHash in referencedHashes)
+        # The most recent entry is never evicted, even if it is alone over the budget
+        while totalSize > self.maxSize and len(entries) > 1:
+            _, entryPath, _ = entries.pop(0)
+            logging.info(f"Evicting cache entry {os.path.basename(entryPath)}")
+            os.remove(entryPath)
+            referencedHashes = set().union(*(hashes for _, _, hashes in entries))
+            totalSize = sum(objectSizes.get(fileHash, 0) for fileHash in referencedHashes)
+
+        for fileHash in objectSizes.keys() - referencedHashes:
+            objectPath = self.get_object_path(fileHash)
+            if os.path.isfile(objectPath):
+                os.remove(objectPath)
@@ -12,6 +12,17 @@ class BuildConfig:
     non_unity: bool = False
     no_precompiled_headers: bool = False
     debug_only: bool = False
+    jobs: int = 1
+    force: bool = False
+    use_cache: bool = False
+    cache_dir: Optional[str] = None
+    cache_size_gb: float = 20
+    cache_hardlinks: bool = False
+    fail_fast: bool = False
+    no_output_timeout: Optional[float] = None
+    use_scheduler: bool = True
+    batch_targets: bool = True
+    plan: bool = False
     
     @classmethod
     def from_args(cls, args):
@@ -24,5 +35,16 @@ class BuildConfig:
             definitions=args.definitions,
             non_unity=args.nonUnity,
             no_precompiled_headers=args.noPrecompiledHeaders,
-            debug_only=args.onlyDebug
+            debug_only=args.onlyDebug,
+            jobs=getattr(args, 'jobs', 1),
+            force=getattr(args, 'force', False),
+            use_cache=getattr(args, 'cache', False),
+            cache_dir=getattr(args, 'cacheDir', None),
+            cache_size_gb=getattr(args, 'cacheSize', 20),
+            cache_hardlinks=getattr(args, 'cacheHardlinks', False),
+            fail_fast=getattr(args, 'failFast', False),
+            no_output_timeout=getattr(args, 'noOutputTimeout', None),
+            use_scheduler=getattr(args, 'scheduler', True),
+            batch_targets=getattr(args, 'batchTargets', True),
+            plan=getattr(args, 'plan', False)
         ) 
\ No newline at end of file
@@ -0,0 +1,154 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+import ue
+
+UET_INTERMEDIATE_DIR = "Intermediate/Uet"
+FILE_HASHES_FILE_NAME = "FileHashes.json"
+FINGERPRINTS_FILE_NAME = "Fingerprints.json"
+BINARIES_DIR = "Binaries"
+PLUGIN_FILE_EXTENSION = ".uplugin"
+# Plugin directories which never contain build inputs, not walked at all
+SKIPPED_PLUGIN_DIRS = {"Binaries", "Intermediate", "Content", "Saved", "Resources"}
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def get_uet_intermediate_path(projectPath):
+    return os.path.join(projectPath, UET_INTERMEDIATE_DIR)
+
+def hash_file(filePath):
+    fileHash = hashlib.sha1()
+    with open(filePath, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            fileHash.update(chunk)
+    return fileHash.hexdigest()
+
+def read_json(filePath, default):
+    try:
+        with open(filePath) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return default
+
+def write_json(filePath, data):
+    """Write json atomically, so a build killed in the middle never leaves broken state behind"""
+    os.makedirs(os.path.dirname(filePath), exist_ok=True)
+    tmpFilePath = filePath + ".tmp"
+    with open(tmpFilePath, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmpFilePath, filePath)
+
+def get_source_files(projectPath):
+    """Relative paths of files which are inputs of the project build: project file, Source tree and plugin sources"""
+    sourceFiles = []
+    projectFileName = ue.path.project.get_project_file_name_from_repo_path(projectPath)
+    if projectFileName:
+        sourceFiles.append(projectFileName)
+
+    sourcePath = os.path.join(projectPath, ue.path.project.SOURCE_DIR)
+    for dirPath, dirNames, fileNames in os.walk(sourcePath):
+        dirNames.sort()
+        sourceFiles.extend(os.path.relpath(os.path.join(dirPath, fn), projectPath) for fn in sorted(fileNames))
+
+    pluginsPath = ue.path.project.get_plugins_path(projectPath)
+    for dirPath, dirNames, fileNames in os.walk(pluginsPath):
+        dirNames[:] = sorted(dn for dn in dirNames if dn not in SKIPPED_PLUGIN_DIRS)
+        relDirPath = os.path.relpath(dirPath, pluginsPath)
+        isSourceDir = ue.path.project.SOURCE_DIR in relDirPath.split(os.sep)
+        for fileName in sorted(fileNames):
+            if isSourceDir or fileName.endswith(PLUGIN_FILE_EXTENSION):
+                sourceFiles.append(os.path.relpath(os.path.join(dirPath, fileName), projectPath))
+
+    return sourceFiles
+
+class FileHashCache:
+    """Content hashes of project files, rehashed only when file mtime or size changes"""
+
+    def __init__(self, projectPath, fileName=FILE_HASHES_FILE_NAME):
+        self.projectPath = projectPath
+        self.filePath = os.path.join(get_uet_intermediate_path(projectPath), fileName)
+        self.entries = read_json(self.filePath, {})
+
+    def get_hash(self, relPath):
+        fullPath = os.path.join(self.projectPath, relPath)
+        fileStat = os.stat(fullPath)
+        entry = self.entries.get(relPath)
+        if entry and entry[0] == fileStat.st_mtime_ns and entry[1] == fileStat.st_size:
+            return entry[2]
+
+        fileHash = hash_file(fullPath)
+        self.entries[relPath] = [fileStat.st_mtime_ns, fileStat.st_size, fileHash]
+        return fileHash
+
+    def compute_digest(self, relPaths):
+        digest = hashlib.sha256()
+        seenPaths = set()
+        for relPath in relPaths:
+            try:
+                fileHash = self.get_hash(relPath)
+            except OSError as e:
+                logging.debug(f"Skipping unreadable file '{relPath}': {e}")
+                continue
+            seenPaths.add(relPath)
+            digest.update(relPath.replace(os.sep, '/').encode('utf-8'))
+            digest.update(b'\0')
+            digest.update(fileHash.encode('ascii'))
+            digest.update(b'\n')
+
+        self.prune(seenPaths)
+        return digest.hexdigest()
+
+    def prune(self, existingPaths):
+        """Drop hashes of deleted files, so the cache does not grow forever"""
+        self.entries = {relPath: entry for relPath, entry in self.entries.items() if relPath in existingPaths}
+
+    def save(self):
+        write_json(self.filePath, self.entries)
+
+def compute_source_digest(projectPath):
+    """Digest of all build inputs of the project, based on file contents"""
+    hashCache = FileHashCache(projectPath)
+    digest = hashCache.compute_digest(get_source_files(projectPath))
+    hashCache.save()
+    return digest
+
+def get_engine_version(engineRootPath):
+    if engineRootPath and os.path.isdir(engineRootPath):
+        return '.'.join(str(part) for part in ue.path.get_version_from_root_dir(engineRootPath))
+
+def compute_cell_fingerprint(sourceDigest, engineRootPath, cell, buildConfig):
+    """Fingerprint of everything which affects the result of building `cell`"""
+    inputs = {
+        'source': sourceDigest,
+        'engine_root': os.path.normpath(engineRootPath) if engineRootPath else None,
+        'engine_version': get_engine_version(engineRootPath),
+        'platform': cell.platform,
+        'config': cell.config,
+        'target': cell.target,
+        'definitions': buildConfig.definitions or [],
+        'non_unity': buildConfig.non_unity,
+        'no_precompiled_headers': buildConfig.no_precompiled_headers,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+class BuildFingerprints:
+    """Fingerprints of the last successful build of every cell of the project"""
+
+    def __init__(self, projectPath):
+        self.projectPath = projectPath
+        self.filePath = os.path.join(get_uet_intermediate_path(projectPath), FINGERPRINTS_FILE_NAME)
+        self.lock = threading.Lock()
+        self.fingerprints = read_json(self.filePath, {})
+
+    def is_up_to_date(self, cell, fingerprint):
+        with self.lock:
+            if self.fingerprints.get(cell.get_name()) != fingerprint:
+                return False
+        # Binaries could be cleaned after the last build
+        return os.path.isdir(os.path.join(self.projectPath, BINARIES_DIR, cell.platform))
+
+    def record(self, cell, fingerprint):
+        with self.lock:
+            self.fingerprints[cell.get_name()] = fingerprint
+            write_json(self.filePath, self.fingerprints)
@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import logging
+import statistics
+import threading
+from argparse import ArgumentParser
+import common as cm
+import ue
+from build_matrix import format_duration, get_unit_cells
+
+HISTORY_FILE_PATH = "Saved/Uet/BuildHistory.jsonl"
+DEFAULT_REGRESSION_THRESHOLD = 10.0
+DEFAULT_BASELINE_SIZE = 5
+DEFAULT_TREND_SIZE = 10
+
+def get_history_file_path(projectPath):
+    return os.path.join(projectPath, HISTORY_FILE_PATH)
+
+def create_record(cell, result, buildConfig, actionCount=None, parallelActions=None, batch=None):
+    """History record of one UBT run, `result` is `build_runner.ProcessResult`, `parallelActions` is UBT action limit.
+
+    Cells of a batch share its run, their records have the batch name and number of its cells.
+    """
+    record = {
+        'time': round(time.time(), 3),
+        'cell': cell.get_name(),
+        'batch': batch.get_name() if batch else None,
+        'batch_cells': len(batch.cells) if batch else None,
+        'exit_code': result.returncode,
+        'wall': round(result.wall_time, 3),
+        'user': round(result.user_time, 3) if result.user_time is not None else None,
+        'sys': round(result.sys_time, 3) if result.sys_time is not None else None,
+        'peak_rss': result.peak_rss,
+        'actions': actionCount,
+        'parallel_actions': parallelActions,
+        'definitions': buildConfig.definitions or [],
+        'non_unity': buildConfig.non_unity,
+        'no_precompiled_headers': buildConfig.no_precompiled_headers,
+    }
+    return {key: value for key, value in record.items() if value is not None}
+
+def create_records(unit, result, buildConfig, actionCount=None, parallelActions=None):
+    """History records of one UBT run of a cell or `BuildBatch`, one for every built cell"""
+    cells = get_unit_cells(unit)
+    batch = unit if len(cells) > 1 else None
+    return [create_record(cell, result, buildConfig, actionCount, parallelActions, batch) for cell in cells]
+
+def get_flags_key(record):
+    """Records are comparable only when built with the same flags, in the same batch"""
+    return (tuple(record.get('definitions', [])), record.get('non_unity', False), record.get('no_precompiled_headers', False),
+            record.get('batch'))
+
+class BuildHistory:
+    """Append-only json lines file with records of every UBT run of the project"""
+
+    def __init__(self, projectPath):
+        self.filePath = get_history_file_path(projectPath)
+        self.lock = threading.Lock()
+
+    def append(self, record):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self.lock:
+            os.makedirs(os.path.dirname(self.filePath), exist_ok=True)
+            with open(self.filePath, 'a') as f:
+                f.write(line)
+
+    def read(self):
+        records = []
+        if not os.path.isfile(self.filePath):
+            return records
+        with open(self.filePath) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logging.debug(f"Skipping broken history line: {line!r}")
+        return records
+
+    def get_cell_records(self, cellName, succeededOnly=True):
+        return [record for record in self.read()
+                if record.get('cell') == cellName and (not succeededOnly or record.get('exit_code') == 0)]
+
+def find_regression(records, baselineSize, threshold):
+    """Compare the last record with median of previous comparable ones, return (baseline, change in percent) or None"""
+    if len(records) < 2:
+        return None
+    last = records[-1]
+    previous = [record['wall'] for record in records[:-1] if get_flags_key(record) == get_flags_key(last)][-baselineSize:]
+    if not previous:
+        return None
+    baseline = statistics.median(previous)
+    if baseline <= 0:
+        return None
+    change = (last['wall'] - baseline) * 100.0 / baseline
+    return baseline, change, change > threshold
+
+def format_size(sizeBytes):
+    if sizeBytes is None:
+        return "-"
+    return f"{sizeBytes / 1024 ** 3:.1f}G"
+
+class BuildHistoryViewer:
+    def run(self):
+        sourcePath, settings = self.init()
+        if not sourcePath:
+            return 0
+        projectPath = ue.path.project.get_root_path_from_path(sourcePath)
+        if not projectPath:
+            logging.warning("No UE project found for the path " + str(sourcePath))
+            return 0
+        return self.show(BuildHistory(projectPath), settings)
+
+    def init(self):
+        sourcePath, settings = self.process_args()
+        logging.debug("Input SourcePath: " + str(sourcePath))
+        if os.path.isdir(sourcePath):
+            return sourcePath, settings
+        else:
+            logging.warning("SourcePath is invalid: " + str(sourcePath))
+            return None, settings
+
+    def process_args(self):
+        parser = ArgumentParser()
+        cm.init_arg_parser(parser)
+        parser.add_argument("shellsource",
+                            help="directory inside of UE project, set by calling shell", metavar="SHELL_SOURCE")
+        parser.add_argument("-s", "--source", dest="source",
+                            help="directory inside of UE project, set by user, overrides value of 'shellsource' argument",
+                            metavar="SOURCE")
+        parser.add_argument("-c", "--cell", dest="cells", nargs='+',
+                            help="show only given cells, for example Win64_Development_Editor", metavar="CELL")
+        parser.add_argument("-n", "--last", dest="last", type=int, default=DEFAULT_TREND_SIZE,
+                            help="number of last builds shown in trend", metavar="COUNT")
+        parser.add_argument("-b", "--baseline", dest="baseline", type=int, default=DEFAULT_BASELINE_SIZE,
+                            help="number of previous builds the last build is compared with", metavar="COUNT")
+        parser.add_argument("-r", "--threshold", dest="threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                            help="wall time growth in percent reported as regression", metavar="PERCENT")
+
+        parsedArgs = parser.parse_args()
+        self.onlyDebug = cm.process_parsed_args(parsedArgs)
+
+        logging.debug("Parsing arguments: '" + ' '.join(sys.argv[1:]) + "'")
+        logging.debug("Result is: " + str(parsedArgs))
+
+        if not parsedArgs.source:
+            parsedArgs.source = parsedArgs.shellsource
+
+        return parsedArgs.source, parsedArgs
+
+    def show(self, history, settings):
+        """Print trends of succeeded builds per cell, return 1 if any cell regressed"""
+        recordsByCell = {}
+        for record in history.read():
+            if record.get('exit_code') == 0:
+                recordsByCell.setdefault(record['cell'], []).append(record)
+
+        if not recordsByCell:
+            logging.info("No build history in " + history.filePath)
+            return 0
+
+        hasRegressions = False
+        for cellName in sorted(recordsByCell):
+            if settings.cells and cellName not in settings.cells:
+                continue
+            records = recordsByCell[cellName]
+            last = records[-1]
+            logging.info(f"\n{cellName}: {len(records)} builds")
+            logging.info(f"\tLast: {format_duration(last['wall'])} wall, {format_duration(last.get('user', 0))} user, "
+                         f"{format_duration(last.get('sys', 0))} sys, {format_size(last.get('peak_rss'))} peak RSS")
+            logging.info("\tTrend: " + " ".join(format_duration(record['wall']) for record in records[-settings.last:]))
+
+            regression = find_regression(records, settings.baseline, settings.threshold)
+            if regression:
+                baseline, change, isRegression = regression
+                message = f"\t{change:+.1f}% against median {format_duration(baseline)} of previous builds"
+                if isRegression:
+                    hasRegressions = True
+                    logging.warning(f"{cellName} regressed:" + message)
+                else:
+                    logging.info(message)
+
+        return 1 if hasRegressions else 0
+
+def main():
+    print("Build history of Unreal Engine project")
+    viewer = BuildHistoryViewer()
+    return viewer.run()
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print('Interrupted by user')
+        try:
+            sys.exit(0)
+        except SystemExit:
+            os._exit(0)
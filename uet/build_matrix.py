@@ -0,0 +1,202 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+class CellStatus:
+    SUCCEEDED = "Succeeded"
+    FAILED = "Failed"
+    UP_TO_DATE = "Up to date"
+    RESTORED = "Restored from cache"
+    CANCELLED = "Cancelled"
+
+class CellCancelled(Exception):
+    """Raised by build function when the cell build was stopped because the matrix build is cancelled"""
+    pass
+
+@dataclass
+class BuildCell:
+    """Single platform x configuration x target combination of a build matrix"""
+    platform: str
+    config: str
+    target: str
+
+    def get_name(self):
+        return f"{self.platform}_{self.config}_{self.target.capitalize()}"
+
+@dataclass
+class BuildBatch:
+    """Cells of the same platform built by one UBT run"""
+    cells: List[BuildCell]
+
+    @property
+    def platform(self):
+        return self.cells[0].platform
+
+    def get_name(self):
+        return "+".join(cell.get_name() for cell in self.cells)
+
+def get_unit_cells(unit) -> List[BuildCell]:
+    """Cells built by one UBT run of a cell or a batch"""
+    return unit.cells if isinstance(unit, BuildBatch) else [unit]
+
+@dataclass
+class BuildCellResult:
+    """Outcome of building a single matrix cell"""
+    cell: BuildCell
+    status: str
+    duration: float = 0.0
+    error: Optional[str] = None
+
+    def is_failed(self):
+        # Cancelled cell was not built, the matrix is not complete
+        return self.status in (CellStatus.FAILED, CellStatus.CANCELLED)
+
+def create_build_cells(platforms, configurations, targets) -> List[BuildCell]:
+    """Expand platforms, configurations and targets into matrix cells in build order"""
+    return [BuildCell(platform, config, target) for platform in platforms for config in configurations for target in targets]
+
+def group_cells_by_platform(cells: List[BuildCell]) -> List[List[BuildCell]]:
+    """Cells which can be built by one UBT run, groups and cells in them keep matrix order"""
+    groups: Dict[str, List[BuildCell]] = {}
+    for cell in cells:
+        groups.setdefault(cell.platform, []).append(cell)
+    return list(groups.values())
+
+def has_failed_cells(results: List[BuildCellResult]) -> bool:
+    return any(result.is_failed() for result in results)
+
+class BuildMatrixExecutor:
+    """Runs matrix cells through a thread pool.
+
+    `buildFunc` is called with a cell and does the actual build. It raises on failure and may return one of
+    `CellStatus` values, otherwise the cell is considered succeeded. It should stop the build and raise
+    `CellCancelled` once `cancelEvent` is set. Cells not started before cancellation are not built at all.
+    With `failFast` the first failed cell cancels the rest of the matrix.
+
+    With `batchFunc` cells of the same platform are passed to it together, so they can be built by one UBT run.
+    It returns a status for every cell, None for cells it did not build, which are then built one by one
+    with `buildFunc`. Each batch takes one job.
+    """
+
+    def __init__(self, buildFunc: Callable[[BuildCell], Optional[str]], jobs: int = 1, failFast: bool = False,
+                 cancelEvent: Optional[threading.Event] = None,
+                 batchFunc: Optional[Callable[[List[BuildCell]], List[Optional[str]]]] = None):
+        self.buildFunc = buildFunc
+        self.jobs = max(1, jobs)
+        self.failFast = failFast
+        self.cancelEvent = cancelEvent or threading.Event()
+        self.batchFunc = batchFunc
+        self.lock = threading.Lock()
+        self.finishedCount = 0
+        self.totalCount = 0
+
+    def run(self, cells: List[BuildCell]) -> List[BuildCellResult]:
+        self.finishedCount = 0
+        self.totalCount = len(cells)
+        batches = group_cells_by_platform(cells) if self.batchFunc else [[cell] for cell in cells]
+        if self.jobs == 1 or len(batches) <= 1:
+            batchResults = [self.run_batch(batch) for batch in batches]
+        else:
+            logging.info(f"Building {len(cells)} cells with {self.jobs} parallel jobs")
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                try:
+                    batchResults = list(executor.map(self.run_batch, batches))
+                except KeyboardInterrupt:
+                    # Workers stop their builds and skip the rest, executor waits for them on exit
+                    self.cancel()
+                    raise
+
+        resultsByCell = {id(result.cell): result for results in batchResults for result in results}
+        return [resultsByCell[id(cell)] for cell in cells]
+
+    def run_batch(self, cells: List[BuildCell]) -> List[BuildCellResult]:
+        if len(cells) == 1 or self.batchFunc is None or self.cancelEvent.is_set():
+            return [self.run_cell(cell) for cell in cells]
+
+        batchName = BuildBatch(cells).get_name()
+        logging.info(f"[{batchName}] Started")
+        startTime = time.monotonic()
+        try:
+            statuses = self.batchFunc(cells)
+        except CellCancelled as e:
+            duration = time.monotonic() - startTime
+            return [self.finish_cell(BuildCellResult(cell, CellStatus.CANCELLED, duration, str(e))) for cell in cells]
+        except Exception as e:
+            logging.warning(f"[{batchName}] Batch build failed, building cells one by one: {e}")
+            statuses = [None] * len(cells)
+        duration = time.monotonic() - startTime
+
+        results = []
+        for cell, status in zip(cells, statuses):
+            if status is None:
+                results.append(self.run_cell(cell))
+            else:
+                results.append(self.finish_cell(BuildCellResult(cell, status, duration)))
+        return results
+
+    def cancel(self):
+        self.cancelEvent.set()
+
+    def run_cell(self, cell: BuildCell) -> BuildCellResult:
+        cellName = cell.get_name()
+        if self.cancelEvent.is_set():
+            result = BuildCellResult(cell, CellStatus.CANCELLED, error="matrix build is cancelled")
+            with self.lock:
+                self.finishedCount += 1
+            return result
+
+        logging.info(f"[{cellName}] Started")
+        startTime = time.monotonic()
+        try:
+            status = self.buildFunc(cell)
+            if not isinstance(status, str):
+                status = CellStatus.SUCCEEDED
+            result = BuildCellResult(cell, status, time.monotonic() - startTime)
+        except CellCancelled as e:
+            result = BuildCellResult(cell, CellStatus.CANCELLED, time.monotonic() - startTime, str(e))
+        except Exception as e:
+            result = BuildCellResult(cell, CellStatus.FAILED, time.monotonic() - startTime, str(e))
+            if self.failFast and not self.cancelEvent.is_set():
+                logging.error(f"[{cellName}] Failed, cancelling remaining cells")
+                self.cancel()
+        return self.finish_cell(result)
+
+    def finish_cell(self, result: BuildCellResult) -> BuildCellResult:
+        cellName = result.cell.get_name()
+        with self.lock:
+            self.finishedCount += 1
+            progress = f"{self.finishedCount}/{self.totalCount}"
+
+        if result.is_failed():
+            logging.error(f"[{progress}] [{cellName}] {result.status} after {format_duration(result.duration)}: {result.error}")
+        else:
+            logging.info(f"[{progress}] [{cellName}] {result.status} in {format_duration(result.duration)}")
+        return result
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m{seconds:02d}s"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+def log_summary(results: List[BuildCellResult]):
+    """Print final table with status and duration of every cell"""
+    if not results:
+        return
+
+    nameWidth = max(len("Cell"), *(len(result.cell.get_name()) for result in results))
+    statusWidth = max(len("Status"), *(len(result.status) for result in results))
+
+    logging.info(f"\n{'#'*35} Build summary {'#'*35}\n")
+    logging.info(f"{'Cell':<{nameWidth}}  {'Status':<{statusWidth}}  Duration")
+    for result in results:
+        logging.info(f"{result.cell.get_name():<{nameWidth}}  {result.status:<{statusWidth}}  {format_duration(result.duration)}")
+
+    failedCount = sum(1 for result in results if result.is_failed())
+    logging.info(f"\n{len(results) - failedCount} of {len(results)} cells succeeded")
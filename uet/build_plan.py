@@ -0,0 +1,124 @@
+import heapq
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from build_matrix import BuildCell, format_duration, group_cells_by_platform
+from build_progress import get_expected_duration
+
+EDITOR_TARGET = "Editor"
+# Editor target is never built for distribution
+NON_EDITOR_CONFIGURATIONS = ("Test", "Shipping")
+
+@dataclass
+class PrunedCell:
+    """Cell which can never be built, with the reason"""
+    cell: BuildCell
+    reason: str
+
+@dataclass
+class PlannedCell:
+    cell: BuildCell
+    # Typical wall time from build history, None for cells never built successfully
+    estimate: Optional[float] = None
+
+@dataclass
+class BuildPlan:
+    """Cells to build in build order and cells pruned from the matrix"""
+    cells: List[PlannedCell] = field(default_factory=list)
+    pruned: List[PrunedCell] = field(default_factory=list)
+
+    def get_cells(self) -> List[BuildCell]:
+        return [plannedCell.cell for plannedCell in self.cells]
+
+def get_invalid_reason(cell, projectTargets=None, hostPlatforms=None):
+    """Why the cell can never be built, None for valid cells. Unknown targets or platforms are not checked"""
+    if projectTargets is not None and cell.target.lower() not in (target.lower() for target in projectTargets):
+        return f"project has no {cell.target} target"
+    if cell.target.lower() == EDITOR_TARGET.lower() and cell.config in NON_EDITOR_CONFIGURATIONS:
+        return f"{EDITOR_TARGET} target can not be built in {cell.config} configuration"
+    if hostPlatforms is not None and cell.platform not in hostPlatforms:
+        return f"{cell.platform} can not be built on this host"
+
+def prune_cells(cells, projectTargets=None, hostPlatforms=None):
+    """Split cells into valid ones and `PrunedCell`s"""
+    valid = []
+    pruned = []
+    for cell in cells:
+        reason = get_invalid_reason(cell, projectTargets, hostPlatforms)
+        if reason:
+            pruned.append(PrunedCell(cell, reason))
+        else:
+            valid.append(cell)
+    return valid, pruned
+
+def get_planning_estimate(plannedCell, fallback):
+    return plannedCell.estimate if plannedCell.estimate is not None else fallback
+
+def get_unknown_estimate(plannedCells):
+    """Cells never built are full builds, so they are planned as the longest known one"""
+    known = [plannedCell.estimate for plannedCell in plannedCells if plannedCell.estimate is not None]
+    return max(known) if known else 0.0
+
+def order_longest_first(plannedCells: List[PlannedCell]) -> List[PlannedCell]:
+    """Longest processing time first: long cells start early, short ones fill the gaps at the end"""
+    fallback = get_unknown_estimate(plannedCells)
+    return sorted(plannedCells, key=lambda plannedCell: get_planning_estimate(plannedCell, fallback), reverse=True)
+
+def estimate_makespan(durations, jobs):
+    """Wall time of running the durations in given order on `jobs` workers, each item taking the first free one"""
+    workers = [0.0] * max(1, min(jobs, len(durations)))
+    for duration in durations:
+        heapq.heappush(workers, heapq.heappop(workers) + duration)
+    return max(workers) if durations else 0.0
+
+def get_unit_durations(plan: BuildPlan, batchTargets=False):
+    """Durations of work units in build order: cells, or platform batches with summed estimates of their cells"""
+    fallback = get_unknown_estimate(plan.cells)
+    estimates: Dict[int, float] = {id(plannedCell.cell): get_planning_estimate(plannedCell, fallback) for plannedCell in plan.cells}
+    if batchTargets:
+        units = group_cells_by_platform(plan.get_cells())
+    else:
+        units = [[cell] for cell in plan.get_cells()]
+    return [sum(estimates[id(cell)] for cell in unit) for unit in units]
+
+def get_cell_estimates(records) -> Dict[str, float]:
+    """Typical build duration of every cell with successful builds in history records, batch runs included"""
+    recordsByCell = {}
+    for record in records:
+        if record.get('exit_code') == 0:
+            recordsByCell.setdefault(record.get('cell'), []).append(record)
+    return {cellName: get_expected_duration(cellRecords) for cellName, cellRecords in recordsByCell.items()}
+
+def create_build_plan(cells, estimates, projectTargets=None, hostPlatforms=None) -> BuildPlan:
+    """Prune invalid cells and order the rest longest first, `estimates` maps cell names to typical durations"""
+    valid, pruned = prune_cells(cells, projectTargets, hostPlatforms)
+    plannedCells = [PlannedCell(cell, estimates.get(cell.get_name())) for cell in valid]
+    return BuildPlan(order_longest_first(plannedCells), pruned)
+
+def log_pruned(plan: BuildPlan):
+    for prunedCell in plan.pruned:
+        logging.warning(f"Skipping {prunedCell.cell.get_name()}: {prunedCell.reason}")
+
+def log_plan(plan: BuildPlan, jobs=1, batchTargets=False):
+    """Print cells in build order with estimates and expected total time"""
+    logging.info(f"\n{'#'*35} Build plan {'#'*35}\n")
+    if plan.cells:
+        nameWidth = max(len("Cell"), *(len(plannedCell.cell.get_name()) for plannedCell in plan.cells))
+        logging.info(f"{'#':>3}  {'Cell':<{nameWidth}}  Estimate")
+        for index, plannedCell in enumerate(plan.cells, 1):
+            estimate = format_duration(plannedCell.estimate) if plannedCell.estimate is not None else "unknown"
+            logging.info(f"{index:>3}  {plannedCell.cell.get_name():<{nameWidth}}  {estimate}")
+    else:
+        logging.info("Nothing to build")
+
+    if plan.pruned:
+        logging.info("\nPruned:")
+        for prunedCell in plan.pruned:
+            logging.info(f"\t{prunedCell.cell.get_name()}: {prunedCell.reason}")
+
+    if plan.cells:
+        durations = get_unit_durations(plan, batchTargets)
+        logging.info(f"\nSerial time: {format_duration(sum(durations))}")
+        logging.info(f"Critical path with {jobs} jobs: {format_duration(estimate_makespan(durations, jobs))}")
+        if any(plannedCell.estimate is None for plannedCell in plan.cells):
+            logging.info("Cells without history are counted as the longest known cell")
@@ -0,0 +1,119 @@
+import re
+import time
+import logging
+import statistics
+from dataclasses import dataclass
+from typing import List, Optional
+from build_matrix import format_duration
+
+# UBT prints a line for every finished action: `[12/340] Compile [x64] Module.Core.cpp`
+ACTION_LINE_PATTERN = re.compile(r'^\s*\[(\d+)/(\d+)\]\s+(\S+)\s+(?:\[[^\]]*\]\s+)?(.*?)\s*$')
+COMPILE_ACTION_KINDS = ("Compile",)
+LINK_ACTION_KINDS = ("Link",)
+PROGRESS_BAR_WIDTH = 20
+DEFAULT_REPORT_SIZE = 10
+
+@dataclass
+class ActionEvent:
+    """Finished UBT action"""
+    index: int
+    total: int
+    kind: str
+    item: str
+    time: float
+    # Time since the previous action finished. With parallel actions it is spacing of finished actions,
+    # not time of the action itself, UBT output has no action start times
+    gap: float
+
+def parse_action_line(line):
+    """Return (index, total, kind, item) for UBT action lines, None for other lines"""
+    match = ACTION_LINE_PATTERN.match(line)
+    if match:
+        return int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+
+def format_progress_bar(done, total, width=PROGRESS_BAR_WIDTH):
+    filled = width * done // total if total else 0
+    return '[' + '#' * filled + '-' * (width - filled) + ']'
+
+class ProgressTracker:
+    """Turns streamed UBT output into action events, estimates remaining time and collects gaps between actions.
+
+    `expectedDuration` is the typical wall time of the build from history, it seeds the estimate until enough
+    actions finish for the observed rate to be reliable.
+    """
+
+    def __init__(self, expectedDuration=None, clock=time.monotonic):
+        self.clock = clock
+        self.startTime = clock()
+        self.expectedDuration = expectedDuration
+        self.firstActionTime = None
+        self.firstActionIndex = 0
+        self.lastActionTime = None
+        self.done = 0
+        self.total = 0
+        self.events: List[ActionEvent] = []
+
+    def on_line(self, line, isError=False):
+        """Handle output line, return line with progress for action lines, None for others"""
+        parsed = None if isError else parse_action_line(line)
+        if not parsed:
+            return None
+
+        index, total, kind, item = parsed
+        now = self.clock()
+        if self.firstActionTime is None:
+            # UBT startup and dependency scanning happen before the first action, rate is measured after it
+            self.firstActionTime = now
+            self.firstActionIndex = index
+        gap = now - (self.lastActionTime if self.lastActionTime is not None else self.startTime)
+        self.lastActionTime = now
+        self.done = index
+        self.total = total
+        self.events.append(ActionEvent(index, total, kind, item, now, gap))
+
+        percent = 100 * index // total if total else 100
+        progress = f"{format_progress_bar(index, total)} {percent:3d}% {index}/{total}"
+        eta = self.get_eta()
+        if eta is not None:
+            progress += f" ETA {format_duration(eta)}"
+        return f"{progress} {kind} {item}"
+
+    def get_eta(self) -> Optional[float]:
+        """Remaining seconds, blend of history based estimate and observed action rate"""
+        elapsed = self.clock() - self.startTime
+        historyEta = max(0.0, self.expectedDuration - elapsed) if self.expectedDuration else None
+
+        rateEta = None
+        if self.total and self.done > self.firstActionIndex:
+            actionsElapsed = self.clock() - self.firstActionTime
+            rateEta = actionsElapsed / (self.done - self.firstActionIndex) * (self.total - self.done)
+
+        if rateEta is None:
+            return historyEta
+        if historyEta is None:
+            return rateEta
+        weight = self.done / self.total
+        return (1 - weight) * historyEta + weight * rateEta
+
+    def get_longest_gaps(self, kinds, count=DEFAULT_REPORT_SIZE):
+        """Actions after which the build waited longest for a finished action, where it ran out of parallel work"""
+        events = [event for event in self.events if event.kind in kinds]
+        return sorted(events, key=lambda event: event.gap, reverse=True)[:count]
+
+    def log_report(self, count=DEFAULT_REPORT_SIZE):
+        if not self.events:
+            return
+        logging.info(f"\n{len(self.events)} actions finished in {format_duration(self.lastActionTime - self.startTime)}")
+        for title, kinds in (("compile", COMPILE_ACTION_KINDS), ("link", LINK_ACTION_KINDS)):
+            longestGaps = self.get_longest_gaps(kinds, count)
+            if longestGaps:
+                logging.info(f"Longest waits before finished {title} actions (time since the previous action finished, "
+                             f"not time of the action with parallel actions):")
+                for event in longestGaps:
+                    logging.info(f"\t{event.gap:8.1f}s  {event.item}")
+
+def get_expected_duration(records):
+    """Median wall time of succeeded history records, cells of a batch get equal parts of its time"""
+    wallTimes = [record['wall'] / record.get('batch_cells', 1) for record in records if 'wall' in record]
+    if wallTimes:
+        return statistics.median(wallTimes)
@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+import logging
+import threading
+import subprocess as sp
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+import process_tree
+
+ERROR_TAIL_LINES = 20
+WATCH_INTERVAL = 0.5
+
+# Streamed processes with their running commands, so they can be stopped when the script itself is terminated
+RUNNING_PROCESSES = {}
+RUNNING_PROCESSES_LOCK = threading.Lock()
+
+@dataclass
+class ProcessResult:
+    """Result of a streamed process run"""
+    returncode: int
+    wall_time: float = 0.0
+    error_tail: List[str] = field(default_factory=list)
+    user_time: Optional[float] = None
+    sys_time: Optional[float] = None
+    peak_rss: Optional[int] = None
+    cancelled: bool = False
+    timed_out: bool = False
+
+class StreamedProcess:
+    """Runs a command reading stdout and stderr concurrently line by line.
+
+    Every line is written to the log file, passed to `lineHandler` and forwarded to logging as soon as it is read,
+    optionally prefixed. The handler may return replacement text for logging. Only the last few stderr lines are kept, so memory does not grow with the output size.
+
+    The command is started in its own process group. Its whole process tree is killed when `cancelEvent` is set,
+    when it prints nothing for `noOutputTimeout` seconds, when the calling thread is interrupted and by
+    `cancel_running_processes`.
+    """
+
+    def __init__(self, command, logFilePath=None, linePrefix="", lineHandler: Optional[Callable[[str, bool], Optional[str]]] = None,
+                 cancelEvent: Optional[threading.Event] = None, noOutputTimeout: Optional[float] = None):
+        self.command = command
+        self.logFilePath = logFilePath
+        self.linePrefix = linePrefix
+        self.lineHandler = lineHandler
+        self.cancelEvent = cancelEvent
+        self.noOutputTimeout = noOutputTimeout
+        self.logFile = None
+        self.lock = threading.Lock()
+        self.errorTail = deque(maxlen=ERROR_TAIL_LINES)
+        self.lastOutputTime = time.monotonic()
+        self.finishedEvent = threading.Event()
+        self.killLock = threading.Lock()
+        self.isKilled = False
+        self.cancelled = False
+        self.timedOut = False
+
+    def run(self) -> ProcessResult:
+        startTime = time.monotonic()
+        if self.logFilePath:
+            os.makedirs(os.path.dirname(self.logFilePath), exist_ok=True)
+            self.logFile = open(self.logFilePath, 'w', encoding='utf-8', buffering=1)
+
+        try:
+            process = start_process(self.command)
+            with RUNNING_PROCESSES_LOCK:
+                RUNNING_PROCESSES[self] = process
+            rssSampler = process_tree.PeakRssSampler(process.pid).start() if process_tree.is_proc_available() else None
+            threads = [
+                threading.Thread(target=self.read_pipe, args=(process.stdout, False), daemon=True),
+                threading.Thread(target=self.read_pipe, args=(process.stderr, True), daemon=True),
+            ]
+            watcher = threading.Thread(target=self.watch, args=(process,), daemon=True)
+            for thread in threads + [watcher]:
+                thread.start()
+            try:
+                for thread in threads:
+                    thread.join()
+            except BaseException:
+                # Interrupted by user, child processes must not outlive the build
+                self.kill(process)
+                raise
+            finally:
+                self.finishedEvent.set()
+            watcher.join()
+            returncode, rusage = wait_process(process)
+            peakRss = rssSampler.stop() if rssSampler else None
+        finally:
+            with RUNNING_PROCESSES_LOCK:
+                RUNNING_PROCESSES.pop(self, None)
+            if self.logFile:
+                self.logFile.close()
+                self.logFile = None
+
+        result = ProcessResult(returncode, time.monotonic() - startTime, list(self.errorTail), peak_rss=peakRss,
+                               cancelled=self.cancelled, timed_out=self.timedOut)
+        if rusage:
+            result.user_time = rusage.ru_utime
+            result.sys_time = rusage.ru_stime
+        return result
+
+    def watch(self, process):
+        """Kill the process tree on cancellation or when the process stops printing anything"""
+        while not self.finishedEvent.wait(WATCH_INTERVAL):
+            if self.cancelEvent and self.cancelEvent.is_set():
+                self.cancel(process)
+                return
+            silentTime = time.monotonic() - self.lastOutputTime
+            if self.noOutputTimeout and silentTime > self.noOutputTimeout:
+                self.timedOut = True
+                logging.error(f"{self.linePrefix}No output for {int(silentTime)}s, build is considered hung, stopping it")
+                self.kill(process)
+                return
+
+    def cancel(self, process):
+        self.cancelled = True
+        logging.warning(f"{self.linePrefix}Build is cancelled, stopping it")
+        self.kill(process)
+
+    def kill(self, process):
+        with self.killLock:
+            if self.isKilled:
+                return
+            self.isKilled = True
+        process_tree.kill_process_tree(process.pid, None if sys.platform == "win32" else process.pid)
+
+    def read_pipe(self, pipe, isError):
+        for rawLine in iter(pipe.readline, b''):
+            self.on_line(rawLine.decode('utf-8', errors='replace').rstrip('\r\n'), isError)
+        pipe.close()
+
+    def on_line(self, line, isError):
+        self.lastOutputTime = time.monotonic()
+        with self.lock:
+            if self.logFile:
+                self.logFile.write(line + '\n')
+            if isError:
+                self.errorTail.append(line)
+            displayLine = self.lineHandler(line, isError) if self.lineHandler else None
+
+        if isError:
+            logging.error(self.linePrefix + (displayLine or line))
+        else:
+            logging.info(self.linePrefix + (displayLine or line))
+
+def start_process(command):
+    """Start the command in a new process group, so signals from terminal do not reach it and it can be killed as a whole"""
+    if sys.platform == "win32":
+        return sp.Popen(command, stdout=sp.PIPE, stderr=sp.PIPE, creationflags=sp.CREATE_NEW_PROCESS_GROUP)
+    return sp.Popen(command, stdout=sp.PIPE, stderr=sp.PIPE, start_new_session=True)
+
+def cancel_running_processes():
+    """Kill process trees of all running streamed processes, their results are marked as cancelled"""
+    with RUNNING_PROCESSES_LOCK:
+        runningProcesses = list(RUNNING_PROCESSES.items())
+    for streamedProcess, process in runningProcesses:
+        streamedProcess.cancel(process)
+
+def wait_process(process):
+    """Wait for the process, return its exit code and resource usage of the whole reaped process tree if available"""
+    if hasattr(os, 'wait4'):
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            return process.wait(), None
+        process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        return process.returncode, rusage
+    return process.wait(), None
+
+def run_streamed(command, logFilePath=None, linePrefix="", lineHandler=None, cancelEvent=None, noOutputTimeout=None) -> ProcessResult:
+    return StreamedProcess(command, logFilePath, linePrefix, lineHandler, cancelEvent, noOutputTimeout).run()
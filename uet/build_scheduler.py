@@ -0,0 +1,128 @@
+import os
+import math
+import logging
+import threading
+from dataclasses import dataclass
+from build_matrix import CellCancelled
+from build_history import format_size
+
+MEMINFO_FILE_PATH = "/proc/meminfo"
+# UBT itself assumes about this much memory per compile action when it picks the number of parallel actions
+DEFAULT_MEMORY_PER_ACTION = int(1.5 * 1024 ** 3)
+# Part of available memory left for the system and everything else running on the machine
+MEMORY_RESERVE_FRACTION = 0.1
+ESTIMATE_RECORDS_COUNT = 5
+RECHECK_INTERVAL = 2.0
+MAX_PARALLEL_ACTIONS_ARG = "-MaxParallelActions="
+
+def get_cpu_count():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def get_available_memory(meminfoPath=MEMINFO_FILE_PATH):
+    """MemAvailable in bytes, None where /proc is not available"""
+    try:
+        with open(meminfoPath) as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def estimate_memory_per_action(records):
+    """Peak memory of one parallel action seen in the last builds of the cell, None without such records"""
+    estimates = [record['peak_rss'] / record['parallel_actions'] for record in records
+                 if record.get('peak_rss') and record.get('parallel_actions')]
+    if estimates:
+        return int(max(estimates[-ESTIMATE_RECORDS_COUNT:]))
+
+def get_max_parallel_actions_arg(actions):
+    return f"{MAX_PARALLEL_ACTIONS_ARG}{actions}"
+
+@dataclass
+class Reservation:
+    """Resources given to one running build"""
+    actions: int
+    memory: int
+
+class ResourceScheduler:
+    """Admits matrix cells only when machine has cores and memory for them.
+
+    Budgets are taken when the scheduler is created: all cores of the process and available memory without
+    a reserve. Load average is not used, it lags behind for minutes after other builds finish. Memory is re-read
+    while cells wait, so a build started on the machine later makes cells wait too. Every admitted cell gets a number
+    of parallel UBT actions, a fair share of cores between builds which can run at once, not more than `jobs` and
+    the running and not yet admitted ones of `unitCount`, limited by memory it may take according to `memoryPerAction`. A cell is always admitted when nothing else runs,
+    otherwise the build would never start.
+    """
+
+    def __init__(self, jobs=1, cpuCount=None, memoryProbe=get_available_memory, recheckInterval=RECHECK_INTERVAL,
+                 unitCount=None):
+        self.jobs = max(1, jobs)
+        # Cells or batches which will ask for resources, cells of failed batches may come on top of them
+        self.pendingCount = unitCount if unitCount is not None else self.jobs
+        self.memoryProbe = memoryProbe
+        self.recheckInterval = recheckInterval
+        self.coreBudget = max(1, cpuCount or get_cpu_count())
+        availableMemory = memoryProbe()
+        self.memoryBudget = int(availableMemory * (1 - MEMORY_RESERVE_FRACTION)) if availableMemory is not None else None
+        self.reservedActions = 0
+        self.reservedMemory = 0
+        self.runningCount = 0
+        self.condition = threading.Condition()
+        logging.debug(f"Scheduler budget: {self.coreBudget} cores, {format_size(self.memoryBudget)} memory")
+
+    def get_free_memory(self):
+        if self.memoryBudget is None:
+            return None
+        freeMemory = self.memoryBudget - self.reservedMemory
+        currentMemory = self.memoryProbe()
+        if currentMemory is not None:
+            # Running builds already use part of their reservations, so current value is an upper bound for them
+            freeMemory = min(freeMemory, int(currentMemory * (1 - MEMORY_RESERVE_FRACTION)))
+        return freeMemory
+
+    def try_reserve(self, memoryPerAction):
+        share = math.ceil(self.coreBudget / min(self.jobs, max(1, self.pendingCount) + self.runningCount))
+        actions = min(share, self.coreBudget - self.reservedActions)
+        freeMemory = self.get_free_memory()
+        if freeMemory is not None:
+            actions = min(actions, freeMemory // memoryPerAction)
+        if actions < 1:
+            if self.runningCount:
+                return None
+            actions = 1
+        return Reservation(int(actions), int(actions * memoryPerAction))
+
+    def acquire(self, cellName, memoryPerAction=None, cancelEvent=None) -> Reservation:
+        """Wait until the cell can run, raise `CellCancelled` if the build is cancelled meanwhile"""
+        memoryPerAction = memoryPerAction or DEFAULT_MEMORY_PER_ACTION
+        isWaiting = False
+        with self.condition:
+            while True:
+                if cancelEvent and cancelEvent.is_set():
+                    raise CellCancelled("matrix build is cancelled")
+                reservation = self.try_reserve(memoryPerAction)
+                if reservation:
+                    break
+                if not isWaiting:
+                    logging.info(f"[{cellName}] Waiting for free cores or memory")
+                    isWaiting = True
+                self.condition.wait(self.recheckInterval)
+
+            self.reservedActions += reservation.actions
+            self.reservedMemory += reservation.memory
+            self.runningCount += 1
+            self.pendingCount -= 1
+        logging.info(f"[{cellName}] Admitted with {reservation.actions} parallel actions, "
+                     f"about {format_size(reservation.memory)} memory")
+        return reservation
+
+    def release(self, reservation: Reservation):
+        with self.condition:
+            self.reservedActions -= reservation.actions
+            self.reservedMemory -= reservation.memory
+            self.runningCount -= 1
+            self.condition.notify_all()
@@ -0,0 +1,345 @@
+import os
+import re
+import sys
+import json
+import html
+import time
+import hashlib
+import logging
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import common as cm
+import ue
+import log_filter as lf
+import log_diff as ld
+
+CRASHES_DIR = "Crashes"
+INDEX_FILE_PATH = "Uet/CrashIndex.jsonl"
+CRASH_CONTEXT_FILE_NAME = "CrashContext.runtime-xml"
+# Top frames after crash handling ones identify the crash, deeper ones differ with the way the code was reached
+SIGNATURE_FRAMES = 5
+SIGNATURE_SIZE = 12
+DEFAULT_TOP_GROUPS = 20
+PARSE_CHUNK_SIZE = 16
+MAX_MESSAGE_LENGTH = 300
+UNKNOWN_FUNCTION = "?"
+CONTEXT_FIELD_PATTERN = re.compile(r'<(CrashType|ErrorMessage|CallStack)>(.*?)</\1>', re.S)
+# `UnrealEditor_Core!FDebug::AssertFailed() [D:\...\AssertionMacros.cpp:425]` of crash context,
+# `0x00007ff6a1b2c3d4 UnrealEditor-Core.dll!FDebug::AssertFailed() [...]` of `[Callstack]` log lines
+FRAME_PATTERN = re.compile(r'^\s*(?:0x[0-9A-Fa-f]+\s+)?(?:(?P<module>[^!\s]+)!)?(?P<function>[^\[]*?)\s*(?:\[.*\])?\s*$')
+LOG_CALLSTACK_PATTERN = re.compile(r'\[Callstack\]\s*(.*)')
+LOG_MESSAGE_PATTERN = re.compile(r'(?:Assertion failed|Fatal error|Unhandled Exception|Ensure condition failed):.*')
+MODULE_SUFFIX_PATTERN = re.compile(r'\.(?:dll|exe|so(?:\.\d+)*|dylib)$', re.I)
+# Frames of crash reporting itself, skipped at the top of callstacks
+HANDLER_FRAME_PATTERN = re.compile(
+    r'^(?:FDebug::|FGeneric\w*Misc::|FWindows\w*Misc::|FUnix\w*Misc::|FMac\w*Misc::|FGenericCrashContext|'
+    r'F\w*ErrorOutputDevice|FOutputDevice|ReportAssert|ReportCrash|ReportEnsure|ReportHang|CheckVerifyFailed|'
+    r'DispatchCheckVerify|AssertFailedImpl|UE::Assert|CommonUnixCrashHandler|PlatformCrashHandler|RaiseException|'
+    r'KiUserExceptionDispatcher|__scrt|abort$|raise$)')
+SYSTEM_MODULES = {"kernelbase", "ntdll", "kernel32", "libc", "libpthread"}
+
+def get_crashes_path(sourcePath):
+    """Saved/Crashes of the project or build the path is in, or the path itself if it is a crashes directory"""
+    if os.path.basename(os.path.normpath(sourcePath)) == CRASHES_DIR:
+        return sourcePath
+    projectRootPath = ue.path.project.get_root_path_from_path(sourcePath)
+    if projectRootPath:
+        return os.path.join(os.path.dirname(ue.path.project.get_logs_path(projectRootPath)), CRASHES_DIR)
+    buildRootPath = ue.path.build.get_root_path_from_path(sourcePath)
+    if buildRootPath:
+        projectName = ue.project.split_build_name(ue.path.build.get_name_from_path(buildRootPath))[0]
+        return os.path.join(os.path.dirname(ue.path.build.get_logs_path(buildRootPath, projectName)), CRASHES_DIR)
+    return None
+
+def get_index_path(crashesPath):
+    return os.path.join(os.path.dirname(os.path.normpath(crashesPath)), INDEX_FILE_PATH)
+
+def normalize_module(module):
+    module = MODULE_SUFFIX_PATTERN.sub('', os.path.basename(module.replace('\\', '/')))
+    if module.startswith("lib"):
+        module = module[3:]
+    # Crash context writes `UnrealEditor_Core` for `UnrealEditor-Core.dll`
+    return module.replace('_', '-')
+
+def normalize_frame(line) -> Optional[str]:
+    """`Module!Function` without address, arguments, file and line, which change between builds"""
+    match = FRAME_PATTERN.match(line)
+    if not match or not line.strip():
+        return None
+    function = match.group('function').split('(', 1)[0].strip()
+    if not function or function == "UnknownFunction" or function.startswith("0x"):
+        function = UNKNOWN_FUNCTION
+    module = normalize_module(match.group('module')) if match.group('module') else ""
+    return f"{module}!{function}" if module else function
+
+def is_system_frame(frame):
+    # Frames without symbols are only module names
+    module, _, function = frame.rpartition('!')
+    return (module or function).lower() in SYSTEM_MODULES
+
+def is_handler_frame(frame):
+    return bool(HANDLER_FRAME_PATTERN.match(frame.rpartition('!')[2]))
+
+def normalize_callstack(lines) -> List[str]:
+    """Normalized frames without system ones and without crash reporting ones at the top"""
+    frames = [frame for frame in (normalize_frame(line) for line in lines) if frame and not is_system_frame(frame)]
+    start = 0
+    while start < len(frames) - 1 and is_handler_frame(frames[start]):
+        start += 1
+    return frames[start:]
+
+def get_signature(crashType, frames, message):
+    """Hash of top frames, or of the message without numbers when there is no callstack"""
+    key = "\n".join([crashType] + frames[:SIGNATURE_FRAMES]) if frames else crashType + "\n" + ld.VOLATILE_PATTERN.sub('#', message)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:SIGNATURE_SIZE]
+
+@dataclass
+class CrashRecord:
+    """Parsed crash folder, `mtime` identifies the folder version the record was made from"""
+    folder: str
+    mtime: float
+    crashType: str = "Crash"
+    message: str = ""
+    frames: List[str] = field(default_factory=list)
+    signature: str = ""
+
+    def to_json(self):
+        return {'folder': self.folder, 'mtime': self.mtime, 'type': self.crashType, 'message': self.message,
+                'frames': self.frames, 'signature': self.signature}
+
+    @classmethod
+    def from_json(cls, record):
+        return cls(record['folder'], record['mtime'], record.get('type', "Crash"), record.get('message', ""),
+                   record.get('frames', []), record.get('signature', ""))
+
+def read_text(filePath):
+    with open(filePath, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+def parse_crash_context(text):
+    """Fields of CrashContext.runtime-xml, read with a regex, so files truncated by the crash are read too"""
+    return {name: html.unescape(value).strip() for name, value in CONTEXT_FIELD_PATTERN.findall(text)}
+
+def parse_crash_log(filePath):
+    """Error message and `[Callstack]` lines UE writes to the log when it crashes"""
+    message = ""
+    callstack = []
+    with open(filePath, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = LOG_CALLSTACK_PATTERN.search(line)
+            if match:
+                callstack.append(match.group(1))
+                continue
+            if not message:
+                match = LOG_MESSAGE_PATTERN.search(line)
+                if match:
+                    message = match.group(0).strip()
+    return message, callstack
+
+def parse_crash_folder(folderPath) -> CrashRecord:
+    """Crash record of the folder from its crash context, or from its log when the context has no callstack"""
+    record = CrashRecord(os.path.basename(folderPath), os.path.getmtime(folderPath))
+    fields = {}
+    contextPath = os.path.join(folderPath, CRASH_CONTEXT_FILE_NAME)
+    try:
+        if os.path.isfile(contextPath):
+            fields = parse_crash_context(read_text(contextPath))
+        callstack = fields.get('CallStack', "").splitlines()
+        message = fields.get('ErrorMessage', "")
+        if not callstack or not message:
+            for fileName in sorted(os.listdir(folderPath)):
+                if fileName.endswith(".log"):
+                    logMessage, logCallstack = parse_crash_log(os.path.join(folderPath, fileName))
+                    callstack = callstack or logCallstack
+                    message = message or logMessage
+                    break
+    except OSError as e:
+        logging.warning(f"Unable to read crash folder '{folderPath}': {e}")
+        callstack, message = [], ""
+    record.crashType = fields.get('CrashType') or record.crashType
+    record.message = " ".join(message.split())[:MAX_MESSAGE_LENGTH]
+    record.frames = normalize_callstack(callstack)
+    record.signature = get_signature(record.crashType, record.frames, record.message)
+    return record
+
+def parse_crash_folders(folderPaths, jobs=None) -> List[CrashRecord]:
+    """Records of the folders in their order, parsed in `jobs` processes, all cores by default"""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(folderPaths) <= 1:
+        return [parse_crash_folder(folderPath) for folderPath in folderPaths]
+    executor = ProcessPoolExecutor(min(jobs, len(folderPaths)), initializer=lf.ignore_interrupt)
+    try:
+        records = list(executor.map(parse_crash_folder, folderPaths, chunksize=PARSE_CHUNK_SIZE))
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return records
+
+class CrashIndex:
+    """Append-only json lines file with records of parsed crash folders, folders are parsed once"""
+
+    def __init__(self, crashesPath, indexFilePath=None):
+        self.crashesPath = crashesPath
+        self.filePath = indexFilePath or get_index_path(crashesPath)
+
+    def read(self) -> Dict[str, CrashRecord]:
+        records = {}
+        if not os.path.isfile(self.filePath):
+            return records
+        with open(self.filePath) as f:
+            for line in f:
+                try:
+                    record = CrashRecord.from_json(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    logging.debug(f"Skipping broken crash index line: {line!r}")
+                    continue
+                records[record.folder] = record
+        return records
+
+    def write(self, records: List[CrashRecord], append=True):
+        os.makedirs(os.path.dirname(self.filePath), exist_ok=True)
+        lines = "".join(json.dumps(record.to_json(), separators=(',', ':')) + '\n' for record in records)
+        if append:
+            with open(self.filePath, 'a') as f:
+                f.write(lines)
+            return
+        tempFilePath = self.filePath + ".tmp"
+        with open(tempFilePath, 'w') as f:
+            f.write(lines)
+        os.replace(tempFilePath, self.filePath)
+
+    def get_folders(self) -> Dict[str, float]:
+        """Modification times of crash folders by their names"""
+        folders = {}
+        try:
+            entries = list(os.scandir(self.crashesPath))
+        except OSError:
+            return folders
+        for entry in entries:
+            if entry.is_dir():
+                folders[entry.name] = entry.stat().st_mtime
+        return folders
+
+    def update(self, jobs=None, rebuild=False) -> List[CrashRecord]:
+        """Parse folders which are not in the index yet, return records of all existing folders"""
+        folders = self.get_folders()
+        records = {} if rebuild else self.read()
+        stale = [name for name in records if name not in folders]
+        newFolders = sorted(name for name, mtime in folders.items() if name not in records or records[name].mtime != mtime)
+        logging.info(f"{len(folders)} crash folders, {len(newFolders)} new")
+
+        newRecords = []
+        if newFolders:
+            folderPaths = [os.path.join(self.crashesPath, name) for name in newFolders]
+            newRecords = parse_crash_folders(folderPaths, jobs)
+            for record in newRecords:
+                records[record.folder] = record
+
+        currentRecords = [record for name, record in records.items() if name in folders]
+        if rebuild or stale:
+            # Records of removed folders are dropped
+            self.write(currentRecords, append=False)
+        elif newRecords:
+            # Record of changed folder is appended after its old one, which is replaced with it when index is read
+            self.write(newRecords)
+        return currentRecords
+
+@dataclass
+class CrashGroup:
+    signature: str
+    records: List[CrashRecord] = field(default_factory=list)
+
+    def get_last(self) -> CrashRecord:
+        return max(self.records, key=lambda record: record.mtime)
+
+def group_crashes(records: List[CrashRecord]) -> List[CrashGroup]:
+    """Groups of crashes with the same signature, most frequent first"""
+    groups: Dict[str, CrashGroup] = {}
+    for record in records:
+        groups.setdefault(record.signature, CrashGroup(record.signature)).records.append(record)
+    return sorted(groups.values(), key=lambda group: (-len(group.records), -group.get_last().mtime))
+
+def format_mtime(mtime):
+    return time.strftime("%Y.%m.%d %H:%M", time.localtime(mtime))
+
+def print_groups(groups: List[CrashGroup], top=DEFAULT_TOP_GROUPS, frameCount=SIGNATURE_FRAMES):
+    print(f"{sum(len(group.records) for group in groups)} crashes in {len(groups)} groups")
+    for group in groups[:top]:
+        last = group.get_last()
+        print(f"\n[{group.signature}] {last.crashType} x{len(group.records)}, last {format_mtime(last.mtime)} in {last.folder}")
+        if last.message:
+            print(f"\t{last.message}")
+        for frame in last.frames[:frameCount]:
+            print(f"\t\t{frame}")
+    if len(groups) > top:
+        print(f"\n... {len(groups) - top} more groups")
+
+class CrashTriage:
+    def run(self):
+        sourcePath, settings = self.init()
+        if not sourcePath:
+            return 0
+        crashesPath = get_crashes_path(sourcePath)
+        if not crashesPath or not os.path.isdir(crashesPath):
+            logging.warning("No crashes directory found for the path " + str(sourcePath))
+            return 0
+        logging.info(f"Crashes directory '{crashesPath}'")
+        records = CrashIndex(crashesPath).update(settings.jobs, settings.rebuild)
+        print_groups(group_crashes(records), settings.top, settings.frames)
+        return 0
+
+    def init(self):
+        sourcePath, settings = self.process_args()
+        logging.debug("Input SourcePath: " + str(sourcePath))
+        if os.path.isdir(sourcePath):
+            return sourcePath, settings
+        else:
+            logging.warning("SourcePath is invalid: " + str(sourcePath))
+            return None, settings
+
+    def process_args(self):
+        parser = ArgumentParser()
+        cm.init_arg_parser(parser)
+        parser.add_argument("shellsource",
+                            help="directory inside of UE project or build, set by calling shell", metavar="SHELL_SOURCE")
+        parser.add_argument("-s", "--source", dest="source",
+                            help="directory inside of UE project or build or Saved/Crashes directory, set by user, "
+                                 "overrides value of 'shellsource' argument",
+                            metavar="SOURCE")
+        parser.add_argument("-n", "--top", dest="top", type=int, default=DEFAULT_TOP_GROUPS,
+                            help="number of most frequent crash groups shown", metavar="COUNT")
+        parser.add_argument("--frames", dest="frames", type=int, default=SIGNATURE_FRAMES,
+                            help="number of callstack frames shown for every group", metavar="COUNT")
+        parser.add_argument("-j", "--jobs", dest="jobs", type=int,
+                            help="number of processes parsing new crash folders, all cores by default", metavar="JOBS")
+        parser.add_argument("--rebuild", dest="rebuild", action="store_true", default=False,
+                            help=f"parse all crash folders again instead of only ones missing in Saved/{INDEX_FILE_PATH}")
+
+        parsedArgs = parser.parse_args()
+        self.onlyDebug = cm.process_parsed_args(parsedArgs)
+
+        logging.debug("Parsing arguments: '" + ' '.join(sys.argv[1:]) + "'")
+        logging.debug("Result is: " + str(parsedArgs))
+
+        if not parsedArgs.source:
+            parsedArgs.source = parsedArgs.shellsource
+
+        return parsedArgs.source, parsedArgs
+
+def main():
+    print("Crash report triage for Unreal Engine project/build")
+    triage = CrashTriage()
+    return triage.run()
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print('Interrupted by user')
+        try:
+            sys.exit(0)
+        except SystemExit:
+            os._exit(0)
@@ -0,0 +1,112 @@
+import os
+import gzip
+import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_EXTENSION = ".gz"
+ZSTD_EXTENSION = ".zst"
+COMPRESSED_EXTENSIONS = (GZIP_EXTENSION, ZSTD_EXTENSION)
+# UE renames the previous log to `<Project>-backup-<date>.log` when it starts a new one
+ROTATED_LOG_MARK = "-backup-"
+# Processed logs written next to logs, they are caches with metadata and are not archived
+PROCESSED_LOG_PREFIX = "_Processed_"
+TEMP_EXTENSION = ".part"
+COPY_SIZE = 1024 * 1024
+# Lower than the default 9, which is several times slower for little gain on logs
+GZIP_LEVEL = 6
+
+def is_compressed(filePath):
+    return filePath.endswith(COMPRESSED_EXTENSIONS)
+
+def strip_compressed_extension(filePath):
+    for extension in COMPRESSED_EXTENSIONS:
+        if filePath.endswith(extension):
+            return filePath[:-len(extension)]
+    return filePath
+
+def get_archive_extension():
+    """zstd when `zstandard` package is installed, it is faster to compress and to read, gzip otherwise"""
+    return ZSTD_EXTENSION if zstandard else GZIP_EXTENSION
+
+def open_log(filePath, mode='rb'):
+    """Open plain or compressed log, text modes decode it with the default encoding of `open`"""
+    if filePath.endswith(GZIP_EXTENSION):
+        return gzip.open(filePath, mode if 'b' in mode else mode.replace('t', '') + 't')
+    if filePath.endswith(ZSTD_EXTENSION):
+        if zstandard is None:
+            raise OSError(f"'zstandard' package is required to read '{filePath}'")
+        return zstandard.open(filePath, mode)
+    return open(filePath, mode)
+
+def is_rotated_log(fileName):
+    return ROTATED_LOG_MARK in fileName and fileName.endswith(".log") and not fileName.startswith(PROCESSED_LOG_PREFIX)
+
+def get_rotated_logs(logsPath) -> List[str]:
+    try:
+        fileNames = os.listdir(logsPath)
+    except OSError:
+        return []
+    return sorted(os.path.join(logsPath, fileName) for fileName in fileNames
+                  if is_rotated_log(fileName) and os.path.isfile(os.path.join(logsPath, fileName)))
+
+def create_writer(outFile, extension, fileName):
+    if extension == ZSTD_EXTENSION:
+        return zstandard.ZstdCompressor().stream_writer(outFile, closefd=False)
+    return gzip.GzipFile(fileName, 'wb', GZIP_LEVEL, outFile)
+
+def compress_log(filePath, extension=None):
+    """Compress the log next to it as a stream and remove it, None when the log changed meanwhile.
+
+    Compressed log gets modification time of the log, so logs keep their order. Until it is complete it is
+    written to a temporary file, so interrupted archiving never leaves a truncated log instead of the original.
+    """
+    extension = extension or get_archive_extension()
+    archivePath = filePath + extension
+    tempPath = archivePath + TEMP_EXTENSION
+    try:
+        with open(filePath, 'rb') as inFile:
+            stat = os.fstat(inFile.fileno())
+            with open(tempPath, 'wb') as outFile:
+                with create_writer(outFile, extension, os.path.basename(filePath)) as writer:
+                    shutil.copyfileobj(inFile, writer, COPY_SIZE)
+        currentStat = os.stat(filePath)
+        if (currentStat.st_size, currentStat.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            logging.warning(f"Log was written while it was compressed, keeping it '{filePath}'")
+            os.remove(tempPath)
+            return None
+        os.utime(tempPath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tempPath, archivePath)
+        os.remove(filePath)
+    except BaseException:
+        if os.path.isfile(tempPath):
+            os.remove(tempPath)
+        raise
+    return archivePath
+
+def archive_logs(logsPath, jobs=None, extension=None):
+    """Compress rotated logs of the directory in a thread pool, compressors release GIL, return compressed paths"""
+    filePaths = get_rotated_logs(logsPath)
+    if not filePaths:
+        logging.info(f"No rotated logs to archive in '{logsPath}'")
+        return []
+    archivePaths = []
+    with ThreadPoolExecutor(max(1, min(jobs or os.cpu_count() or 1, len(filePaths)))) as executor:
+        futures = {executor.submit(compress_log, filePath, extension): filePath for filePath in filePaths}
+        for future in as_completed(futures):
+            filePath = futures[future]
+            try:
+                archivePath = future.result()
+            except OSError as e:
+                logging.warning(f"Unable to archive '{filePath}': {e}")
+                continue
+            if archivePath:
+                logging.info(f"Archived '{os.path.basename(filePath)}' to {os.path.getsize(archivePath)} bytes")
+                archivePaths.append(archivePath)
+    return sorted(archivePaths)
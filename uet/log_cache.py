@@ -0,0 +1,164 @@
+import os
+import json
+import hashlib
+import logging
+from dataclasses import dataclass, asdict
+from typing import Optional
+import log_filter as lf
+import log_index as li
+import log_search
+import log_archive as la
+
+CACHE_VERSION = 1
+METADATA_EXTENSION = ".json"
+READ_SIZE = 64 * 1024
+
+def get_cached_log_path(logFilePath, extension=""):
+    """`_Processed_<log file name>` next to the log, one processed log per log instead of one per view.
+
+    Processed log of compressed log is not compressed unless `extension` of a compressed file is given.
+    """
+    fileName = la.strip_compressed_extension(os.path.basename(logFilePath))
+    return os.path.join(os.path.dirname(logFilePath), log_search.PROCESSED_LOG_PREFIX + fileName + extension)
+
+def get_rules_hash(logFilter: lf.LogFilter):
+    """Hash of rules and mode of the filter, bytes filter keeps line endings, so its output differs"""
+    rules = [(rule.pattern.pattern, rule.pattern.flags, rule.repl) for rule in logFilter.rules]
+    return hashlib.sha1(repr((CACHE_VERSION, logFilter.isBytes, rules)).encode('utf-8')).hexdigest()
+
+def hash_range(f, start, end):
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+def find_line_end(f, start, size):
+    """Position after the last newline between `start` and `size`, `start` when there is none"""
+    position = size
+    while position > start:
+        blockStart = max(start, position - READ_SIZE)
+        f.seek(blockStart)
+        newline = f.read(position - blockStart).rfind(b'\n')
+        if newline >= 0:
+            return blockStart + newline + 1
+        position = blockStart
+    return start
+
+@dataclass
+class CacheEntry:
+    """State of the log the processed log was made from, `end` is the end of its processed part"""
+    rulesHash: str
+    device: int
+    inode: int
+    size: int
+    mtime: int
+    end: int
+    headHash: str
+    # Hash of the bytes before `end`, the log has to contain them to continue processing after it
+    tailHash: str
+    outputSize: int
+    # Output of the incomplete last line after `end`, replaced on the next update
+    tailOutputSize: int = 0
+
+    def is_same_log(self, stat, rulesHash):
+        return (self.rulesHash, self.device, self.inode) == (rulesHash, stat.st_dev, stat.st_ino) and stat.st_size >= self.end
+
+    def is_unchanged(self, stat):
+        return (self.size, self.mtime) == (stat.st_size, stat.st_mtime_ns)
+
+class ProcessedLogCache:
+    """Processed log kept next to the log and reused while neither the log nor filter rules change.
+
+    Log is identified by its device, inode, size and modification time, and by hashes of its head and of the bytes
+    before its processed part. When UE only appended lines to the log, they are filtered and appended to the
+    processed log. When the log was replaced, for example rotated by UE, or rules changed, it is processed again.
+    Incomplete last line, common at the end of logs of crashed processes, is written after the processed part,
+    but is not a part of it. It is processed again with the rest of it on the next update, so output stays aligned
+    with the lines of the log.
+    Compressed logs are processed as a whole. Processed log may be written compressed with gzip, appended lines
+    are written as new gzip members then, which readers of gzip files read as one file.
+    """
+
+    def __init__(self, logFilePath, logFilter: lf.LogFilter, cachedFilePath=None, compressOutput=False):
+        self.logFilePath = logFilePath
+        self.logFilter = logFilter
+        self.cachedFilePath = cachedFilePath or get_cached_log_path(logFilePath, la.GZIP_EXTENSION if compressOutput else "")
+        self.metadataFilePath = self.cachedFilePath + METADATA_EXTENSION
+        self.rulesHash = get_rules_hash(logFilter)
+
+    def load(self) -> Optional[CacheEntry]:
+        try:
+            with open(self.metadataFilePath, 'r') as f:
+                return CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, entry: CacheEntry):
+        with open(self.metadataFilePath, 'w') as f:
+            json.dump(asdict(entry), f)
+
+    def get_valid_entry(self, stat, logFile) -> Optional[CacheEntry]:
+        """Entry of the processed log which can be continued, None when the log has to be processed again"""
+        entry = self.load()
+        if entry is None or not entry.is_same_log(stat, self.rulesHash):
+            return None
+        try:
+            if os.path.getsize(self.cachedFilePath) != entry.outputSize + entry.tailOutputSize:
+                return None
+        except OSError:
+            return None
+        if entry.is_unchanged(stat):
+            return entry
+        if entry.headHash != hash_range(logFile, 0, min(li.HEAD_SIZE, entry.end)):
+            return None
+        if entry.tailHash != hash_range(logFile, max(0, entry.end - li.HEAD_SIZE), entry.end):
+            return None
+        return entry
+
+    def update(self, jobs=1):
+        """Bring processed log up to date with the log, return its path"""
+        with open(self.logFilePath, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            entry = self.get_valid_entry(stat, f)
+            if entry and entry.is_unchanged(stat):
+                logging.info(f"Processed log is up to date '{self.cachedFilePath}'")
+                return self.cachedFilePath
+            isCompressed = la.is_compressed(self.logFilePath)
+            if entry and not self.logFilter.is_streaming():
+                logging.info("Not all rules are line local, appended lines are processed with the whole log")
+                entry = None
+            elif entry and isCompressed:
+                entry = None
+
+            start = entry.end if entry else 0
+            # Incomplete last line is processed again on the next update, compressed log is complete
+            end = stat.st_size if isCompressed else find_line_end(f, start, stat.st_size)
+
+            if entry:
+                logging.info(f"Processing {end - start} bytes appended to the log")
+                # Drops output of an update interrupted before its metadata was saved
+                # and output of the incomplete last line
+                with open(self.cachedFilePath, 'r+b') as outFile:
+                    outFile.truncate(entry.outputSize)
+            else:
+                logging.info("Processing log")
+                # Processed log is incomplete until the new metadata is saved
+                if os.path.isfile(self.metadataFilePath):
+                    os.remove(self.metadataFilePath)
+            mode = 'a' if entry else 'w'
+            with la.open_log(self.cachedFilePath, mode + 'b' if self.logFilter.isBytes else mode) as outFile:
+                if isCompressed:
+                    with la.open_log(self.logFilePath, 'rb' if self.logFilter.isBytes else 'r') as inFile:
+                        self.logFilter.filter_file(inFile, outFile)
+                else:
+                    self.logFilter.filter_file_parallel(self.logFilePath, outFile, jobs, start=start, end=end)
+            outputSize = os.path.getsize(self.cachedFilePath)
+            if end < stat.st_size:
+                # Written as a separate gzip member for compressed output, so it can be truncated away
+                with la.open_log(self.cachedFilePath, 'ab' if self.logFilter.isBytes else 'a') as outFile:
+                    self.logFilter.filter_file_parallel(self.logFilePath, outFile, 1, start=end, end=stat.st_size)
+
+            headSize = min(li.HEAD_SIZE, end)
+            tailOutputSize = os.path.getsize(self.cachedFilePath) - outputSize
+            self.save(CacheEntry(self.rulesHash, stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, end,
+                                 hash_range(f, 0, headSize), hash_range(f, max(0, end - li.HEAD_SIZE), end),
+                                 outputSize, tailOutputSize))
+        return self.cachedFilePath
@@ -0,0 +1,121 @@
+import re
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import log_parse as lp
+import log_filter as lf
+import log_archive as la
+
+# Parts of messages which differ between runs of the same code: pointers, GUIDs and numbers, including object
+# name suffixes like `BP_Player_C_0` or `StaticMeshActor_12`. Digits after letters, like in `UE5` or `x64`, are kept.
+VOLATILE_PATTERN = re.compile(r'0x[0-9A-Fa-f]+|[0-9A-Fa-f]{8}(?:-[0-9A-Fa-f]{4}){3}-[0-9A-Fa-f]{12}|(?<![A-Za-z\d])\d+(?:\.\d+)?')
+VOLATILE_PLACEHOLDER = '#'
+SIGNATURE_SIZE = 8
+# Only start of long lines is kept to show them in the report
+MAX_EXAMPLE_LENGTH = 200
+# Message count has to change at least this many times and by this many lines to be reported
+FREQUENCY_RATIO = 2.0
+MIN_COUNT_DIFFERENCE = 5
+MAX_REPORTED_MESSAGES = 50
+
+def normalize_line(line):
+    """Line without time and frame of its prefix and with volatile parts of the message replaced"""
+    match = lp.TEXT_LINE_PREFIX_PATTERN.match(line)
+    if match:
+        category, verbosity = match.group('category', 'verbosity')
+        line = f"{category}: {verbosity or lp.DEFAULT_VERBOSITY}: {line[match.end():]}"
+    return VOLATILE_PATTERN.sub(VOLATILE_PLACEHOLDER, line.rstrip('\r\n'))
+
+def get_signature(normalizedLine):
+    """Hash of the line which is the same in every process, unlike `hash`"""
+    return hashlib.blake2b(normalizedLine.encode('utf-8'), digest_size=SIGNATURE_SIZE).digest()
+
+@dataclass
+class LogSignatures:
+    """Counts of normalized lines of the log by their signatures, with an example of every line"""
+    counts: Counter = field(default_factory=Counter)
+    examples: Dict[bytes, str] = field(default_factory=dict)
+
+    def add(self, normalizedLine):
+        signature = get_signature(normalizedLine)
+        if signature not in self.counts:
+            self.examples[signature] = normalizedLine[:MAX_EXAMPLE_LENGTH]
+        self.counts[signature] += 1
+
+def collect_signatures(filePath, logFilter: Optional[lf.LogFilter] = None) -> LogSignatures:
+    """Signatures of filtered lines of plain or compressed log.
+
+    Log is read line by line, so memory depends only on the number of different messages, not on log size.
+    Rules which are not line local are applied to every line separately.
+    """
+    signatures = LogSignatures()
+    with la.open_log(filePath, 'r') as f:
+        lines = logFilter.filter_lines(f) if logFilter and logFilter.rules else f
+        for line in lines:
+            normalizedLine = normalize_line(line)
+            if normalizedLine:
+                signatures.add(normalizedLine)
+    return signatures
+
+@dataclass
+class LogDiff:
+    """Messages of the second log which are absent in the first one, vanished messages and ones with changed counts"""
+    new: List[Tuple[int, str]] = field(default_factory=list)
+    vanished: List[Tuple[int, str]] = field(default_factory=list)
+    changed: List[Tuple[int, int, str]] = field(default_factory=list)
+
+    def is_empty(self):
+        return not (self.new or self.vanished or self.changed)
+
+def is_frequency_changed(countA, countB):
+    if abs(countA - countB) < MIN_COUNT_DIFFERENCE:
+        return False
+    return max(countA, countB) >= FREQUENCY_RATIO * min(countA, countB)
+
+def diff_signatures(a: LogSignatures, b: LogSignatures) -> LogDiff:
+    diff = LogDiff()
+    for signature, count in b.counts.items():
+        countA = a.counts.get(signature, 0)
+        if countA == 0:
+            diff.new.append((count, b.examples[signature]))
+        elif is_frequency_changed(countA, count):
+            diff.changed.append((countA, count, b.examples[signature]))
+    diff.vanished = [(count, a.examples[signature]) for signature, count in a.counts.items() if signature not in b.counts]
+    diff.new.sort(key=lambda item: (-item[0], item[1]))
+    diff.vanished.sort(key=lambda item: (-item[0], item[1]))
+    diff.changed.sort(key=lambda item: (-abs(item[1] - item[0]), item[2]))
+    return diff
+
+def diff_logs(filePathA, filePathB, logFilter=None, jobs=2) -> LogDiff:
+    """Diff of normalized lines of two logs, each log is read in its own process when `jobs` allows"""
+    if jobs <= 1:
+        return diff_signatures(collect_signatures(filePathA, logFilter), collect_signatures(filePathB, logFilter))
+    executor = ProcessPoolExecutor(2, initializer=lf.ignore_interrupt)
+    try:
+        futureA = executor.submit(collect_signatures, filePathA, logFilter)
+        futureB = executor.submit(collect_signatures, filePathB, logFilter)
+        diff = diff_signatures(futureA.result(), futureB.result())
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return diff
+
+def print_messages(title, messages, limit=MAX_REPORTED_MESSAGES):
+    """Print counts and examples of messages, counts in the first log and in the second one for changed ones"""
+    print(f"{title}: {len(messages)}")
+    for message in messages[:limit]:
+        counts = " -> ".join(str(count) for count in message[:-1])
+        print(f"\t{counts:>14}  {message[-1]}")
+    if len(messages) > limit:
+        print(f"\t... {len(messages) - limit} more")
+
+def print_diff(diff: LogDiff, nameA, nameB, limit=MAX_REPORTED_MESSAGES):
+    if diff.is_empty():
+        print(f"No differences between '{nameA}' and '{nameB}'")
+        return
+    print_messages(f"New in '{nameB}'", diff.new, limit)
+    print_messages(f"Vanished from '{nameA}'", diff.vanished, limit)
+    print_messages("Changed frequency", diff.changed, limit)
@@ -0,0 +1,611 @@
+import io
+import os
+import re
+import mmap
+import signal
+import locale
+import logging
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+try:
+    # Python 3.11+
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+NEWLINE = ord('\n')
+NEWLINE_CATEGORIES = (sre_constants.CATEGORY_SPACE, sre_constants.CATEGORY_NOT_DIGIT,
+                      sre_constants.CATEGORY_NOT_WORD, sre_constants.CATEGORY_LINEBREAK)
+STRING_ANCHORS = (sre_constants.AT_BEGINNING_STRING, sre_constants.AT_END_STRING)
+LINE_ANCHORS = (sre_constants.AT_BEGINNING, sre_constants.AT_END)
+CATEGORY_SEPARATOR = ": "
+CATEGORY_PATTERN = re.compile(r'\w+')
+# Parts of the log filtered by one process, big enough for process communication to be negligible
+PARALLEL_CHUNK_SIZE = 16 * 1024 * 1024
+REPEAT_OPS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, 'POSSESSIVE_REPEAT', None))
+WORD_BOUNDARIES = (sre_constants.AT_BOUNDARY, sre_constants.AT_NON_BOUNDARY)
+
+def get_newline(text):
+    return '\n' if isinstance(text, str) else b'\n'
+
+def get_category_separator(text):
+    return CATEGORY_SEPARATOR if isinstance(text, str) else CATEGORY_SEPARATOR.encode('utf-8')
+
+class RuleKind:
+    # Any regular expression
+    REGEX = "regex"
+    # `.*TEXT.*\n` removes lines containing TEXT
+    REMOVE_LINE = "remove line"
+    # `.*TEXT` replaces everything up to the last TEXT in line with plain replacement
+    CUT_BEFORE = "cut before"
+
+@dataclass
+class FilterRule:
+    """Compiled filter rule, `isLineLocal` rules give the same result applied line by line as applied to whole log.
+
+    Rules of the shapes `view_logs` helpers create are recognized, `literal` is their text and they are applied
+    to single lines with string operations. For other rules `literal` is text every match contains, if there is such.
+    Rules made by `to_bytes_rule` have bytes pattern, replacement and literal and are applied to bytes.
+    """
+    pattern: re.Pattern
+    repl: Union[str, bytes]
+    isLineLocal: bool
+    kind: str = RuleKind.REGEX
+    literal: Optional[Union[str, bytes]] = None
+
+    def apply(self, text):
+        # String operations are used only for single lines, same as `re.sub` but without backtracking
+        newline = get_newline(text)
+        if self.kind != RuleKind.REGEX and text.find(newline, 0, len(text) - 1) < 0:
+            if self.kind == RuleKind.REMOVE_LINE:
+                return text[:0] if text.endswith(newline) and self.literal in text else text
+            position = text.rfind(self.literal)
+            return text if position < 0 else self.repl + text[position + len(self.literal):]
+        return self.pattern.sub(self.repl, text)
+
+    def apply_counted(self, text):
+        """Result of `apply` and the number of matches it replaced"""
+        newline = get_newline(text)
+        if self.kind != RuleKind.REGEX and text.find(newline, 0, len(text) - 1) < 0:
+            if self.kind == RuleKind.REMOVE_LINE:
+                matches = int(text.endswith(newline) and self.literal in text)
+                return (text[:0] if matches else text), matches
+            position = text.rfind(self.literal)
+            return (text, 0) if position < 0 else (self.repl + text[position + len(self.literal):], 1)
+        return self.pattern.subn(self.repl, text)
+
+    def get_category(self):
+        """Log category the rule is about, for example `LogNet` of `.*LogNet: .*\n`"""
+        if self.kind == RuleKind.REGEX:
+            return None
+        separator = get_category_separator(self.literal)
+        if self.literal.endswith(separator):
+            category = self.literal[:-len(separator)]
+            if CATEGORY_PATTERN.fullmatch(category if isinstance(category, str) else category.decode('utf-8', 'replace')):
+                return category
+
+def is_class_matching_newline(items):
+    negate = False
+    matches = False
+    for op, av in items:
+        if op == sre_constants.NEGATE:
+            negate = True
+        elif op == sre_constants.LITERAL:
+            matches = matches or av == NEWLINE
+        elif op == sre_constants.RANGE:
+            matches = matches or av[0] <= NEWLINE <= av[1]
+        elif op == sre_constants.CATEGORY:
+            matches = matches or av in NEWLINE_CATEGORIES
+        else:
+            # Unknown set item, assume the worst
+            matches = True
+    return matches != negate
+
+def can_cross_lines(items, flags):
+    """True when parsed pattern items can match newline or depend on text outside of the line"""
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            if av == NEWLINE:
+                return True
+        elif op == sre_constants.NOT_LITERAL:
+            if av != NEWLINE:
+                return True
+        elif op == sre_constants.ANY:
+            if flags & re.DOTALL:
+                return True
+        elif op == sre_constants.IN:
+            if is_class_matching_newline(av):
+                return True
+        elif op == sre_constants.AT:
+            if av in STRING_ANCHORS or (av in LINE_ANCHORS and not flags & re.MULTILINE):
+                return True
+        elif op == sre_constants.BRANCH:
+            if any(can_cross_lines(branch, flags) for branch in av[1]):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            # (group, add flags, del flags, pattern)
+            if can_cross_lines(av[-1], (flags | av[1]) & ~av[2]):
+                return True
+        elif op in REPEAT_OPS:
+            if can_cross_lines(av[2], flags):
+                return True
+        elif op == getattr(sre_constants, 'ATOMIC_GROUP', None):
+            if can_cross_lines(av, flags):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if can_cross_lines(av[1], flags):
+                return True
+        else:
+            # Back references, conditional groups and everything else is not analysed
+            return True
+    return False
+
+def strip_trailing_newline(items):
+    """Pattern items without the final newline literal, also inside of the final group"""
+    items = list(items)
+    if not items:
+        return items
+    op, av = items[-1]
+    if op == sre_constants.LITERAL and av == NEWLINE:
+        return items[:-1]
+    if op == sre_constants.SUBPATTERN:
+        group, addFlags, delFlags, subpattern = av
+        return items[:-1] + [(op, (group, addFlags, delFlags, strip_trailing_newline(subpattern)))]
+    return items
+
+def is_line_local_rule(pattern, flags=0):
+    """True when the pattern matches only inside of single line, optionally ending with its newline.
+
+    Such rules can be applied to every line separately with the same result as one `re.sub` over whole log,
+    which is the case for all rules created by `view_logs` helpers.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, TypeError):
+        return False
+    # Inline flags like (?s) are collected by parser
+    flags |= (parsed.state if hasattr(parsed, 'state') else parsed.pattern).flags
+    if parsed.getwidth()[0] == 0:
+        # Empty matches at line boundaries depend on the following line
+        return False
+    return not can_cross_lines(strip_trailing_newline(parsed), flags)
+
+def is_any_repeat(item):
+    op, av = item
+    return op == sre_constants.MAX_REPEAT and av[0] == 0 and av[1] == sre_constants.MAXREPEAT and list(av[2]) == [(sre_constants.ANY, None)]
+
+def get_literal_runs(items):
+    """Runs of literal characters every match of the items contains"""
+    runs = []
+    current = ''
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            current += chr(av)
+            continue
+        if current:
+            runs.append(current)
+            current = ''
+        if op == sre_constants.SUBPATTERN and not av[1] & re.IGNORECASE:
+            runs.extend(get_literal_runs(av[-1]))
+    if current:
+        runs.append(current)
+    return runs
+
+def analyse_rule(pattern, repl, flags):
+    """Return (kind, literal) of the rule"""
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, TypeError):
+        return RuleKind.REGEX, None
+    flags |= (parsed.state if hasattr(parsed, 'state') else parsed.pattern).flags
+    if flags & (re.IGNORECASE | re.DOTALL):
+        return RuleKind.REGEX, None
+
+    items = list(parsed)
+    literal = ''
+    index = 1
+    while index < len(items) and items[index][0] == sre_constants.LITERAL and items[index][1] != NEWLINE:
+        literal += chr(items[index][1])
+        index += 1
+    if items and is_any_repeat(items[0]) and literal:
+        rest = items[index:]
+        if not rest and '\\' not in repl:
+            return RuleKind.CUT_BEFORE, literal
+        if len(rest) == 2 and is_any_repeat(rest[0]) and rest[1] == (sre_constants.LITERAL, NEWLINE) and not repl:
+            return RuleKind.REMOVE_LINE, literal
+
+    runs = get_literal_runs(items)
+    return RuleKind.REGEX, max(runs, key=len) if runs else None
+
+def compile_rule(pattern, repl, flags=0):
+    kind, literal = analyse_rule(pattern, repl, flags)
+    return FilterRule(re.compile(pattern, flags), repl, is_line_local_rule(pattern, flags), kind, literal)
+
+def starts_with_any_repeat(items):
+    """True for patterns starting with unbounded repeat of any character, like `.*` or `(.+)`"""
+    items = list(items)
+    if not items:
+        return False
+    op, av = items[0]
+    if op == sre_constants.SUBPATTERN:
+        return starts_with_any_repeat(av[-1])
+    return (op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[1] == sre_constants.MAXREPEAT
+            and list(av[2]) == [(sre_constants.ANY, None)])
+
+def has_nested_repeat(items, isRepeated=False):
+    """True when unbounded repeat contains another repeat, like `(a+)+`, its failed matches try every split of the text"""
+    for op, av in items:
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            if isRepeated and av[1] > 1:
+                return True
+            if has_nested_repeat(av[2], isRepeated or av[1] == sre_constants.MAXREPEAT):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            if has_nested_repeat(av[-1], isRepeated):
+                return True
+        elif op == sre_constants.BRANCH:
+            if any(has_nested_repeat(branch, isRepeated) for branch in av[1]):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if has_nested_repeat(av[1], isRepeated):
+                return True
+        # Atomic groups and possessive repeats do not backtrack
+    return False
+
+def get_backtracking_shapes(rule: FilterRule, isStreaming=True):
+    """Descriptions of the rule pattern shapes which make regular expression matching backtrack a lot.
+
+    Rules `apply` handles with string operations are not matched as regular expressions when lines are filtered
+    one by one, their leading `.*` costs nothing then.
+    """
+    pattern = rule.pattern.pattern
+    try:
+        parsed = sre_parse.parse(pattern, rule.pattern.flags)
+    except (re.error, TypeError):
+        return []
+    shapes = []
+    if starts_with_any_repeat(parsed) and (rule.kind == RuleKind.REGEX or not isStreaming):
+        multiline = " under re.M" if rule.pattern.flags & re.MULTILINE else ""
+        shapes.append(f"unanchored leading '.*'{multiline} is retried from every position of every line, "
+                      "start it with '^' or a literal")
+    if has_nested_repeat(parsed):
+        shapes.append("nested repeats like '(a+)+' try exponentially many ways to match before failing")
+    return shapes
+
+def is_ascii_class(items, flags):
+    """True for classes matching only ASCII characters, their bytes never occur inside of UTF-8 multibyte characters"""
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            if av >= 0x80:
+                return False
+        elif op == sre_constants.RANGE:
+            if av[1] >= 0x80:
+                return False
+        elif op == sre_constants.CATEGORY:
+            # \d, \s and \w match Unicode characters in text patterns
+            if not flags & re.ASCII:
+                return False
+        else:
+            # Negated classes match parts of multibyte characters
+            return False
+    return True
+
+def is_any_character(item):
+    """True for `.` and `[^x]` with ASCII x, both match any non-ASCII character"""
+    op, av = item
+    if op == sre_constants.ANY:
+        return True
+    if op == sre_constants.NOT_LITERAL:
+        return av < 0x80
+    if op == sre_constants.IN and av and av[0][0] == sre_constants.NEGATE:
+        return is_ascii_class(av[1:], re.ASCII)
+    return False
+
+def is_byte_safe(items, flags, isRepeated=False):
+    """True when the items match the same parts of UTF-8 encoded text as of the text itself.
+
+    Such are ASCII literals, ASCII classes and repeats of any character starting from zero, which can not end
+    inside of a multibyte character. Non-ASCII literals are safe outside of repeats, they are encoded to the same
+    byte sequences as the text. Anything depending on Unicode classes or case folding is not.
+    """
+    if flags & re.IGNORECASE and not flags & re.ASCII:
+        return False
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            if av >= 0x80 and isRepeated:
+                return False
+        elif op == sre_constants.IN:
+            if not is_ascii_class(av, flags):
+                return False
+        elif op == sre_constants.AT:
+            if av in WORD_BOUNDARIES and not flags & re.ASCII:
+                return False
+        elif op == sre_constants.BRANCH:
+            if not all(is_byte_safe(branch, flags, isRepeated) for branch in av[1]):
+                return False
+        elif op == sre_constants.SUBPATTERN:
+            if not is_byte_safe(av[-1], (flags | av[1]) & ~av[2], isRepeated):
+                return False
+        elif op in REPEAT_OPS:
+            minCount, maxCount, subpattern = av
+            subpattern = list(subpattern)
+            if len(subpattern) == 1 and is_any_character(subpattern[0]):
+                if minCount != 0 or maxCount != sre_constants.MAXREPEAT:
+                    return False
+            elif not is_byte_safe(subpattern, flags, True):
+                return False
+        elif op == getattr(sre_constants, 'ATOMIC_GROUP', None):
+            if not is_byte_safe(av, flags, isRepeated):
+                return False
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if not is_byte_safe(av[1], flags, isRepeated):
+                return False
+        elif op != sre_constants.GROUPREF:
+            # Single `.` matches one byte of multibyte character, conditional groups are not analysed
+            return False
+    return True
+
+def to_bytes_rule(rule: FilterRule) -> Optional[FilterRule]:
+    """Same rule for UTF-8 encoded log, None when it could match bytes differently than text"""
+    pattern = rule.pattern.pattern
+    # Text patterns always have UNICODE flag, bytes patterns can not have it
+    flags = rule.pattern.flags & ~re.UNICODE
+    if rule.kind == RuleKind.REGEX:
+        try:
+            parsed = sre_parse.parse(pattern, flags)
+        except (re.error, TypeError):
+            return None
+        if not is_byte_safe(parsed, flags | (parsed.state if hasattr(parsed, 'state') else parsed.pattern).flags):
+            return None
+    try:
+        bytesPattern = re.compile(pattern.encode('utf-8'), flags)
+    except re.error:
+        # Escapes like \u are valid only in text patterns
+        return None
+    literal = rule.literal.encode('utf-8') if rule.literal else rule.literal
+    return FilterRule(bytesPattern, rule.repl.encode('utf-8'), rule.isLineLocal, rule.kind, literal)
+
+class RuleMatcher:
+    """Finds rules which can change a line without trying every rule on it.
+
+    Category rules are kept in a table by category, the line is looked up there by text before every `: `
+    in it, which is where UE puts category names. Other rules with known literal text are tried only when
+    the line contains it, only regular expressions without such text are tried on every line.
+    When every rule has literal text, lines to check in a big buffer are found by one search for all of them.
+    """
+
+    def __init__(self, rules: List[FilterRule], isBytes=False):
+        self.categoryRules: Dict[str, List[int]] = {}
+        self.literalRules: Dict[str, List[int]] = {}
+        self.otherRules: List[int] = []
+        for index, rule in enumerate(rules):
+            category = rule.get_category()
+            if category:
+                self.categoryRules.setdefault(category, []).append(index)
+            elif rule.literal:
+                self.literalRules.setdefault(rule.literal, []).append(index)
+            else:
+                self.otherRules.append(index)
+        self.categoryLengths = sorted({len(category) for category in self.categoryRules})
+        self.separator = CATEGORY_SEPARATOR.encode('utf-8') if isBytes else CATEGORY_SEPARATOR
+        # Text some rule may change contains one of these, so lines between its matches are skipped as a whole
+        literals = [category + self.separator for category in self.categoryRules] + list(self.literalRules)
+        alternation = b'|' if isBytes else '|'
+        self.literalPattern = re.compile(alternation.join(map(re.escape, literals))) if literals and not self.otherRules else None
+
+    def get_rule_indices(self, line, startIndex=0, start=0, end=None):
+        """Sorted indices of rules starting from `startIndex` which may change the line.
+
+        The line can be a part of bigger text or buffer from `start` to `end`, so it is not copied to be checked.
+        """
+        end = len(line) if end is None else end
+        indices = [index for index in self.otherRules if index >= startIndex]
+        if self.categoryRules:
+            position = line.find(self.separator, start, end)
+            while position >= 0:
+                for length in self.categoryLengths:
+                    if length > position - start:
+                        break
+                    indices.extend(self.categoryRules.get(line[position - length:position], ()))
+                position = line.find(self.separator, position + 1, end)
+        for literal, literalIndices in self.literalRules.items():
+            if line.find(literal, start, end) >= 0:
+                indices.extend(literalIndices)
+        return sorted({index for index in indices if index >= startIndex})
+
+    def get_candidate_lines(self, data, start=0, end=None):
+        """Yield (start, end) of lines in `data` which some rule may change, with their newlines"""
+        end = len(data) if end is None else end
+        newline = get_newline(self.separator)
+        position = start
+        if self.literalPattern is not None:
+            while position < end:
+                match = self.literalPattern.search(data, position, end)
+                if match is None:
+                    return
+                lineStart = data.rfind(newline, position, match.start())
+                lineStart = position if lineStart < 0 else lineStart + 1
+                lineEnd = data.find(newline, match.start(), end)
+                position = end if lineEnd < 0 else lineEnd + 1
+                yield lineStart, position
+        elif self.otherRules:
+            while position < end:
+                lineEnd = data.find(newline, position, end)
+                lineEnd = end if lineEnd < 0 else lineEnd + 1
+                if self.get_rule_indices(data, 0, position, lineEnd):
+                    yield position, lineEnd
+                position = lineEnd
+
+class LogFilter:
+    """Applies filter rules to log text in one pass over its lines.
+
+    When every rule is line local, lines are read, filtered and written one by one, so memory does not depend
+    on log size and output appears immediately. Otherwise whole log is read and rules are applied one by one.
+    Filter made by `to_bytes` works with UTF-8 bytes and can filter log mapped to memory without decoding it.
+    """
+
+    def __init__(self, rules: List[FilterRule], isBytes=False):
+        self.rules = rules
+        self.isBytes = isBytes
+        self.matcher = RuleMatcher(rules, isBytes)
+
+    def is_streaming(self):
+        return all(rule.isLineLocal for rule in self.rules)
+
+    def filter_line(self, line):
+        """Apply rules in their order, but only ones the matcher finds for the line"""
+        indices = self.matcher.get_rule_indices(line)
+        while indices:
+            index = indices[0]
+            filteredLine = self.rules[index].apply(line)
+            if filteredLine == line:
+                indices = indices[1:]
+                continue
+            line = filteredLine
+            if not line:
+                break
+            # Changed line may match other rules
+            indices = self.matcher.get_rule_indices(line, index + 1)
+        return line
+
+    def filter_lines(self, lines: Iterable[str]):
+        """Filtered lines with their newlines, removed lines are skipped"""
+        for line in lines:
+            line = self.filter_line(line)
+            if line:
+                yield line
+
+    def to_bytes(self) -> Optional['LogFilter']:
+        """Filter with the same rules for UTF-8 bytes, None when some rule can not be applied to bytes"""
+        rules = [to_bytes_rule(rule) for rule in self.rules]
+        if all(rules):
+            return LogFilter(rules, True)
+        return None
+
+    def filter_buffer(self, data, outFile, start=0, end=None):
+        """Write filtered lines of bytes-like `data` to binary `outFile`, filter has to be made by `to_bytes`.
+
+        Lines are checked in place, only lines some rule may change are copied. Runs of unchanged lines
+        are written as single slices of `data`, so most of the log goes to output without any copies.
+        """
+        end = len(data) if end is None else end
+        runStart = start
+        with memoryview(data) as view:
+            for lineStart, lineEnd in self.matcher.get_candidate_lines(data, start, end):
+                line = data[lineStart:lineEnd]
+                filteredLine = self.filter_line(line)
+                if filteredLine != line:
+                    outFile.write(view[runStart:lineStart])
+                    outFile.write(filteredLine)
+                    runStart = lineEnd
+            outFile.write(view[runStart:end])
+
+    def filter_mapped_file(self, filePath, outFile):
+        """Filter log file mapped to memory with `filter_buffer`, line endings are kept as they are"""
+        with open(filePath, 'rb') as f:
+            # Empty files can not be mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                if hasattr(mapping, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapping.madvise(mmap.MADV_SEQUENTIAL)
+                self.filter_buffer(mapping, outFile)
+
+    def filter_file_parallel(self, filePath, outFile, jobs, chunkSize=PARALLEL_CHUNK_SIZE, start=0, end=None):
+        """Filter line aligned parts of the file in `jobs` processes and write results in the file order.
+
+        Rules have to be line local. Bytes filter maps the file in every process and writes to binary `outFile`,
+        text filter decodes parts with the default encoding of `open` and writes to text `outFile`.
+        Only bytes from `start` to `end`, which has to be after newline, are filtered when it is given.
+        """
+        ranges = get_line_ranges(filePath, chunkSize, start, end)
+        if jobs <= 1 or len(ranges) <= 1:
+            if end is not None:
+                self.filter_range(filePath, outFile, start, end)
+            elif self.isBytes:
+                self.filter_mapped_file(filePath, outFile)
+            else:
+                with open(filePath, 'r') as f:
+                    self.filter_file(f, outFile)
+            return
+
+        encoding = None if self.isBytes else locale.getpreferredencoding(False)
+        logging.debug(f"Filtering {len(ranges)} parts of the log in {jobs} processes")
+        executor = ProcessPoolExecutor(min(jobs, len(ranges)), initializer=init_filter_process, initargs=(self,))
+        try:
+            starts, ends = zip(*ranges)
+            # Results come in the order of parts, finished later parts wait for earlier ones
+            for filteredText in executor.map(filter_file_range, repeat(filePath), starts, ends, repeat(encoding)):
+                outFile.write(filteredText)
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    def filter_range(self, filePath, outFile, start, end, encoding=None):
+        """Filter bytes of the file from `start` to `end` after newline, text is decoded with `encoding` or the default one"""
+        if start >= end:
+            return
+        with open(filePath, 'rb') as f:
+            if self.isBytes:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                    self.filter_buffer(mapping, outFile, start, end)
+                return
+            # Line local rules get the range part by part, so memory does not depend on its size
+            parts = get_line_ranges(filePath, PARALLEL_CHUNK_SIZE, start, end) if self.is_streaming() else [(start, end)]
+            for partStart, partEnd in parts:
+                f.seek(partStart)
+                data = f.read(partEnd - partStart)
+                # Parts end after newline, so they are decoded and split into lines the same way as the whole file
+                self.filter_file(io.TextIOWrapper(io.BytesIO(data), encoding=encoding), outFile)
+
+    def filter_text(self, text):
+        for rule in self.rules:
+            text = rule.apply(text)
+        return text
+
+    def filter_file(self, inFile, outFile):
+        if self.is_streaming():
+            for line in self.filter_lines(inFile):
+                outFile.write(line)
+        else:
+            logging.debug("Not all rules are line local, filtering whole log at once")
+            outFile.write(self.filter_text(inFile.read()))
+
+def get_line_ranges(filePath, chunkSize=PARALLEL_CHUNK_SIZE, start=0, end=None):
+    """(start, end) byte ranges of the file, each at least `chunkSize` long except the last and ending after newline"""
+    ranges = []
+    with open(filePath, 'rb') as f:
+        end = os.fstat(f.fileno()).st_size if end is None else end
+        while start < end:
+            rangeEnd = end
+            if start + chunkSize < end:
+                f.seek(start + chunkSize)
+                f.readline()
+                rangeEnd = min(f.tell(), end)
+            ranges.append((start, rangeEnd))
+            start = rangeEnd
+    return ranges
+
+# Filter of the pool process, set once instead of passing it with every part
+processFilter: Optional[LogFilter] = None
+
+def ignore_interrupt():
+    """Pool process initializer, Ctrl+C is handled by the main process, which stops the pool"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def init_filter_process(logFilter):
+    global processFilter
+    processFilter = logFilter
+    ignore_interrupt()
+
+def filter_file_range(filePath, start, end, encoding=None):
+    """Filtered part of the file, bytes for bytes filter, otherwise text decoded with `encoding`"""
+    output = io.BytesIO() if processFilter.isBytes else io.StringIO()
+    processFilter.filter_range(filePath, output, start, end, encoding)
+    return output.getvalue()
@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import select
+import ctypes
+import ctypes.util
+import logging
+from typing import Callable
+
+POLL_INTERVAL = 0.5
+READ_SIZE = 1024 * 1024
+UTF8_BOM = b'\xef\xbb\xbf'
+
+class PollWatcher:
+    """Waits for log changes by sleeping"""
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """Wakes up as soon as anything in the directory changes, Linux only.
+
+    Directory is watched instead of the file, so rotation and creation of the log are noticed too.
+    """
+    IN_MODIFY = 0x00000002
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    WATCH_MASK = IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, dirPath):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        # IN_NONBLOCK and IN_CLOEXEC have the same values as the file flags
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(dirPath), self.WATCH_MASK) < 0:
+            errorCode = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errorCode, f"inotify_add_watch failed for '{dirPath}'")
+
+    def wait(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            # Events only wake the follower up, it checks the file itself
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        os.close(self.fd)
+
+def create_watcher(dirPath):
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(dirPath)
+        except (OSError, AttributeError) as e:
+            logging.debug(f"inotify is not available, polling: {e}")
+    return PollWatcher()
+
+def get_file_identity(stat):
+    return stat.st_dev, stat.st_ino
+
+class LogFollower:
+    """Reads lines appended to the log since the previous poll and passes them to `lineFunc`.
+
+    Byte offset of the read part is kept, so nothing is read twice. Incomplete last line waits for its end.
+    When UE rotates the log, renaming it to `<Project>-backup-<date>.log` and starting a new one, the rest of the
+    old file is read through the open descriptor and the new file is followed from its beginning. On Windows
+    the file is not kept open between polls, as it would prevent UE from renaming it.
+    """
+
+    def __init__(self, filePath, lineFunc: Callable[[str], None], fromStart=False, keepOpen=(os.name != 'nt')):
+        self.filePath = filePath
+        self.lineFunc = lineFunc
+        self.keepOpen = keepOpen
+        self.file = None
+        self.identity = None
+        self.offset = 0
+        self.pending = b''
+        if not fromStart:
+            try:
+                stat = os.stat(filePath)
+                self.identity = get_file_identity(stat)
+                self.offset = stat.st_size
+            except FileNotFoundError:
+                pass
+
+    def poll(self):
+        """Handle lines appended since previous poll, return their number"""
+        try:
+            stat = os.stat(self.filePath)
+        except FileNotFoundError:
+            stat = None
+
+        count = 0
+        if self.identity is not None and (stat is None or get_file_identity(stat) != self.identity):
+            if self.file:
+                count += self.read_available()
+            count += self.flush_pending()
+            self.close()
+            self.identity = None
+            self.offset = 0
+            logging.info("Log file was rotated, following the new one")
+
+        if stat is None:
+            return count
+
+        if stat.st_size < self.offset:
+            logging.info("Log file was truncated, reading it from the beginning")
+            self.close()
+            self.offset = 0
+            self.pending = b''
+
+        if self.file is None:
+            self.file = open(self.filePath, 'rb')
+            self.file.seek(self.offset)
+            self.identity = get_file_identity(os.fstat(self.file.fileno()))
+        count += self.read_available()
+        if not self.keepOpen:
+            self.close()
+        return count
+
+    def read_available(self):
+        count = 0
+        while True:
+            data = self.file.read(READ_SIZE)
+            if not data:
+                return count
+            if self.offset == 0 and data.startswith(UTF8_BOM):
+                data = data[len(UTF8_BOM):]
+                self.offset += len(UTF8_BOM)
+            self.offset += len(data)
+            lines = (self.pending + data).split(b'\n')
+            self.pending = lines.pop()
+            for rawLine in lines:
+                self.handle_line(rawLine + b'\n')
+            count += len(lines)
+
+    def flush_pending(self):
+        """Pass incomplete last line of the file which is not written anymore"""
+        if not self.pending:
+            return 0
+        rawLine, self.pending = self.pending, b''
+        self.handle_line(rawLine)
+        return 1
+
+    def handle_line(self, rawLine):
+        if rawLine.endswith(b'\r\n'):
+            rawLine = rawLine[:-2] + b'\n'
+        self.lineFunc(rawLine.decode('utf-8', errors='replace'))
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def run(self, pollInterval=POLL_INTERVAL, outFile=None):
+        """Follow the log until interrupted"""
+        watcher = create_watcher(os.path.dirname(os.path.abspath(self.filePath)))
+        try:
+            while True:
+                if self.poll() and outFile:
+                    outFile.flush()
+                watcher.wait(pollInterval)
+        finally:
+            watcher.close()
+            self.close()
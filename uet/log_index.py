@@ -0,0 +1,292 @@
+import os
+import json
+import mmap
+import array
+import bisect
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+import log_parse as lp
+
+INDEX_EXTENSION = ".uetidx"
+INDEX_MAGIC = b"UETLOGIDX 1\n"
+# Bytes of the log start identifying it, rotated log starts a new file with different header and time
+HEAD_SIZE = 4096
+# Distance between timestamp checkpoints
+CHECKPOINT_SIZE = 1024 * 1024
+# UE threads write lines slightly out of time order, checkpoints are used with this margin
+CHECKPOINT_SLACK = 1.0
+OFFSET_TYPECODE = 'q'
+CATEGORY_KEY = "categories"
+VERBOSITY_KEY = "verbosities"
+
+def get_index_path(logFilePath):
+    return logFilePath + INDEX_EXTENSION
+
+def hash_head(data, size):
+    return hashlib.sha1(data[:size]).hexdigest()
+
+@dataclass
+class IndexBlock:
+    """Index of log lines from `start` to `end`, which is always after newline.
+
+    Posting lists are sorted offsets of lines with the category or verbosity, they are stored in the payload after
+    the json header in the order of the header dicts. Checkpoints are (time, offset) of the first line after every
+    `CHECKPOINT_SIZE` bytes, they are used only when lines of the block are `ordered` by time.
+    """
+    start: int
+    end: int
+    lines: int = 0
+    minTime: Optional[float] = None
+    maxTime: Optional[float] = None
+    categories: Dict[str, int] = field(default_factory=dict)
+    verbosities: Dict[str, int] = field(default_factory=dict)
+    checkpoints: List[List[float]] = field(default_factory=list)
+    ordered: bool = True
+    headSize: Optional[int] = None
+    headHash: Optional[str] = None
+    # Position of the payload in the index file
+    payloadOffset: int = 0
+
+    def to_header(self):
+        header = {'start': self.start, 'end': self.end, 'lines': self.lines, 'min_time': self.minTime, 'max_time': self.maxTime,
+                  CATEGORY_KEY: self.categories, VERBOSITY_KEY: self.verbosities, 'checkpoints': self.checkpoints,
+                  'ordered': self.ordered, 'head_size': self.headSize, 'head_hash': self.headHash}
+        return {key: value for key, value in header.items() if value is not None}
+
+    @classmethod
+    def from_header(cls, header, payloadOffset):
+        return cls(header['start'], header['end'], header.get('lines', 0), header.get('min_time'), header.get('max_time'),
+                   header.get(CATEGORY_KEY, {}), header.get(VERBOSITY_KEY, {}), header.get('checkpoints', []),
+                   header.get('ordered', False), header.get('head_size'), header.get('head_hash'), payloadOffset)
+
+    def get_payload_size(self):
+        return (sum(self.categories.values()) + sum(self.verbosities.values())) * array.array(OFFSET_TYPECODE).itemsize
+
+    def get_list_position(self, key, name):
+        """(offset in payload, count) of the posting list"""
+        position = 0
+        for listKey in (CATEGORY_KEY, VERBOSITY_KEY):
+            for listName, count in getattr(self, listKey).items():
+                if listKey == key and listName == name:
+                    return position, count
+                position += count
+        return None
+
+    def is_in_time_range(self, since=None, until=None):
+        if self.minTime is None:
+            return False
+        return (since is None or self.maxTime >= since) and (until is None or self.minTime <= until)
+
+    def get_range(self, since=None, until=None):
+        """Part of the block where lines from the time range can be, according to checkpoints"""
+        start = self.start
+        end = self.end
+        if not self.ordered:
+            return start, end
+        for checkpointTime, offset in self.checkpoints:
+            if since is not None and checkpointTime < since - CHECKPOINT_SLACK:
+                start = int(offset)
+            if until is not None and checkpointTime > until + CHECKPOINT_SLACK:
+                end = int(offset)
+                break
+        return start, end
+
+def create_block(data, start, end, timeParser=None):
+    """Index lines of bytes-like `data` from `start` to `end`, return the block and its payload"""
+    timeParser = timeParser or lp.TimeParser()
+    block = IndexBlock(start, end)
+    categoryLists: Dict[str, array.array] = {}
+    verbosityLists: Dict[str, array.array] = {}
+    nextCheckpoint = start
+    for match in lp.iter_prefixes(data, start, end):
+        offset = match.start()
+        lineTime = timeParser.get_time(match)
+        category = lp.get_category(match)
+        verbosity = lp.get_verbosity(match)
+        categoryList = categoryLists.get(category)
+        if categoryList is None:
+            categoryList = categoryLists[category] = array.array(OFFSET_TYPECODE)
+        categoryList.append(offset)
+        verbosityList = verbosityLists.get(verbosity)
+        if verbosityList is None:
+            verbosityList = verbosityLists[verbosity] = array.array(OFFSET_TYPECODE)
+        verbosityList.append(offset)
+        if offset >= nextCheckpoint:
+            block.checkpoints.append([lineTime, offset])
+            nextCheckpoint = offset + CHECKPOINT_SIZE
+        if block.minTime is None or lineTime < block.minTime:
+            block.minTime = lineTime
+        if block.maxTime is None or lineTime > block.maxTime:
+            block.maxTime = lineTime
+        elif lineTime < block.maxTime - CHECKPOINT_SLACK:
+            block.ordered = False
+        block.lines += 1
+
+    block.categories = {name: len(offsets) for name, offsets in categoryLists.items()}
+    block.verbosities = {name: len(offsets) for name, offsets in verbosityLists.items()}
+    payload = b''.join(offsets.tobytes() for offsets in list(categoryLists.values()) + list(verbosityLists.values()))
+    return block, payload
+
+def read_blocks(indexFilePath):
+    """Blocks of the index file and size of its valid part, block written partially by killed process is ignored"""
+    blocks = []
+    try:
+        with open(indexFilePath, 'rb') as f:
+            if f.readline() != INDEX_MAGIC:
+                return blocks, 0
+            validSize = f.tell()
+            fileSize = os.fstat(f.fileno()).st_size
+            while True:
+                line = f.readline()
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    block = IndexBlock.from_header(json.loads(line.decode('utf-8')), f.tell())
+                except (ValueError, KeyError, TypeError):
+                    break
+                if block.payloadOffset + block.get_payload_size() > fileSize:
+                    break
+                blocks.append(block)
+                f.seek(block.payloadOffset + block.get_payload_size())
+                validSize = f.tell()
+    except OSError:
+        return [], 0
+    return blocks, validSize
+
+class LogIndex:
+    """Sidecar index of UE log next to it, with posting lists of line offsets by category and verbosity.
+
+    Index is append-only: every update indexes only the part of the log written since previous one and appends it
+    as a new block. When the log was replaced, for example rotated by UE, or truncated, index is built again.
+    Queries read only the posting lists they need and lines at their offsets instead of scanning the log.
+    """
+
+    def __init__(self, logFilePath, indexFilePath=None):
+        self.logFilePath = logFilePath
+        self.indexFilePath = indexFilePath or get_index_path(logFilePath)
+        self.blocks: List[IndexBlock] = []
+
+    def load(self):
+        self.blocks, _ = read_blocks(self.indexFilePath)
+        return self.blocks
+
+    def is_valid_for(self, data, blocks):
+        if not blocks:
+            return False
+        headBlock = blocks[0]
+        return len(data) >= blocks[-1].end and headBlock.headHash == hash_head(data, headBlock.headSize)
+
+    def update(self):
+        """Index lines appended since previous update, return their number"""
+        blocks, validSize = read_blocks(self.indexFilePath)
+        with open(self.logFilePath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                self.blocks = []
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if blocks and not self.is_valid_for(data, blocks):
+                    logging.info("Log was replaced or truncated, indexing it again")
+                    blocks = []
+                start = blocks[-1].end if blocks else 0
+                # Incomplete last line waits for the next update
+                end = data.rfind(b'\n', start) + 1
+                if end <= start:
+                    self.blocks = blocks
+                    return 0
+                block, payload = create_block(data, start, end)
+                if not blocks:
+                    block.headSize = min(HEAD_SIZE, end)
+                    block.headHash = hash_head(data, block.headSize)
+
+        header = json.dumps(block.to_header(), separators=(',', ':')).encode('utf-8') + b'\n'
+        with open(self.indexFilePath, 'r+b' if blocks else 'wb') as f:
+            if blocks:
+                # Drops partially written block after the valid part
+                f.truncate(validSize)
+                f.seek(validSize)
+            else:
+                f.write(INDEX_MAGIC)
+            block.payloadOffset = f.tell() + len(header)
+            f.write(header + payload)
+        self.blocks = blocks + [block]
+        logging.debug(f"Indexed {block.lines} lines of {self.logFilePath} from byte {start} to {end}")
+        return block.lines
+
+    def read_list(self, f, block, key, name):
+        offsets = array.array(OFFSET_TYPECODE)
+        position = block.get_list_position(key, name)
+        if position is not None:
+            listOffset, count = position
+            f.seek(block.payloadOffset + listOffset * offsets.itemsize)
+            offsets.fromfile(f, count)
+        return offsets
+
+    def read_union(self, f, block, key, names):
+        lists = [self.read_list(f, block, key, name) for name in names]
+        if len(lists) == 1:
+            return lists[0]
+        return sorted(set().union(*lists))
+
+    def query_offsets(self, categories=None, verbosities=None, since=None, until=None) -> Iterable[int]:
+        """Sorted offsets of lines with any of `categories` and any of `verbosities` which can be in the time range.
+
+        Lines are selected by time only approximately here, `query` checks their time exactly.
+        """
+        if not self.blocks:
+            return
+        with open(self.indexFilePath, 'rb') as f:
+            for block in self.blocks:
+                if (since is not None or until is not None) and not block.is_in_time_range(since, until):
+                    continue
+                start, end = block.get_range(since, until)
+                offsets = None
+                if categories:
+                    offsets = self.read_union(f, block, CATEGORY_KEY, categories)
+                if verbosities:
+                    verbosityOffsets = self.read_union(f, block, VERBOSITY_KEY, verbosities)
+                    if offsets is None:
+                        offsets = verbosityOffsets
+                    else:
+                        verbosityOffsets = set(verbosityOffsets)
+                        offsets = [offset for offset in offsets if offset in verbosityOffsets]
+                if offsets is None:
+                    yield from self.scan_offsets(start, end)
+                    continue
+                yield from offsets[bisect.bisect_left(offsets, start):bisect.bisect_left(offsets, end)]
+
+    def scan_offsets(self, start, end):
+        """Offsets of all lines with prefix in the part of the log, for queries by time only"""
+        with open(self.logFilePath, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for match in lp.iter_prefixes(data, start, min(end, len(data))):
+                    yield match.start()
+
+    def query(self, categories=None, verbosities=None, since=None, until=None):
+        """Yield lines matching the query, with their newlines"""
+        timeParser = lp.TimeParser()
+        with open(self.logFilePath, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for offset in self.query_offsets(categories, verbosities, since, until):
+                    lineEnd = data.find(b'\n', offset)
+                    line = data[offset:len(data) if lineEnd < 0 else lineEnd + 1]
+                    if since is not None or until is not None:
+                        match = lp.LINE_PREFIX_PATTERN.match(line)
+                        lineTime = timeParser.get_time(match)
+                        if (since is not None and lineTime < since) or (until is not None and lineTime > until):
+                            continue
+                    yield line.decode('utf-8', errors='replace')
+
+    def get_first_time(self):
+        times = [block.minTime for block in self.blocks if block.minTime is not None]
+        return min(times) if times else None
+
+    def get_counts(self, key):
+        """Number of lines by category or verbosity in the whole index"""
+        counts: Dict[str, int] = {}
+        for block in self.blocks:
+            for name, count in getattr(block, key).items():
+                counts[name] = counts.get(name, 0) + count
+        return counts
@@ -0,0 +1,94 @@
+import re
+import time
+import calendar
+from dataclasses import dataclass
+from typing import Optional
+
+# UE log line starts with `[2024.10.10-12.00.01:100][  0]LogNet: Warning: `, verbosity is omitted for `Log` one.
+# Lines without this prefix continue message of the previous line, like call stacks and the log header do.
+VERBOSITIES = ["Fatal", "Error", "Warning", "Display", "Log", "Verbose", "VeryVerbose"]
+DEFAULT_VERBOSITY = "Log"
+LINE_PREFIX_PATTERN = re.compile(
+    rb'^\[(?P<second>\d{4}\.\d\d\.\d\d-\d\d\.\d\d\.\d\d):(?P<millisecond>\d{3})\]\[\s*(?P<frame>\d+)\](?P<category>\w+): '
+    rb'(?:(?P<verbosity>' + b'|'.join(verbosity.encode('ascii') for verbosity in VERBOSITIES) + rb'): )?', re.M)
+# Same prefix for decoded text
+TEXT_LINE_PREFIX_PATTERN = re.compile(LINE_PREFIX_PATTERN.pattern.decode('ascii'), re.M)
+TIME_FORMAT = "%Y.%m.%d-%H.%M.%S"
+TIME_OF_DAY_PATTERN = re.compile(r'(\d\d?):(\d\d)(?::(\d\d))?')
+UE_TIME_PATTERN = re.compile(r'(\d{4})\.(\d\d)\.(\d\d)-(\d\d)\.(\d\d)(?:\.(\d\d))?(?::(\d{3}))?')
+
+@dataclass
+class LogLine:
+    """Parsed prefix of UE log line, `time` is in seconds since epoch as UE writes it, UTC by default"""
+    time: float
+    frame: int
+    category: str
+    verbosity: str
+    # Position of the message after the prefix
+    messageOffset: int
+
+class TimeParser:
+    """Converts prefix matches to seconds, every second of the log is parsed once"""
+
+    def __init__(self):
+        self.seconds = {}
+
+    def get_second(self, match):
+        text = match.group('second')
+        second = self.seconds.get(text)
+        if second is None:
+            try:
+                second = calendar.timegm(time.strptime(text if isinstance(text, str) else text.decode('ascii'), TIME_FORMAT))
+            except ValueError:
+                # Digits which are not a date, like month 13, are kept at the epoch start
+                second = 0
+            self.seconds[text] = second
+        return second
+
+    def get_time(self, match):
+        return self.get_second(match) + int(match.group('millisecond')) / 1000
+
+def iter_prefixes(data, start=0, end=None):
+    """Matches of line prefixes in bytes-like `data`, for example mmap, which is not copied"""
+    end = len(data) if end is None else end
+    return LINE_PREFIX_PATTERN.finditer(data, start, end)
+
+def get_category(match):
+    return match.group('category').decode('utf-8')
+
+def get_verbosity(match):
+    verbosity = match.group('verbosity')
+    return verbosity.decode('ascii') if verbosity else DEFAULT_VERBOSITY
+
+def parse_line(line, timeParser=None) -> Optional[LogLine]:
+    """Prefix of str or bytes line, None for lines without it"""
+    if isinstance(line, str):
+        line = line.encode('utf-8')
+    match = LINE_PREFIX_PATTERN.match(line)
+    if match is None:
+        return None
+    timeParser = timeParser or TimeParser()
+    return LogLine(timeParser.get_time(match), int(match.group('frame')), get_category(match), get_verbosity(match), match.end())
+
+def format_time(seconds):
+    return time.strftime(TIME_FORMAT, time.gmtime(seconds)) + f":{int(round(seconds * 1000)) % 1000:03d}"
+
+def parse_time(text, referenceTime=None):
+    """Seconds of `2024.10.10-12.01.00[:000]` or `12:01[:00]` on the day of `referenceTime`, None for other text"""
+    match = UE_TIME_PATTERN.fullmatch(text)
+    if match:
+        year, month, day, hours, minutes, seconds, milliseconds = (int(value or 0) for value in match.groups())
+        return calendar.timegm((year, month, day, hours, minutes, seconds)) + milliseconds / 1000
+    match = TIME_OF_DAY_PATTERN.fullmatch(text)
+    if match:
+        hours, minutes, seconds = (int(value or 0) for value in match.groups())
+        dayStart = (referenceTime // 86400) * 86400 if referenceTime is not None else 0
+        return dayStart + hours * 3600 + minutes * 60 + seconds
+    return None
+
+def normalize_verbosity(text):
+    """Verbosity name written in any case, None for unknown ones"""
+    for verbosity in VERBOSITIES:
+        if verbosity.lower() == text.lower():
+            return verbosity
+    return None
@@ -0,0 +1,187 @@
+import re
+import math
+import array
+import heapq
+import bisect
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import List, Optional
+import log_parse as lp
+import log_archive as la
+
+# Frame counter of the line prefix is `GFrameCounter % 1000`
+FRAME_COUNTER_WRAP = 1000
+# Bigger steps are late lines of previous frames or gaps in logging the counter can not measure
+MAX_FRAME_STEP = FRAME_COUNTER_WRAP // 2
+# Frames are assumed to take at least this, big step which took less time is a step back to a late line
+MIN_FRAME_MILLISECONDS = 1
+# Only lines mentioning these are parsed further
+PERF_HINT_PATTERN = re.compile(r'hitch|frame', re.I)
+HITCH_PATTERN = re.compile(r'hitch', re.I)
+LONG_FRAME_PATTERN = re.compile(r'\b(?:long|slow)\s+frame', re.I)
+MILLISECONDS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*ms\b')
+# `stat unit` values, like `Frame: 16.67 ms  Game: 8.12 ms  Draw: 4.01 ms  GPU: 12.30 ms`
+UNIT_PATTERN = re.compile(r'\b(Frame|Game|Draw|GPU|RHIT)\s*[:=]\s*(\d+(?:\.\d+)?)', re.I)
+HITCH_KIND = "hitch"
+LONG_FRAME_KIND = "long frame"
+UNIT_KIND = "stat unit"
+ESTIMATED_KIND = "estimated"
+PERCENTILES = [50, 90, 95, 99]
+# Frame times above these are counted, 30 and 10 frames per second
+FRAME_BUDGETS = [33.3, 100.0]
+CONTEXT_LINES = 3
+WORST_FRAMES = 10
+
+@dataclass
+class PerfEvent:
+    """Long frame found in the log with lines around it, `line` is the line reporting it or starting the next frame"""
+    milliseconds: float
+    kind: str
+    category: str
+    frame: Optional[int]
+    time: Optional[float]
+    line: str
+    before: List[str]
+    after: List[str] = field(default_factory=list)
+
+def get_percentile(sortedValues, percent):
+    """Nearest-rank percentile"""
+    return sortedValues[max(0, min(len(sortedValues) - 1, math.ceil(percent / 100 * len(sortedValues)) - 1))]
+
+class PerfReport:
+    """Frame times, hitches and worst frames collected from log lines in one pass.
+
+    Frame times are taken from `stat unit` values when the log has them. Otherwise they are estimated from line
+    prefixes: time between first lines of two frames is split between frames the counter advanced by. Frames
+    which log nothing are covered this way too, unless nothing is logged for more than `MAX_FRAME_STEP` frames,
+    such gaps have no frame times as the counter may have wrapped around any number of times.
+    Only `worstCount` worst frames are kept with `contextLines` lines before and after them.
+    """
+
+    def __init__(self, contextLines=CONTEXT_LINES, worstCount=WORST_FRAMES):
+        self.contextLines = contextLines
+        self.worstCount = worstCount
+        self.unitFrameTimes = array.array('d')
+        self.estimatedFrameTimes = array.array('d')
+        self.hitchCounts = Counter()
+        self.hitchMilliseconds = Counter()
+        self.worst = []
+        self.pending: List[PerfEvent] = []
+        self.context = deque(maxlen=contextLines)
+        self.timeParser = lp.TimeParser()
+        self.lines = 0
+        self.events = 0
+        self.frame = None
+        # Time of the first line of the frame in milliseconds
+        self.frameTime = None
+
+    def add_line(self, line):
+        self.lines += 1
+        if self.pending:
+            for event in self.pending:
+                event.after.append(line)
+            self.pending = [event for event in self.pending if len(event.after) < self.contextLines]
+
+        match = lp.TEXT_LINE_PREFIX_PATTERN.match(line)
+        if match:
+            frame, category = int(match.group('frame')), match.group('category')
+            if frame != self.frame:
+                # Milliseconds are added as integers, seconds since epoch as floats lose their precision
+                lineTime = self.timeParser.get_second(match) * 1000 + int(match.group('millisecond'))
+                self.add_frame_change(frame, lineTime, category, line)
+            message = line[match.end():]
+            if PERF_HINT_PATTERN.search(message):
+                self.add_message(message, category, line)
+        self.context.append(line)
+
+    def add_frame_change(self, frame, lineTime, category, line):
+        if self.frame is not None:
+            frames = (frame - self.frame) % FRAME_COUNTER_WRAP
+            if frames > MAX_FRAME_STEP:
+                if lineTime - self.frameTime < frames * MIN_FRAME_MILLISECONDS:
+                    # Late line of a previous frame
+                    return
+                # Long gap, frame times start again from this line
+                self.frame = frame
+                self.frameTime = lineTime
+                return
+        if self.frame is not None and lineTime >= self.frameTime:
+            milliseconds = float(lineTime - self.frameTime)
+            self.estimatedFrameTimes.extend([milliseconds / frames] * frames)
+            if frames == 1:
+                self.add_event(milliseconds, ESTIMATED_KIND, category, line, self.frame, self.frameTime)
+        self.frame = frame
+        self.frameTime = lineTime
+
+    def add_message(self, message, category, line):
+        units = {name.lower(): float(value) for name, value in UNIT_PATTERN.findall(message)}
+        if 'frame' in units and len(units) > 1:
+            self.unitFrameTimes.append(units['frame'])
+            self.add_event(units['frame'], UNIT_KIND, category, line)
+            return
+        kind = HITCH_KIND if HITCH_PATTERN.search(message) else LONG_FRAME_KIND if LONG_FRAME_PATTERN.search(message) else None
+        if kind is None:
+            return
+        milliseconds = MILLISECONDS_PATTERN.search(message)
+        milliseconds = float(milliseconds.group(1)) if milliseconds else 0.0
+        self.hitchCounts[category] += 1
+        self.hitchMilliseconds[category] += milliseconds
+        self.add_event(milliseconds, kind, category, line)
+
+    def add_event(self, milliseconds, kind, category, line, frame=None, eventTime=None):
+        if len(self.worst) >= self.worstCount and milliseconds <= self.worst[0][0]:
+            return
+        if frame is None:
+            frame, eventTime = self.frame, self.frameTime
+        eventTime = eventTime / 1000 if eventTime is not None else None
+        event = PerfEvent(milliseconds, kind, category, frame, eventTime, line, list(self.context))
+        # Event number keeps the order of equal times and events are never compared
+        self.events += 1
+        item = (milliseconds, self.events, event)
+        if len(self.worst) >= self.worstCount:
+            _, _, dropped = heapq.heapreplace(self.worst, item)
+            self.pending = [pendingEvent for pendingEvent in self.pending if pendingEvent is not dropped]
+        else:
+            heapq.heappush(self.worst, item)
+        if self.contextLines:
+            self.pending.append(event)
+
+    def get_frame_times(self):
+        """Measured frame times when the log has them, estimated ones otherwise, and their source"""
+        if self.unitFrameTimes:
+            return self.unitFrameTimes, UNIT_KIND
+        return self.estimatedFrameTimes, ESTIMATED_KIND
+
+    def get_worst_events(self) -> List[PerfEvent]:
+        return [event for _, _, event in sorted(self.worst, key=lambda item: (-item[0], item[1]))]
+
+def collect_perf_report(filePath, contextLines=CONTEXT_LINES, worstCount=WORST_FRAMES) -> PerfReport:
+    """Perf report of plain or compressed log read line by line"""
+    report = PerfReport(contextLines, worstCount)
+    with la.open_log(filePath, 'r') as f:
+        for line in f:
+            report.add_line(line)
+    return report
+
+def print_perf_report(report: PerfReport):
+    frameTimes, source = report.get_frame_times()
+    print(f"Frame time ({source}): {len(frameTimes)} frames")
+    if frameTimes:
+        sortedTimes = sorted(frameTimes)
+        print("\t" + "  ".join(f"p{percent}: {get_percentile(sortedTimes, percent):.1f} ms" for percent in PERCENTILES)
+              + f"  max: {sortedTimes[-1]:.1f} ms")
+        print("\t" + "  ".join(f"over {budget} ms: {len(sortedTimes) - bisect.bisect_right(sortedTimes, budget)}" for budget in FRAME_BUDGETS))
+
+    print(f"Hitches: {sum(report.hitchCounts.values())}, {sum(report.hitchMilliseconds.values()):.1f} ms")
+    for category, count in report.hitchCounts.most_common():
+        print(f"\t{category}: {count}, {report.hitchMilliseconds[category]:.1f} ms")
+
+    print("Worst frames:")
+    for event in report.get_worst_events():
+        frameTime = lp.format_time(event.time) if event.time is not None else "unknown time"
+        print(f"\t{event.milliseconds:.1f} ms {event.kind} in {event.category}, frame {event.frame} at {frameTime}")
+        for line in event.before:
+            print("\t\t  " + line.rstrip('\r\n'))
+        print("\t\t> " + event.line.rstrip('\r\n'))
+        for line in event.after:
+            print("\t\t  " + line.rstrip('\r\n'))
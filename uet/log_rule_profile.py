@@ -0,0 +1,116 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List
+import log_filter as lf
+import log_archive as la
+
+@dataclass
+class RuleProfile:
+    """Cost and effect of one filter rule, sizes are in characters of decoded text.
+
+    Lines are counted only when rules are applied line by line, whole log filtered at once has only
+    the difference in its line count as removed lines.
+    """
+    index: int
+    rule: lf.FilterRule
+    seconds: float = 0.0
+    calls: int = 0
+    matches: int = 0
+    changedLines: int = 0
+    removedLines: int = 0
+    removedSize: int = 0
+    shapes: List[str] = field(default_factory=list)
+
+    def get_description(self):
+        return f"#{self.index + 1} {self.rule.pattern.pattern!r} -> {self.rule.repl!r}"
+
+class RuleProfiler(lf.LogFilter):
+    """Log filter which measures time every rule takes and what it changes, output is the same as of `LogFilter`"""
+
+    def __init__(self, rules: List[lf.FilterRule]):
+        super().__init__(rules)
+        self.profiles = [RuleProfile(index, rule) for index, rule in enumerate(rules)]
+        self.matcherSeconds = 0.0
+        self.lines = 0
+        self.size = 0
+        for profile in self.profiles:
+            profile.shapes = lf.get_backtracking_shapes(profile.rule, self.is_streaming())
+
+    def filter_line(self, line):
+        """Same as `LogFilter.filter_line` with every step timed"""
+        self.lines += 1
+        self.size += len(line)
+        start = time.perf_counter()
+        indices = self.matcher.get_rule_indices(line)
+        self.matcherSeconds += time.perf_counter() - start
+        while indices:
+            index = indices[0]
+            profile = self.profiles[index]
+            start = time.perf_counter()
+            filteredLine, matches = self.rules[index].apply_counted(line)
+            profile.seconds += time.perf_counter() - start
+            profile.calls += 1
+            profile.matches += matches
+            if filteredLine == line:
+                indices = indices[1:]
+                continue
+            profile.removedSize += len(line) - len(filteredLine)
+            if filteredLine:
+                profile.changedLines += 1
+            else:
+                profile.removedLines += 1
+            line = filteredLine
+            if not line:
+                break
+            start = time.perf_counter()
+            indices = self.matcher.get_rule_indices(line, index + 1)
+            self.matcherSeconds += time.perf_counter() - start
+        return line
+
+    def filter_text(self, text):
+        newline = lf.get_newline(text)
+        self.lines += text.count(newline)
+        self.size += len(text)
+        for rule, profile in zip(self.rules, self.profiles):
+            start = time.perf_counter()
+            filteredText, matches = rule.apply_counted(text)
+            profile.seconds += time.perf_counter() - start
+            profile.calls += 1
+            profile.matches += matches
+            profile.removedSize += len(text) - len(filteredText)
+            profile.removedLines += text.count(newline) - filteredText.count(newline)
+            text = filteredText
+        return text
+
+    def get_rule_seconds(self):
+        return sum(profile.seconds for profile in self.profiles)
+
+def collect_rule_profile(filePath, rules: List[lf.FilterRule]) -> RuleProfiler:
+    """Filter plain or compressed log with profiled rules, filtered log is discarded"""
+    profiler = RuleProfiler(rules)
+    with la.open_log(filePath, 'r') as f, open(os.devnull, 'w') as outFile:
+        profiler.filter_file(f, outFile)
+    return profiler
+
+def print_rule_profile(profiler: RuleProfiler):
+    mode = "line by line" if profiler.is_streaming() else "whole log at once, not all rules are line local"
+    print(f"Rules: {len(profiler.rules)}, log: {profiler.lines} lines, {profiler.size} characters, filtered {mode}")
+    ruleSeconds = profiler.get_rule_seconds()
+    print(f"Time: {ruleSeconds:.3f} s applying rules, {profiler.matcherSeconds:.3f} s finding rules for lines")
+    if not profiler.profiles:
+        return
+
+    print(f"\t{'Time':>9} {'Share':>6} {'Calls':>9} {'Matches':>9} {'Changed':>9} {'Removed':>9} {'Removed size':>12}  Rule")
+    for profile in sorted(profiler.profiles, key=lambda profile: profile.seconds, reverse=True):
+        share = profile.seconds / ruleSeconds * 100 if ruleSeconds else 0.0
+        changedLines = profile.changedLines if profiler.is_streaming() else "-"
+        print(f"\t{profile.seconds:>7.3f} s {share:>5.1f}% {profile.calls:>9} {profile.matches:>9} {changedLines:>9} "
+              f"{profile.removedLines:>9} {profile.removedSize:>12}  {profile.get_description()}")
+
+    warnings = [(profile, shape) for profile in profiler.profiles for shape in profile.shapes]
+    warnings.extend((profile, "never matched") for profile in profiler.profiles if not profile.matches)
+    if warnings:
+        print("Warnings:")
+        for profile, warning in warnings:
+            print(f"\t{profile.get_description()}: {warning}")
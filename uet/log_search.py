@@ -0,0 +1,162 @@
+import os
+import re
+import heapq
+import logging
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import log_parse as lp
+import log_filter as lf
+import log_archive as la
+
+LOG_EXTENSIONS = (".log",) + tuple(".log" + extension for extension in la.COMPRESSED_EXTENSIONS)
+PROCESSED_LOG_PREFIX = la.PROCESSED_LOG_PREFIX
+READ_SIZE = 4 * 1024 * 1024
+# Enough to find the first line with time after the log header
+HEAD_READ_SIZE = 64 * 1024
+# Lines before the first line with time are sorted first
+NO_TIME = float('-inf')
+
+@dataclass
+class SearchResult:
+    """Matching lines of one log with times of their entries, `lastTime` is time of the last entry of the log"""
+    lines: List[Tuple[float, str]] = field(default_factory=list)
+    lastTime: Optional[float] = None
+
+def is_log_file(fileName):
+    return fileName.endswith(LOG_EXTENSIONS) and not fileName.startswith(PROCESSED_LOG_PREFIX)
+
+def get_log_files(logsPath):
+    """Current, rotated and compressed logs in the directory"""
+    try:
+        fileNames = os.listdir(logsPath)
+    except OSError:
+        return []
+    return sorted(os.path.join(logsPath, fileName) for fileName in fileNames
+                  if is_log_file(fileName) and os.path.isfile(os.path.join(logsPath, fileName)))
+
+def iter_chunks(f, readSize=READ_SIZE):
+    """Decoded parts of the file ending after newline"""
+    while True:
+        data = f.read(readSize)
+        if not data:
+            return
+        data += f.readline()
+        yield data.decode('utf-8', errors='replace')
+
+def get_first_time(filePath):
+    """Time of the first line with prefix, None for logs without such lines in the beginning"""
+    try:
+        with la.open_log(filePath) as f:
+            head = f.read(HEAD_READ_SIZE)
+    except (OSError, EOFError) as e:
+        logging.warning(f"Unable to read '{filePath}': {e}")
+        return None
+    match = lp.LINE_PREFIX_PATTERN.search(head)
+    return lp.TimeParser().get_time(match) if match else None
+
+def get_entry_time(text, lineStart, timeParser, stop=0):
+    """Time of the entry the line belongs to, lines without prefix belong to the line with it above them.
+
+    Lines are checked back to `stop`, None is returned when there is no line with prefix after it.
+    """
+    position = lineStart
+    while True:
+        match = lp.TEXT_LINE_PREFIX_PATTERN.match(text, position)
+        if match:
+            return timeParser.get_time(match)
+        if position <= stop:
+            return None
+        newline = text.rfind('\n', stop, position - 1)
+        position = stop if newline < 0 else newline + 1
+
+def iter_matching_lines(text, regex, isLineLocal):
+    """(start, end) of lines matching the regex"""
+    if isLineLocal:
+        position = 0
+        while True:
+            match = regex.search(text, position)
+            if match is None:
+                return
+            lineStart = text.rfind('\n', 0, match.start()) + 1
+            lineEnd = text.find('\n', match.start())
+            position = len(text) if lineEnd < 0 else lineEnd + 1
+            yield lineStart, position
+    else:
+        lineStart = 0
+        while lineStart < len(text):
+            lineEnd = text.find('\n', lineStart)
+            lineEnd = len(text) if lineEnd < 0 else lineEnd + 1
+            if regex.search(text[lineStart:lineEnd]):
+                yield lineStart, lineEnd
+            lineStart = lineEnd
+
+def search_file(filePath, pattern, flags=0) -> SearchResult:
+    """Lines of the log matching the pattern, `^` and `$` match at line boundaries"""
+    regex = re.compile(pattern, flags | re.M)
+    # Patterns matching only inside of lines are searched in whole chunks, others line by line
+    isLineLocal = lf.is_line_local_rule(pattern, flags | re.M)
+    timeParser = lp.TimeParser()
+    result = SearchResult()
+    try:
+        with la.open_log(filePath) as f:
+            for text in iter_chunks(f):
+                # Entry of the previous matching line, or of the previous chunk, lines are searched back to it only
+                entryStart, entryTime = 0, result.lastTime
+                for lineStart, lineEnd in iter_matching_lines(text, regex, isLineLocal):
+                    lineTime = get_entry_time(text, lineStart, timeParser, entryStart)
+                    entryStart, entryTime = lineStart, entryTime if lineTime is None else lineTime
+                    result.lines.append((entryTime, text[lineStart:lineEnd].rstrip('\r\n') + '\n'))
+                lastLineTime = get_entry_time(text, text.rfind('\n', 0, len(text) - 1) + 1, timeParser, entryStart)
+                result.lastTime = entryTime if lastLineTime is None else lastLineTime
+    except (OSError, EOFError) as e:
+        # Compressed log may be truncated, lines found before the error are still printed
+        logging.warning(f"Unable to read '{filePath}': {e}")
+    return result
+
+def get_order_time(lineTime):
+    return NO_TIME if lineTime is None else lineTime
+
+def get_item_time(item):
+    return get_order_time(item[0])
+
+def merge_results(results):
+    """Lines of logs with overlapping time merged by time, each result has lines in time order already"""
+    if len(results) == 1:
+        return (line for _, line in results[0])
+    return (line for _, line in heapq.merge(*results, key=get_item_time))
+
+def search_logs(filePaths, pattern, flags=0, jobs=1):
+    """Yield `<file name>: <line>` of every log matching the pattern in time order.
+
+    Logs are searched in parallel in the order of their first lines. Output of a log is printed as soon as it and
+    logs before it are searched, only logs which overlap in time, like logs of server and client, wait for each other.
+    """
+    firstTimes = {filePath: get_first_time(filePath) for filePath in filePaths}
+    orderedPaths = sorted(filePaths, key=lambda filePath: (get_order_time(firstTimes[filePath]), filePath))
+    executor = ProcessPoolExecutor(max(1, min(jobs, len(orderedPaths))), initializer=lf.ignore_interrupt) if orderedPaths else None
+    try:
+        futures = [executor.submit(search_file, filePath, pattern, flags) for filePath in orderedPaths]
+        index = 0
+        while index < len(orderedPaths):
+            group = []
+            groupEnd = None
+            while index < len(orderedPaths) and (not group or is_overlapping(firstTimes[orderedPaths[index]], groupEnd)):
+                result = futures[index].result()
+                fileName = os.path.basename(orderedPaths[index])
+                group.append([(lineTime, f"{fileName}: {line}") for lineTime, line in result.lines])
+                lastTime = result.lastTime if result.lastTime is not None else firstTimes[orderedPaths[index]]
+                if lastTime is not None and (groupEnd is None or lastTime > groupEnd):
+                    groupEnd = lastTime
+                index += 1
+            yield from merge_results(group)
+    except BaseException:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    if executor:
+        executor.shutdown()
+
+def is_overlapping(firstTime, groupEnd):
+    """True when the log starts before the logs of the group end"""
+    return firstTime is not None and groupEnd is not None and firstTime <= groupEnd
@@ -0,0 +1,326 @@
+import re
+import mmap
+import array
+import operator
+import logging
+from dataclasses import dataclass, field
+from itertools import repeat
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import log_parse as lp
+import log_filter as lf
+
+DEFAULT_VERBOSITY_ID = lp.VERBOSITIES.index(lp.DEFAULT_VERBOSITY)
+# Lines without verbosity have the default one
+VERBOSITY_IDS = {b'': DEFAULT_VERBOSITY_ID, **{verbosity.encode('ascii'): index for index, verbosity in enumerate(lp.VERBOSITIES)}}
+# Variable parts of messages: quoted strings, hex numbers, GUIDs and numbers, replaced to get message templates
+VARIABLE_PATTERN = re.compile(rb'"[^"\n]*"|\'[^\'\n]*\'|0x[0-9A-Fa-f]+|[0-9A-Fa-f]{8}(?:-[0-9A-Fa-f]{4}){3}-[0-9A-Fa-f]{12}|\d+(?:\.\d+)?')
+# Same replacements for text without GUIDs, started only at quotes and digits, so the search skips letters in C
+NUMBER_VARIABLE_PATTERN = re.compile(rb'["\'\d](?:(?<=")[^"\n]*"|(?<=\')[^\'\n]*\'|(?<=0)x[0-9A-Fa-f]+|'
+                                     rb'(?<=\d)[0-9A-Fa-f]{7}(?:-[0-9A-Fa-f]{4}){3}-[0-9A-Fa-f]{12}|(?<=\d)\d*(?:\.\d+)?)')
+# Text without this has no GUIDs
+GUID_HINT_PATTERN = re.compile(rb'-[0-9A-Fa-f]{4}-')
+VARIABLE_PLACEHOLDER = b'#'
+# Line prefix and the message after it up to the end of the line
+MESSAGE_PATTERN = re.compile(lp.LINE_PREFIX_PATTERN.pattern + rb'(?P<message>[^\n]*)', re.M)
+MAX_MESSAGE_OFFSET = 0xFFFF
+# Digits 1-9 made the same keep what the variable patterns match, messages differing only in them have one template
+TEMPLATE_KEY_TABLE = bytes.maketrans(b'23456789', b'11111111')
+# Rare templates are dropped when there are more, counts of the top ones stay exact unless the log has no repeating messages
+MAX_TEMPLATES = 100000
+# Seconds counted for rates of one category, timestamps far from the log start are broken
+MAX_RATE_SECONDS = 31 * 24 * 3600
+DEFAULT_TOP_COUNT = 20
+
+@dataclass
+class LogColumns:
+    """Lines with prefix parsed into columns, item `i` of every array belongs to line `i`.
+
+    Categories and message templates are interned, `categoryIds` point into `categories`, `templateIds` into
+    `templates` and `verbosityIds` into `log_parse.VERBOSITIES`.
+    Entry size is the size of the line with following lines without prefix, like call stacks.
+    """
+    offsets: array.array = field(default_factory=lambda: array.array('q'))
+    seconds: array.array = field(default_factory=lambda: array.array('q'))
+    milliseconds: array.array = field(default_factory=lambda: array.array('H'))
+    frames: array.array = field(default_factory=lambda: array.array('q'))
+    categoryIds: array.array = field(default_factory=lambda: array.array('I'))
+    verbosityIds: array.array = field(default_factory=lambda: array.array('B'))
+    # Message start relative to the line start
+    messageOffsets: array.array = field(default_factory=lambda: array.array('H'))
+    sizes: array.array = field(default_factory=lambda: array.array('q'))
+    templateIds: array.array = field(default_factory=lambda: array.array('I'))
+    categories: List[str] = field(default_factory=list)
+    templates: List[bytes] = field(default_factory=list)
+    # Parsed part of the buffer
+    start: int = 0
+    end: int = 0
+
+    def __len__(self):
+        return len(self.offsets)
+
+def intern_values(values):
+    """Distinct values in order of appearance and array of their indices for every value"""
+    distinct = list(dict.fromkeys(values))
+    indices = {value: index for index, value in enumerate(distinct)}
+    return distinct, array.array('I', map(indices.__getitem__, values))
+
+def parse_columns(data, start=0, end=None) -> LogColumns:
+    """Parse line prefixes of bytes-like `data` from `start` to `end`, only messages are copied.
+
+    Templates are made after the loop by one substitution in distinct template keys of messages, instead of
+    one call for every line.
+    """
+    end = len(data) if end is None else end
+    columns = LogColumns(start=start, end=end)
+    timeParser = lp.TimeParser()
+    categoryIds: Dict[bytes, int] = {}
+    messages = []
+    # Locals are faster in the loop over millions of lines
+    offsets, seconds, milliseconds, frames = columns.offsets, columns.seconds, columns.milliseconds, columns.frames
+    categoryColumn, verbosityColumn, messageOffsets = columns.categoryIds, columns.verbosityIds, columns.messageOffsets
+    secondCache = timeParser.seconds
+    addMessage = messages.append
+    for match in MESSAGE_PATTERN.finditer(data, start, end):
+        offset = match.start()
+        secondText, millisecond, frame, category, verbosity, message = match.groups(b'')
+        categoryId = categoryIds.get(category)
+        if categoryId is None:
+            categoryId = categoryIds[category] = len(columns.categories)
+            columns.categories.append(category.decode('utf-8'))
+        second = secondCache.get(secondText)
+        offsets.append(offset)
+        seconds.append(second if second is not None else timeParser.get_second(match))
+        milliseconds.append(int(millisecond))
+        frames.append(int(frame))
+        categoryColumn.append(categoryId)
+        verbosityColumn.append(VERBOSITY_IDS[verbosity])
+        messageOffsets.append(min(match.end() - offset - len(message), MAX_MESSAGE_OFFSET))
+        addMessage(message)
+
+    columns.sizes = array.array('q', map(operator.sub, offsets[1:], offsets))
+    if offsets:
+        columns.sizes.append(end - offsets[-1])
+    # Messages with the same key get their template once. They have no newlines and variable parts do not match across them
+    distinctKeys, keyIds = intern_values(list(map(bytes.translate, messages, repeat(TEMPLATE_KEY_TABLE))))
+    columns.templates, keyTemplateIds = intern_values(get_template(b'\n'.join(distinctKeys)).split(b'\n'))
+    columns.templateIds = array.array('I', map(keyTemplateIds.__getitem__, keyIds))
+    return columns
+
+def get_template(message):
+    """Message with quoted strings and numbers replaced, so repeated messages have the same template"""
+    pattern = VARIABLE_PATTERN if GUID_HINT_PATTERN.search(message) else NUMBER_VARIABLE_PATTERN
+    return pattern.sub(VARIABLE_PLACEHOLDER, message)
+
+class SecondCounts:
+    """Number of lines in every second from `start`, growing when lines from other seconds are added"""
+
+    def __init__(self):
+        self.start: Optional[int] = None
+        self.counts = array.array('I')
+
+    def add(self, second, count=1):
+        if self.start is None:
+            self.start = second
+        elif second < self.start:
+            if self.start + len(self.counts) - second > MAX_RATE_SECONDS:
+                return
+            self.counts = array.array('I', bytes(self.counts.itemsize * (self.start - second))) + self.counts
+            self.start = second
+        index = second - self.start
+        if index >= len(self.counts):
+            if index >= MAX_RATE_SECONDS:
+                return
+            self.counts.extend(repeat(0, index + 1 - len(self.counts)))
+        self.counts[index] += count
+
+    def merge(self, other: 'SecondCounts'):
+        if other.start is None:
+            return
+        for index, count in enumerate(other.counts):
+            if count:
+                self.add(other.start + index, count)
+
+    def get_peak(self) -> Tuple[Optional[int], int]:
+        """(second, lines) of the busiest second"""
+        if not self.counts:
+            return None, 0
+        peak = max(self.counts)
+        return self.start + self.counts.index(peak), peak
+
+@dataclass
+class GroupStats:
+    lines: int = 0
+    bytes: int = 0
+
+@dataclass
+class LogStats:
+    """Aggregated columns: totals by category and verbosity, lines per second of categories and message templates"""
+    lines: int = 0
+    bytes: int = 0
+    firstSecond: Optional[int] = None
+    lastSecond: Optional[int] = None
+    groups: Dict[Tuple[str, str], GroupStats] = field(default_factory=dict)
+    categorySeconds: Dict[str, SecondCounts] = field(default_factory=dict)
+    # (category, verbosity, template) to [lines, bytes]
+    templates: Dict[Tuple[str, str, bytes], List[int]] = field(default_factory=dict)
+    # Lines without prefix before the first entry, they continue the last entry of the previous part of the log
+    leadingBytes: int = 0
+    lastTemplate: Optional[Tuple[str, str, bytes]] = None
+
+    def add_group(self, key, lines, size):
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = GroupStats()
+        group.lines += lines
+        group.bytes += size
+
+    def add_template(self, key, lines, size):
+        counts = self.templates.get(key)
+        if counts is None:
+            if len(self.templates) >= MAX_TEMPLATES:
+                self.prune_templates()
+            counts = self.templates[key] = [0, 0]
+        counts[0] += lines
+        counts[1] += size
+
+    def prune_templates(self):
+        topTemplates = sorted(self.templates.items(), key=lambda item: item[1][0], reverse=True)[:MAX_TEMPLATES // 2]
+        self.templates = dict(topTemplates)
+
+    def add_leading_bytes(self, size):
+        """Add lines continuing the last entry"""
+        if self.lastTemplate is None:
+            self.leadingBytes += size
+            return
+        category, verbosity, _ = self.lastTemplate
+        self.bytes += size
+        self.groups[(category, verbosity)].bytes += size
+        if self.lastTemplate in self.templates:
+            self.templates[self.lastTemplate][1] += size
+
+    def merge(self, other: 'LogStats'):
+        """Add statistics of the following part of the log"""
+        self.add_leading_bytes(other.leadingBytes)
+        if other.lastTemplate is not None:
+            self.lastTemplate = other.lastTemplate
+        self.lines += other.lines
+        self.bytes += other.bytes
+        if other.firstSecond is not None:
+            self.firstSecond = other.firstSecond if self.firstSecond is None else min(self.firstSecond, other.firstSecond)
+            self.lastSecond = other.lastSecond if self.lastSecond is None else max(self.lastSecond, other.lastSecond)
+        for key, group in other.groups.items():
+            self.add_group(key, group.lines, group.bytes)
+        for category, secondCounts in other.categorySeconds.items():
+            self.categorySeconds.setdefault(category, SecondCounts()).merge(secondCounts)
+        for key, (lines, size) in other.templates.items():
+            self.add_template(key, lines, size)
+
+    def get_duration(self):
+        if self.firstSecond is None:
+            return 0
+        return self.lastSecond - self.firstSecond + 1
+
+def compute_stats(columns: LogColumns) -> LogStats:
+    """Aggregate parsed columns, lines are counted by `Counter` in C, only bytes of templates are summed in Python"""
+    stats = LogStats()
+    if not len(columns):
+        stats.leadingBytes = columns.end - columns.start
+        return stats
+    stats.leadingBytes = columns.offsets[0] - columns.start
+    stats.lines = len(columns)
+    stats.bytes = sum(columns.sizes)
+    stats.firstSecond = min(columns.seconds)
+    stats.lastSecond = max(columns.seconds)
+
+    # Counting of column tuples runs in C
+    groupLines = Counter(zip(columns.categoryIds, columns.verbosityIds))
+    secondCounts = Counter(zip(columns.categoryIds, columns.seconds))
+    templateKeys = list(zip(columns.categoryIds, columns.verbosityIds, columns.templateIds))
+    templateLines = Counter(templateKeys)
+    templateBytes: Dict[Tuple[int, int, int], int] = defaultdict(int)
+    for templateKey, size in zip(templateKeys, columns.sizes):
+        templateBytes[templateKey] += size
+
+    categories, templates = columns.categories, columns.templates
+    categoryId, verbosityId, templateId = templateKeys[-1]
+    stats.lastTemplate = (categories[categoryId], lp.VERBOSITIES[verbosityId], templates[templateId])
+    groupBytes: Dict[Tuple[int, int], int] = {}
+    for (categoryId, verbosityId, templateId), lines in templateLines.items():
+        size = templateBytes[(categoryId, verbosityId, templateId)]
+        groupBytes[(categoryId, verbosityId)] = groupBytes.get((categoryId, verbosityId), 0) + size
+        stats.add_template((categories[categoryId], lp.VERBOSITIES[verbosityId], templates[templateId]), lines, size)
+    for (categoryId, verbosityId), lines in groupLines.items():
+        stats.add_group((categories[categoryId], lp.VERBOSITIES[verbosityId]), lines, groupBytes[(categoryId, verbosityId)])
+    for (categoryId, second), lines in secondCounts.items():
+        stats.categorySeconds.setdefault(categories[categoryId], SecondCounts()).add(second, lines)
+    return stats
+
+def compute_file_stats(filePath, start=0, end=None) -> LogStats:
+    """Statistics of the part of the log file, mapped to memory"""
+    with open(filePath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return compute_stats(parse_columns(data, start, end))
+
+def collect_stats(filePath, jobs=1, chunkSize=lf.PARALLEL_CHUNK_SIZE) -> LogStats:
+    """Statistics of the whole log, parts of it are parsed in `jobs` processes"""
+    ranges = lf.get_line_ranges(filePath, chunkSize)
+    stats = LogStats()
+    if jobs <= 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            stats.merge(compute_file_stats(filePath, start, end))
+        return stats
+
+    logging.debug(f"Parsing {len(ranges)} parts of the log in {jobs} processes")
+    starts, ends = zip(*ranges)
+    executor = ProcessPoolExecutor(min(jobs, len(ranges)), initializer=lf.ignore_interrupt)
+    try:
+        for partStats in executor.map(compute_file_stats, repeat(filePath), starts, ends):
+            stats.merge(partStats)
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return stats
+
+def format_bytes(size):
+    for unit in ("B", "K", "M"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}G"
+
+def print_stats(stats: LogStats, topCount=DEFAULT_TOP_COUNT):
+    duration = stats.get_duration()
+    print(f"Lines: {stats.lines}, size: {format_bytes(stats.bytes)}, duration: {duration}s, "
+          f"lines/s: {stats.lines / duration if duration else 0:.1f}")
+    if not stats.lines:
+        return
+
+    categories: Dict[str, GroupStats] = {}
+    verbosities: Dict[str, GroupStats] = {}
+    for (category, verbosity), group in stats.groups.items():
+        for totals, key in ((categories, category), (verbosities, verbosity)):
+            total = totals.setdefault(key, GroupStats())
+            total.lines += group.lines
+            total.bytes += group.bytes
+
+    nameWidth = max(len("Category"), *(len(category) for category in categories))
+    print(f"\n{'Category':<{nameWidth}}  {'Lines':>10}  {'Size':>8}  {'Lines/s':>8}  {'Peak/s':>7}  Peak at")
+    for category, total in sorted(categories.items(), key=lambda item: item[1].bytes, reverse=True):
+        peakSecond, peakLines = stats.categorySeconds[category].get_peak()
+        peakTime = lp.format_time(peakSecond)[:-4] if peakSecond is not None else "-"
+        print(f"{category:<{nameWidth}}  {total.lines:>10}  {format_bytes(total.bytes):>8}  "
+              f"{total.lines / duration:>8.2f}  {peakLines:>7}  {peakTime}")
+
+    print(f"\n{'Verbosity':<{nameWidth}}  {'Lines':>10}  {'Size':>8}")
+    for verbosity in lp.VERBOSITIES:
+        if verbosity in verbosities:
+            print(f"{verbosity:<{nameWidth}}  {verbosities[verbosity].lines:>10}  {format_bytes(verbosities[verbosity].bytes):>8}")
+
+    print(f"\nTop {topCount} message templates by size:")
+    topTemplates = sorted(stats.templates.items(), key=lambda item: item[1][1], reverse=True)[:topCount]
+    for (category, verbosity, template), (lines, size) in topTemplates:
+        message = template.decode('utf-8', errors='replace').rstrip('\r')
+        print(f"{lines:>10}  {format_bytes(size):>8}  {category}: {verbosity}: {message}")
@@ -0,0 +1,138 @@
+import os
+import sys
+import time
+import signal
+import logging
+import threading
+import subprocess as sp
+
+PROC_DIR = "/proc"
+RSS_SAMPLE_INTERVAL = 0.5
+KILL_GRACE_PERIOD = 5.0
+KILL_POLL_INTERVAL = 0.1
+
+def is_proc_available():
+    return os.path.isdir(os.path.join(PROC_DIR, "self"))
+
+def read_parent_pids():
+    """Map of pid to parent pid for all running processes"""
+    parentPids = {}
+    for entry in os.listdir(PROC_DIR):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(PROC_DIR, entry, "stat")) as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Process name is in parentheses and can contain spaces, fields after it are fixed
+        fields = stat[stat.rfind(')') + 2:].split()
+        parentPids[int(entry)] = int(fields[1])
+    return parentPids
+
+def get_descendant_pids(pid):
+    """Pids of all processes started by `pid` directly or indirectly, not including `pid` itself"""
+    childPids = {}
+    for childPid, parentPid in read_parent_pids().items():
+        childPids.setdefault(parentPid, []).append(childPid)
+
+    descendants = []
+    pending = list(childPids.get(pid, []))
+    while pending:
+        childPid = pending.pop()
+        descendants.append(childPid)
+        pending.extend(childPids.get(childPid, []))
+    return descendants
+
+def is_process_running(pid):
+    """Process exists and is not a zombie waiting to be reaped"""
+    if is_proc_available():
+        try:
+            with open(os.path.join(PROC_DIR, str(pid), "stat")) as f:
+                stat = f.read()
+        except OSError:
+            return False
+        return stat[stat.rfind(')') + 2:].split()[0] != 'Z'
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def send_signal(pids, groupId, signalNumber):
+    if groupId is not None:
+        try:
+            os.killpg(groupId, signalNumber)
+        except OSError:
+            pass
+    for pid in pids:
+        try:
+            os.kill(pid, signalNumber)
+        except OSError:
+            pass
+
+def kill_process_tree(pid, groupId=None, gracePeriod=KILL_GRACE_PERIOD):
+    """Terminate the process and everything it started, forcefully after grace period.
+
+    On Unix-like systems `groupId` is the process group the process was started in, the whole group is signalled.
+    Descendants are collected from /proc too, so compilers which moved to their own group are not left running.
+    """
+    if sys.platform == "win32":
+        sp.run(["taskkill", "/T", "/F", "/PID", str(pid)], stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+        return
+
+    # Children are reparented once their parent dies, so the tree is collected before any signal
+    pids = [pid] + (get_descendant_pids(pid) if is_proc_available() else [])
+    logging.debug(f"Terminating process tree of {pid}: {pids}")
+    send_signal(pids, groupId, signal.SIGTERM)
+
+    deadline = time.monotonic() + gracePeriod
+    while time.monotonic() < deadline:
+        if not any(is_process_running(treePid) for treePid in pids):
+            return
+        time.sleep(KILL_POLL_INTERVAL)
+
+    pids += [descendantPid for descendantPid in (get_descendant_pids(pid) if is_proc_available() else []) if descendantPid not in pids]
+    logging.debug(f"Killing process tree of {pid}: {pids}")
+    send_signal(pids, groupId, signal.SIGKILL)
+
+def get_process_rss(pid):
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), "statm")) as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def get_tree_rss(pid):
+    """Resident memory of the process and all its descendants in bytes"""
+    return sum(get_process_rss(treePid) for treePid in [pid] + get_descendant_pids(pid))
+
+class PeakRssSampler:
+    """Samples resident memory of a process tree from /proc in background thread and keeps the peak value"""
+
+    def __init__(self, pid, interval=RSS_SAMPLE_INTERVAL):
+        self.pid = pid
+        self.interval = interval
+        self.peakRss = 0
+        self.stopEvent = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopEvent.set()
+        self.thread.join()
+        return self.peakRss
+
+    def sample(self):
+        while True:
+            try:
+                self.peakRss = max(self.peakRss, get_tree_rss(self.pid))
+            except OSError as e:
+                logging.debug(f"Unable to sample memory of process {self.pid}: {e}")
+            if self.stopEvent.wait(self.interval):
+                break
@@ -0,0 +1,137 @@
+import unittest
+import os
+import tempfile
+import json
+import shutil
+import logging
+from build_cache import ArtifactCache, get_artifact_files
+
+class TestArtifactCache(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.test_dir = tempfile.mkdtemp()
+        self.project_dir = os.path.join(self.test_dir, "TestProject")
+        self.cache = ArtifactCache(os.path.join(self.test_dir, "Cache"))
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.test_dir)
+
+    def write_file(self, relPath, content):
+        filePath = os.path.join(self.project_dir, relPath)
+        os.makedirs(os.path.dirname(filePath), exist_ok=True)
+        with open(filePath, 'w') as f:
+            f.write(content)
+
+    def read_file(self, relPath):
+        with open(os.path.join(self.project_dir, relPath)) as f:
+            return f.read()
+
+    def count_objects(self):
+        return sum(len(fileNames) for _, _, fileNames in os.walk(os.path.join(self.cache.cacheDir, "objects")))
+
+    def get_artifact_files(self, buildName, config):
+        return sorted(path.replace(os.sep, '/') for path in get_artifact_files(self.project_dir, buildName, "Win64", config))
+
+    def test_artifact_files(self):
+        self.write_file("Binaries/Win64/Game.exe", "exe")
+        self.write_file("Binaries/Win64/Game-Win64-Shipping.exe", "exe")
+        self.write_file("Binaries/Win64/GameEditor.target", "not json")
+        self.write_file("Binaries/Win64/UnrealEditor-Game.dll", "dll")
+        self.write_file("Binaries/Win64/UnrealEditor-Game-Win64-DebugGame.dll", "dll")
+        self.write_file("Binaries/Linux/Game", "elf")
+        self.write_file("Plugins/Tool/Binaries/Win64/UnrealEditor-Tool.dll", "dll")
+        self.write_file("Plugins/Tool/Content/Tool.uasset", "asset")
+
+        self.assertEqual(self.get_artifact_files("Game", "Development"), ["Binaries/Win64/Game.exe"])
+        self.assertEqual(self.get_artifact_files("Game", "Shipping"), ["Binaries/Win64/Game-Win64-Shipping.exe"])
+        # Editor modules are found by name when the receipt can not be read
+        self.assertEqual(self.get_artifact_files("GameEditor", "Development"),
+                         ["Binaries/Win64/GameEditor.target", "Binaries/Win64/UnrealEditor-Game.dll",
+                          "Plugins/Tool/Binaries/Win64/UnrealEditor-Tool.dll"])
+        self.assertEqual(self.get_artifact_files("GameEditor", "DebugGame"), ["Binaries/Win64/UnrealEditor-Game-Win64-DebugGame.dll"])
+
+    def test_receipt_artifact_files(self):
+        self.write_file("Binaries/Win64/UnrealEditor-Game.dll", "dll")
+        self.write_file("Binaries/Win64/UnrealEditor-Game.pdb", "pdb")
+        self.write_file("Binaries/Win64/UnrealEditor-Old.dll", "dll")
+        self.write_file("Binaries/Win64/GameEditor.target", json.dumps({"BuildProducts": [
+            {"Path": "$(ProjectDir)/Binaries/Win64/UnrealEditor-Game.dll", "Type": "DynamicLibrary"},
+            {"Path": "$(ProjectDir)/Binaries/Win64/UnrealEditor-Game.pdb", "Type": "SymbolFile"},
+            {"Path": "$(EngineDir)/Binaries/Win64/UnrealEditor.exe", "Type": "Executable"}]}))
+
+        self.assertEqual(self.get_artifact_files("GameEditor", "Development"),
+                         ["Binaries/Win64/GameEditor.target", "Binaries/Win64/UnrealEditor-Game.dll",
+                          "Binaries/Win64/UnrealEditor-Game.pdb"])
+
+    def test_store_and_restore(self):
+        self.write_file("Binaries/Win64/Game.exe", "development")
+        self.write_file("Binaries/Win64/Game.pdb", "same")
+        self.cache.store("development", self.project_dir, "Game", "Win64", "Development")
+
+        self.write_file("Binaries/Win64/Game.exe", "shipping")
+        self.cache.store("shipping", self.project_dir, "Game", "Win64", "Development")
+        # Unchanged file is stored once
+        self.assertEqual(self.count_objects(), 3)
+
+        self.assertTrue(self.cache.restore("development", self.project_dir, "Game", "Win64", "Development"))
+        self.assertEqual(self.read_file("Binaries/Win64/Game.exe"), "development")
+        self.assertTrue(self.cache.restore("shipping", self.project_dir, "Game", "Win64", "Development"))
+        self.assertEqual(self.read_file("Binaries/Win64/Game.exe"), "shipping")
+        self.assertFalse(self.cache.restore("unknown", self.project_dir, "Game", "Win64", "Development"))
+
+    def write_receipt(self, relPath, products):
+        self.write_file(relPath, json.dumps({"BuildProducts": [{"Path": "$(ProjectDir)/" + product} for product in products]}))
+
+    def test_restore_removes_stale_files(self):
+        self.write_file("Binaries/Win64/UnrealEditor-Game.dll", "cached")
+        self.write_receipt("Binaries/Win64/GameEditor.target", ["Binaries/Win64/UnrealEditor-Game.dll"])
+        self.cache.store("cached", self.project_dir, "GameEditor", "Win64", "Development")
+        # Newer build of the target has one more module
+        self.write_file("Binaries/Win64/UnrealEditor-Game.dll", "changed")
+        self.write_file("Binaries/Win64/UnrealEditor-NewModule.dll", "new")
+        self.write_receipt("Binaries/Win64/GameEditor.target",
+                           ["Binaries/Win64/UnrealEditor-Game.dll", "Binaries/Win64/UnrealEditor-NewModule.dll"])
+        self.write_file("Binaries/Win64/UnrealEditor-OtherTarget.dll", "other")
+        self.write_file("Binaries/Win64/Game.exe", "game")
+
+        self.assertTrue(self.cache.restore("cached", self.project_dir, "GameEditor", "Win64", "Development"))
+        self.assertEqual(self.read_file("Binaries/Win64/UnrealEditor-Game.dll"), "cached")
+        self.assertFalse(os.path.exists(os.path.join(self.project_dir, "Binaries/Win64/UnrealEditor-NewModule.dll")))
+        self.assertEqual(self.get_artifact_files("GameEditor", "Development"),
+                         ["Binaries/Win64/GameEditor.target", "Binaries/Win64/UnrealEditor-Game.dll"])
+        # Files not in the receipt are not touched, even with names like outputs of the target
+        self.assertEqual(self.read_file("Binaries/Win64/UnrealEditor-OtherTarget.dll"), "other")
+        self.assertEqual(self.read_file("Binaries/Win64/Game.exe"), "game")
+
+    def test_restore_keeps_recorded_mtime(self):
+        cache = ArtifactCache(os.path.join(self.test_dir, "Cache"), useHardlinks=True)
+        filePath = os.path.join(self.project_dir, "Binaries/Win64/Game.exe")
+        mtimes = {"first": 1_000_000_000_000_000_000, "second": 1_100_000_000_000_000_000}
+        for key, mtimeNs in mtimes.items():
+            # Same content built twice is one object with two recorded mtimes
+            self.write_file("Binaries/Win64/Game.exe", "same")
+            os.utime(filePath, ns=(mtimeNs, mtimeNs))
+            cache.store(key, self.project_dir, "Game", "Win64", "Development")
+
+        for key in ["second", "first", "second"]:
+            self.assertTrue(cache.restore(key, self.project_dir, "Game", "Win64", "Development"))
+            self.assertEqual(os.stat(filePath).st_mtime_ns, mtimes[key])
+
+    def test_lru_eviction(self):
+        self.cache.maxSize = 12
+        self.write_file("Binaries/Win64/Game.exe", "first")
+        self.cache.store("first", self.project_dir, "Game", "Win64", "Development")
+        self.write_file("Binaries/Win64/Game.exe", "second")
+        self.cache.store("second", self.project_dir, "Game", "Win64", "Development")
+        self.assertTrue(self.cache.restore("first", self.project_dir, "Game", "Win64", "Development"))
+
+        # 'second' is the least recently used one now
+        self.write_file("Binaries/Win64/Game.exe", "third")
+        self.cache.store("third", self.project_dir, "Game", "Win64", "Development")
+
+        self.assertFalse(self.cache.restore("second", self.project_dir, "Game", "Win64", "Development"))
+        self.assertTrue(self.cache.restore("first", self.project_dir, "Game", "Win64", "Development"))
+        self.assertEqual(self.count_objects(), 2)
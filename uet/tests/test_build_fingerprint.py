@@ -0,0 +1,79 @@
+import unittest
+import os
+import tempfile
+import shutil
+import logging
+import build_fingerprint as bf
+from build_config import BuildConfig
+from build_matrix import BuildCell
+
+class TestBuildFingerprint(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+
+        # Create a temporary project structure
+        self.project_dir = tempfile.mkdtemp()
+        self.write_file("TestProject.uproject", '{"EngineAssociation": "4.27"}')
+        self.write_file("Source/TestProject.Target.cs", "// Game target")
+        self.write_file("Source/TestProject/TestProject.Build.cs", "// Module rules")
+        self.write_file("Source/TestProject/Actor.cpp", "// Code")
+        self.write_file("Plugins/Tool/Tool.uplugin", "{}")
+        self.write_file("Plugins/Tool/Source/Tool/Tool.cpp", "// Plugin code")
+        self.write_file("Plugins/Tool/Content/Big.uasset", "asset")
+        self.write_file("Plugins/Tool/Binaries/Win64/Tool.dll", "binary")
+
+        self.config = BuildConfig(source_path=self.project_dir)
+        self.cell = BuildCell("Win64", "Development", "Editor")
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.project_dir)
+
+    def write_file(self, relPath, content):
+        filePath = os.path.join(self.project_dir, relPath)
+        os.makedirs(os.path.dirname(filePath), exist_ok=True)
+        with open(filePath, 'w') as f:
+            f.write(content)
+
+    def test_source_files(self):
+        sourceFiles = [path.replace(os.sep, '/') for path in bf.get_source_files(self.project_dir)]
+        self.assertEqual(sourceFiles, [
+            "TestProject.uproject",
+            "Source/TestProject.Target.cs",
+            "Source/TestProject/Actor.cpp",
+            "Source/TestProject/TestProject.Build.cs",
+            "Plugins/Tool/Tool.uplugin",
+            "Plugins/Tool/Source/Tool/Tool.cpp",
+        ])
+
+    def test_digest_follows_content(self):
+        digest = bf.compute_source_digest(self.project_dir)
+        self.assertEqual(digest, bf.compute_source_digest(self.project_dir))
+
+        # Touching a file without changing it keeps the digest
+        actorPath = os.path.join(self.project_dir, "Source/TestProject/Actor.cpp")
+        os.utime(actorPath, ns=(0, 0))
+        self.assertEqual(digest, bf.compute_source_digest(self.project_dir))
+
+        self.write_file("Source/TestProject/Actor.cpp", "// Changed code")
+        self.assertNotEqual(digest, bf.compute_source_digest(self.project_dir))
+
+    def test_cell_fingerprint_depends_on_flags(self):
+        fingerprint = bf.compute_cell_fingerprint("digest", None, self.cell, self.config)
+        self.assertNotEqual(fingerprint, bf.compute_cell_fingerprint("digest", None, BuildCell("Win64", "Shipping", "Editor"), self.config))
+        self.config.non_unity = True
+        self.assertNotEqual(fingerprint, bf.compute_cell_fingerprint("digest", None, self.cell, self.config))
+
+    def test_up_to_date(self):
+        fingerprints = bf.BuildFingerprints(self.project_dir)
+        self.assertFalse(fingerprints.is_up_to_date(self.cell, "abc"))
+
+        fingerprints.record(self.cell, "abc")
+        # No binaries for the platform yet
+        self.assertFalse(bf.BuildFingerprints(self.project_dir).is_up_to_date(self.cell, "abc"))
+
+        os.makedirs(os.path.join(self.project_dir, "Binaries", "Win64"))
+        self.assertTrue(bf.BuildFingerprints(self.project_dir).is_up_to_date(self.cell, "abc"))
+        self.assertFalse(bf.BuildFingerprints(self.project_dir).is_up_to_date(self.cell, "def"))
@@ -0,0 +1,65 @@
+import unittest
+import tempfile
+import shutil
+import logging
+import build_history as bh
+from build_config import BuildConfig
+from build_matrix import BuildCell, BuildBatch
+from build_runner import ProcessResult
+from build_progress import get_expected_duration
+
+class TestBuildHistory(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.project_dir = tempfile.mkdtemp()
+        self.config = BuildConfig(source_path=self.project_dir)
+        self.cell = BuildCell("Win64", "Development", "Editor")
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.project_dir)
+
+    def test_append_and_read(self):
+        history = bh.BuildHistory(self.project_dir)
+        history.append(bh.create_record(self.cell, ProcessResult(0, 12.5, user_time=40.0, sys_time=2.0, peak_rss=1024), self.config))
+        history.append(bh.create_record(self.cell, ProcessResult(5, 3.0), self.config))
+
+        records = history.read()
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]['cell'], "Win64_Development_Editor")
+        self.assertEqual(records[0]['wall'], 12.5)
+        self.assertEqual(records[0]['peak_rss'], 1024)
+        self.assertNotIn('user', records[1])
+        self.assertEqual(len(history.get_cell_records("Win64_Development_Editor")), 1)
+
+    def test_batch_records(self):
+        batch = BuildBatch([self.cell, BuildCell("Win64", "Development", "Game")])
+        history = bh.BuildHistory(self.project_dir)
+        for record in bh.create_records(batch, ProcessResult(0, 100.0, peak_rss=2048), self.config, parallelActions=8):
+            history.append(record)
+        history.append(bh.create_records(self.cell, ProcessResult(0, 60.0), self.config)[0])
+
+        # Every cell of the batch has a record of the shared run
+        gameRecords = history.get_cell_records("Win64_Development_Game")
+        self.assertEqual([(record['batch'], record['batch_cells'], record['peak_rss']) for record in gameRecords],
+                         [(batch.get_name(), 2, 2048)])
+        editorRecords = history.get_cell_records("Win64_Development_Editor")
+        self.assertEqual(len(editorRecords), 2)
+        self.assertNotIn('batch', editorRecords[1])
+        # Cells get equal parts of the batch time
+        self.assertEqual(get_expected_duration(gameRecords), 50.0)
+        # Single builds are not compared with batch runs
+        self.assertIsNone(bh.find_regression(editorRecords, 5, 10.0))
+
+    def test_find_regression(self):
+        records = [{'wall': wall} for wall in [100, 110, 90, 100, 125]]
+        baseline, change, isRegression = bh.find_regression(records, 5, 10.0)
+        self.assertEqual(baseline, 100)
+        self.assertAlmostEqual(change, 25.0)
+        self.assertTrue(isRegression)
+
+        # Builds with other flags are not a baseline
+        records = [{'wall': 50, 'non_unity': True}, {'wall': 100}]
+        self.assertIsNone(bh.find_regression(records, 5, 10.0))
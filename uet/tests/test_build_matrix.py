@@ -0,0 +1,108 @@
+import unittest
+import logging
+import threading
+import time
+from build_matrix import BuildCell, BuildMatrixExecutor, CellCancelled, CellStatus, create_build_cells, has_failed_cells
+
+class TestBuildMatrix(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_create_build_cells(self):
+        cells = create_build_cells(["Win64", "Linux"], ["Development"], ["Editor", "Game"])
+        self.assertEqual([cell.get_name() for cell in cells], [
+            "Win64_Development_Editor",
+            "Win64_Development_Game",
+            "Linux_Development_Editor",
+            "Linux_Development_Game",
+        ])
+
+    def test_failed_cell_does_not_stop_others(self):
+        built = []
+        def build(cell):
+            built.append(cell.target)
+            if cell.target == "Game":
+                raise RuntimeError("compile error")
+
+        cells = create_build_cells(["Win64"], ["Development"], ["Editor", "Game", "Server"])
+        results = BuildMatrixExecutor(build, jobs=1).run(cells)
+
+        self.assertEqual(built, ["Editor", "Game", "Server"])
+        self.assertEqual([result.status for result in results], [CellStatus.SUCCEEDED, CellStatus.FAILED, CellStatus.SUCCEEDED])
+        self.assertEqual(results[1].error, "compile error")
+        self.assertTrue(has_failed_cells(results))
+
+    def test_parallel_jobs(self):
+        lock = threading.Lock()
+        running = [0]
+        maxRunning = [0]
+        def build(cell):
+            with lock:
+                running[0] += 1
+                maxRunning[0] = max(maxRunning[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        cells = create_build_cells(["Win64"], ["Debug", "Development"], ["Editor", "Game"])
+        results = BuildMatrixExecutor(build, jobs=4).run(cells)
+
+        self.assertEqual(maxRunning[0], 4)
+        # Results keep matrix order regardless of completion order
+        self.assertEqual([result.cell for result in results], cells)
+        self.assertFalse(has_failed_cells(results))
+
+    def test_fail_fast_cancels_remaining_cells(self):
+        built = []
+        def build(cell):
+            built.append(cell.target)
+            if cell.target == "Game":
+                raise RuntimeError("compile error")
+
+        cells = create_build_cells(["Win64"], ["Development"], ["Editor", "Game", "Server"])
+        results = BuildMatrixExecutor(build, jobs=1, failFast=True).run(cells)
+
+        self.assertEqual(built, ["Editor", "Game"])
+        self.assertEqual([result.status for result in results], [CellStatus.SUCCEEDED, CellStatus.FAILED, CellStatus.CANCELLED])
+
+    def test_fail_fast_stops_running_cells(self):
+        cancel_event = threading.Event()
+        def build(cell):
+            if cell.target == "Game":
+                raise RuntimeError("compile error")
+            # Long build which watches cancellation like the build runner does
+            if cancel_event.wait(5):
+                raise CellCancelled("stopped")
+
+        cells = create_build_cells(["Win64"], ["Development"], ["Editor", "Game"])
+        results = BuildMatrixExecutor(build, jobs=2, failFast=True, cancelEvent=cancel_event).run(cells)
+
+        self.assertEqual([result.status for result in results], [CellStatus.CANCELLED, CellStatus.FAILED])
+        self.assertLess(results[0].duration, 5)
+        self.assertTrue(has_failed_cells(results))
+
+    def test_batches_per_platform(self):
+        batches = []
+        built = []
+        def build_batch(cells):
+            batches.append([cell.get_name() for cell in cells])
+            # Second cell of every batch is built separately
+            return [CellStatus.SUCCEEDED, None] + [CellStatus.UP_TO_DATE] * (len(cells) - 2)
+        def build(cell):
+            built.append(cell.get_name())
+
+        cells = create_build_cells(["Win64", "Linux"], ["Development"], ["Editor", "Game", "Server"])
+        results = BuildMatrixExecutor(build, jobs=2, batchFunc=build_batch).run(cells)
+
+        self.assertEqual(sorted(batches), [
+            ["Linux_Development_Editor", "Linux_Development_Game", "Linux_Development_Server"],
+            ["Win64_Development_Editor", "Win64_Development_Game", "Win64_Development_Server"],
+        ])
+        self.assertEqual(sorted(built), ["Linux_Development_Game", "Win64_Development_Game"])
+        self.assertEqual([result.cell for result in results], cells)
+        self.assertEqual([result.status for result in results], [CellStatus.SUCCEEDED, CellStatus.SUCCEEDED, CellStatus.UP_TO_DATE] * 2)
@@ -0,0 +1,77 @@
+import unittest
+import logging
+import build_plan as bpl
+import build_history as bh
+from build_config import BuildConfig
+from build_matrix import BuildCell, BuildBatch, create_build_cells
+from build_runner import ProcessResult
+
+class TestBuildPlan(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_prune_invalid_cells(self):
+        cells = create_build_cells(["Linux", "Mac"], ["Development", "Shipping"], ["Editor", "Game", "Server"])
+
+        valid, pruned = bpl.prune_cells(cells, projectTargets=["Editor", "Game"], hostPlatforms=["Linux"])
+
+        self.assertEqual([cell.get_name() for cell in valid], ["Linux_Development_Editor", "Linux_Development_Game", "Linux_Shipping_Game"])
+        reasons = {prunedCell.cell.get_name(): prunedCell.reason for prunedCell in pruned}
+        self.assertEqual(reasons["Linux_Shipping_Editor"], "Editor target can not be built in Shipping configuration")
+        self.assertEqual(reasons["Linux_Development_Server"], "project has no Server target")
+        self.assertEqual(reasons["Mac_Development_Game"], "Mac can not be built on this host")
+
+    def test_debug_game_editor_is_not_pruned(self):
+        cells = create_build_cells(["Win64"], ["Debug", "DebugGame", "Development", "Test"], ["Editor"])
+        valid, pruned = bpl.prune_cells(cells)
+        self.assertEqual([cell.config for cell in valid], ["Debug", "DebugGame", "Development"])
+        self.assertEqual([prunedCell.cell.config for prunedCell in pruned], ["Test"])
+
+    def test_unknown_targets_and_platforms_are_not_pruned(self):
+        valid, pruned = bpl.prune_cells([BuildCell("Win64", "Development", "Client")])
+        self.assertEqual(len(valid), 1)
+        self.assertFalse(pruned)
+
+    def test_longest_first_order(self):
+        cells = create_build_cells(["Linux"], ["Debug", "Development", "Shipping"], ["Game"])
+        estimates = {"Linux_Debug_Game": 100.0, "Linux_Development_Game": 300.0}
+
+        plan = bpl.create_build_plan(cells, estimates)
+
+        # Never built cell is planned as the longest known one, stable order keeps it after it
+        self.assertEqual([cell.config for cell in plan.get_cells()], ["Development", "Shipping", "Debug"])
+        self.assertEqual(bpl.get_unit_durations(plan), [300.0, 300.0, 100.0])
+
+    def test_estimate_makespan(self):
+        self.assertEqual(bpl.estimate_makespan([5, 4, 3, 2], 2), 7)
+        self.assertEqual(bpl.estimate_makespan([5, 4, 3], 1), 12)
+        self.assertEqual(bpl.estimate_makespan([], 4), 0)
+
+    def test_batch_units(self):
+        cells = create_build_cells(["Win64", "Linux"], ["Development"], ["Editor", "Game"])
+        estimates = {cell.get_name(): 10.0 for cell in cells}
+        plan = bpl.create_build_plan(cells, estimates)
+        self.assertEqual(bpl.get_unit_durations(plan, batchTargets=True), [20.0, 20.0])
+
+    def test_estimates_from_batch_history(self):
+        cells = create_build_cells(["Win64"], ["Development"], ["Editor", "Game", "Server"])
+        config = BuildConfig(source_path=".")
+        records = bh.create_records(BuildBatch(cells[:2]), ProcessResult(0, 300.0), config)
+        records += bh.create_records(cells[2], ProcessResult(0, 100.0), config)
+        records += bh.create_records(cells[2], ProcessResult(1, 5.0), config)
+
+        estimates = bpl.get_cell_estimates(records)
+        self.assertEqual(estimates, {"Win64_Development_Editor": 150.0, "Win64_Development_Game": 150.0,
+                                     "Win64_Development_Server": 100.0})
+        plan = bpl.create_build_plan(cells, estimates)
+        self.assertTrue(all(plannedCell.estimate is not None for plannedCell in plan.cells))
+        # Batch of all cells is expected to take as long as its cells did
+        self.assertEqual(bpl.get_unit_durations(plan, batchTargets=True), [400.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import logging
+from build_progress import ProgressTracker, parse_action_line, get_expected_duration
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestBuildProgress(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_parse_action_line(self):
+        self.assertEqual(parse_action_line("[12/340] Compile [x64] Module.Core.cpp"), (12, 340, "Compile", "Module.Core.cpp"))
+        self.assertEqual(parse_action_line("[3/3] Link (lld) libUnrealEditor-Game.so"), (3, 3, "Link", "(lld) libUnrealEditor-Game.so"))
+        self.assertIsNone(parse_action_line("Building 3 actions with 32 processes..."))
+
+    def test_progress_and_longest_gaps(self):
+        tracker = ProgressTracker(clock=self.clock)
+        self.clock.now = 10.0
+        self.assertIsNone(tracker.on_line("Parsing headers for GameEditor"))
+        tracker.on_line("[1/4] Compile [x64] A.cpp")
+        self.clock.now = 12.0
+        tracker.on_line("[2/4] Compile [x64] B.cpp")
+        self.clock.now = 20.0
+        line = tracker.on_line("[3/4] Compile [x64] C.cpp")
+        self.clock.now = 21.0
+        tracker.on_line("[4/4] Link [x64] Game.exe")
+
+        self.assertIn("75% 3/4 ETA 5s Compile C.cpp", line)
+        self.assertEqual(tracker.total, 4)
+        self.assertEqual([event.item for event in tracker.get_longest_gaps(("Compile",))], ["A.cpp", "C.cpp", "B.cpp"])
+        self.assertEqual(tracker.get_longest_gaps(("Link",))[0].gap, 1.0)
+
+    def test_eta_seeded_by_history(self):
+        tracker = ProgressTracker(expectedDuration=100.0, clock=self.clock)
+        self.clock.now = 30.0
+        self.assertEqual(tracker.get_eta(), 70.0)
+        self.assertEqual(get_expected_duration([{'wall': 90}, {'wall': 100}, {'wall': 200}]), 100)
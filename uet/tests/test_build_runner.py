@@ -0,0 +1,116 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import time
+import logging
+import signal
+import threading
+import subprocess
+import process_tree
+from build_runner import run_streamed
+
+class TestBuildRunner(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.test_dir)
+
+    def test_streams_both_pipes(self):
+        script = "import sys\nfor i in range(3):\n    print('out', i, flush=True)\n    print('err', i, file=sys.stderr, flush=True)\nsys.exit(3)"
+        log_path = os.path.join(self.test_dir, "Logs", "cell.log")
+        lines = []
+
+        result = run_streamed([sys.executable, "-c", script], log_path, lineHandler=lambda line, isError: lines.append((line, isError)))
+
+        self.assertEqual(result.returncode, 3)
+        self.assertEqual([line for line, isError in lines if not isError], ["out 0", "out 1", "out 2"])
+        self.assertEqual(result.error_tail, ["err 0", "err 1", "err 2"])
+        with open(log_path) as f:
+            self.assertEqual(sorted(f.read().splitlines()), ["err 0", "err 1", "err 2", "out 0", "out 1", "out 2"])
+
+    def test_error_tail_is_bounded(self):
+        script = "import sys\nfor i in range(1000):\n    print(i, file=sys.stderr)"
+
+        result = run_streamed([sys.executable, "-c", script])
+
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(len(result.error_tail), 20)
+        self.assertEqual(result.error_tail[-1], "999")
+
+    def test_cancel_kills_process_tree(self):
+        pid_path = os.path.join(self.test_dir, "grandchild.pid")
+        # Child starts a grandchild and both keep running, like UBT with compilers
+        script = ("import subprocess, sys, time\n"
+                  "grandchild = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+                  f"open({pid_path!r}, 'w').write(str(grandchild.pid))\n"
+                  "print('started', flush=True)\n"
+                  "time.sleep(60)")
+        cancel_event = threading.Event()
+        def on_line(line, isError):
+            if line == "started":
+                cancel_event.set()
+
+        start_time = time.monotonic()
+        result = run_streamed([sys.executable, "-c", script], lineHandler=on_line, cancelEvent=cancel_event)
+
+        self.assertTrue(result.cancelled)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertLess(time.monotonic() - start_time, 30)
+        with open(pid_path) as f:
+            grandchild_pid = int(f.read())
+        for _ in range(50):
+            if not process_tree.is_process_running(grandchild_pid):
+                break
+            time.sleep(0.1)
+        self.assertFalse(process_tree.is_process_running(grandchild_pid))
+
+    @unittest.skipIf(sys.platform == "win32", "SIGTERM can not be handled on Windows")
+    def test_terminate_signal_kills_process_tree(self):
+        pid_path = os.path.join(self.test_dir, "grandchild.pid")
+        child_script = ("import subprocess, sys, time\n"
+                        "grandchild = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+                        f"open({pid_path!r}, 'w').write(str(grandchild.pid))\n"
+                        "time.sleep(60)")
+        # Build script terminated like by CI, its UBT runs in another session and gets no signal itself
+        script = ("import sys\n"
+                  f"sys.path.insert(0, {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))!r})\n"
+                  "import build, build_runner\n"
+                  "builder = build.ProjectBuilder()\n"
+                  "builder.install_signal_handlers()\n"
+                  f"result = build_runner.run_streamed([sys.executable, '-c', {child_script!r}], cancelEvent=builder.cancelEvent)\n"
+                  "print('cancelled', result.cancelled)")
+        builder = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            for _ in range(100):
+                if os.path.isfile(pid_path) and os.path.getsize(pid_path):
+                    break
+                time.sleep(0.1)
+            builder.send_signal(signal.SIGTERM)
+            output, _ = builder.communicate(timeout=30)
+        finally:
+            builder.kill()
+
+        self.assertEqual(output.strip(), "cancelled True")
+        with open(pid_path) as f:
+            grandchild_pid = int(f.read())
+        for _ in range(50):
+            if not process_tree.is_process_running(grandchild_pid):
+                break
+            time.sleep(0.1)
+        self.assertFalse(process_tree.is_process_running(grandchild_pid))
+
+    def test_no_output_timeout(self):
+        script = "import time\nprint('working', flush=True)\ntime.sleep(60)"
+
+        result = run_streamed([sys.executable, "-c", script], noOutputTimeout=1)
+
+        self.assertTrue(result.timed_out)
+        self.assertFalse(result.cancelled)
+        self.assertNotEqual(result.returncode, 0)
@@ -0,0 +1,96 @@
+import unittest
+import os
+import tempfile
+import shutil
+import logging
+import threading
+import build_scheduler as bs
+from build_matrix import CellCancelled
+
+GB = 1024 ** 3
+
+class FakeMemory:
+    def __init__(self, available):
+        self.available = available
+
+    def __call__(self):
+        return self.available
+
+class TestBuildScheduler(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.test_dir)
+
+    def test_read_available_memory(self):
+        meminfo_path = os.path.join(self.test_dir, "meminfo")
+        with open(meminfo_path, 'w') as f:
+            f.write("MemTotal:       32000000 kB\nMemFree:         1000000 kB\nMemAvailable:   16000000 kB\n")
+        self.assertEqual(bs.get_available_memory(meminfo_path), 16000000 * 1024)
+        self.assertIsNone(bs.get_available_memory(os.path.join(self.test_dir, "missing")))
+
+    def test_estimate_memory_per_action(self):
+        records = [{'peak_rss': 8 * GB}, {'peak_rss': 8 * GB, 'parallel_actions': 4}, {'peak_rss': 9 * GB, 'parallel_actions': 6}]
+        self.assertEqual(bs.estimate_memory_per_action(records), 2 * GB)
+        self.assertIsNone(bs.estimate_memory_per_action([{'wall': 10}]))
+
+    def test_cores_are_shared(self):
+        scheduler = bs.ResourceScheduler(jobs=2, cpuCount=16, memoryProbe=lambda: None)
+        first = scheduler.acquire("A")
+        second = scheduler.acquire("B")
+        self.assertEqual((first.actions, second.actions), (8, 8))
+
+    def test_cores_are_shared_by_running_units(self):
+        # One platform batch gets all cores, even with more jobs
+        scheduler = bs.ResourceScheduler(jobs=4, cpuCount=32, memoryProbe=lambda: None, unitCount=1)
+        self.assertEqual(scheduler.acquire("Linux").actions, 32)
+
+        scheduler = bs.ResourceScheduler(jobs=2, cpuCount=16, memoryProbe=lambda: None, unitCount=3)
+        first = scheduler.acquire("A")
+        second = scheduler.acquire("B")
+        self.assertEqual((first.actions, second.actions), (8, 8))
+        scheduler.release(first)
+        scheduler.release(second)
+        # The last unit runs alone
+        self.assertEqual(scheduler.acquire("C").actions, 16)
+
+    def test_memory_limits_actions_and_admission(self):
+        memory = FakeMemory(10 * GB)
+        scheduler = bs.ResourceScheduler(jobs=2, cpuCount=16, memoryProbe=memory, recheckInterval=0.01)
+        # 9G budget after reserve, 2G per action
+        first = scheduler.acquire("A", 2 * GB)
+        self.assertEqual(first.actions, 4)
+        self.assertEqual(first.memory, 8 * GB)
+
+        admitted = threading.Event()
+        def acquire_second():
+            scheduler.acquire("B", 2 * GB)
+            admitted.set()
+        thread = threading.Thread(target=acquire_second)
+        thread.start()
+        self.assertFalse(admitted.wait(0.1))
+
+        scheduler.release(first)
+        thread.join(5)
+        self.assertTrue(admitted.is_set())
+
+    def test_single_cell_is_always_admitted(self):
+        scheduler = bs.ResourceScheduler(jobs=1, cpuCount=8, memoryProbe=FakeMemory(1 * GB))
+        reservation = scheduler.acquire("A", 4 * GB)
+        self.assertEqual(reservation.actions, 1)
+
+    def test_cancel_while_waiting(self):
+        scheduler = bs.ResourceScheduler(jobs=2, cpuCount=1, memoryProbe=lambda: None, recheckInterval=0.01)
+        scheduler.acquire("A")
+        cancel_event = threading.Event()
+        cancel_event.set()
+        with self.assertRaises(CellCancelled):
+            scheduler.acquire("B", cancelEvent=cancel_event)
+
+if __name__ == '__main__':
+    unittest.main()
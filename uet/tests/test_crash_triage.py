@@ -0,0 +1,105 @@
+import unittest
+import os
+import shutil
+import tempfile
+import logging
+import crash_triage as ct
+
+ASSERT_CALLSTACK = [
+    "UnrealEditor_Core!FDebug::AssertFailed() [D:\\UE\\Engine\\Source\\Runtime\\Core\\Private\\Misc\\AssertionMacros.cpp:425]",
+    "UnrealEditor_Game!AGameActor::Tick() [D:\\Game\\Source\\GameActor.cpp:{line}]",
+    "UnrealEditor_Engine!AActor::TickActor() [D:\\UE\\Engine\\Source\\Runtime\\Engine\\Private\\Actor.cpp:1200]",
+    "kernel32",
+    "ntdll",
+]
+
+def get_crash_context(crashType, message, callstack):
+    return ("<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n<FGenericCrashContext>\n\t<RuntimeProperties>\n"
+            f"\t\t<CrashType>{crashType}</CrashType>\n\t\t<ErrorMessage>{message}</ErrorMessage>\n"
+            f"\t\t<CallStack>{chr(10).join(callstack)}</CallStack>\n\t</RuntimeProperties>\n</FGenericCrashContext>\n")
+
+class TestCrashTriage(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.crashesPath = os.path.join(self.tempDir.name, "Saved", ct.CRASHES_DIR)
+        os.makedirs(self.crashesPath)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def write_crash(self, folderName, fileName, text):
+        folderPath = os.path.join(self.crashesPath, folderName)
+        os.makedirs(folderPath, exist_ok=True)
+        with open(os.path.join(folderPath, fileName), 'w') as f:
+            f.write(text)
+        return folderPath
+
+    def write_assert(self, folderName, line):
+        callstack = [frame.format(line=line) for frame in ASSERT_CALLSTACK]
+        return self.write_crash(folderName, ct.CRASH_CONTEXT_FILE_NAME,
+                                get_crash_context("Assert", "Assertion failed: IsValid(Actor) &amp;&amp; bReady", callstack))
+
+    def test_normalize_callstack(self):
+        self.assertEqual(ct.normalize_frame("0x00007ffd1234abcd UnrealEditor-Core.dll!FDebug::AssertFailed(char const *) [D:\\UE\\A.cpp:425]"),
+                         "UnrealEditor-Core!FDebug::AssertFailed")
+        self.assertEqual(ct.normalize_frame("libUnrealEditor-Engine.so!AActor::Tick(float) [/ue/Actor.cpp:10]"), "UnrealEditor-Engine!AActor::Tick")
+        self.assertEqual(ct.normalize_frame("UnrealEditor_Game!UnknownFunction (0x00007ff6)"), "UnrealEditor-Game!?")
+        frames = ct.normalize_callstack([frame.format(line=55) for frame in ASSERT_CALLSTACK])
+        self.assertEqual(frames, ["UnrealEditor-Game!AGameActor::Tick", "UnrealEditor-Engine!AActor::TickActor"])
+
+    def test_parse_crash_folder(self):
+        record = ct.parse_crash_folder(self.write_assert("UECC-Windows-1_0000", 55))
+        self.assertEqual((record.folder, record.crashType), ("UECC-Windows-1_0000", "Assert"))
+        self.assertEqual(record.message, "Assertion failed: IsValid(Actor) && bReady")
+        # Line numbers change between builds, signature does not
+        self.assertEqual(ct.parse_crash_folder(self.write_assert("UECC-Windows-2_0000", 70)).signature, record.signature)
+
+        # Crash without context is read from the log
+        folderPath = self.write_crash("UECC-Windows-3_0000", "Game.log",
+            "[2024.10.10-12.00.00:000][  0]LogWindows: Error: === Critical error: ===\n"
+            "[2024.10.10-12.00.00:000][  0]LogWindows: Error: Fatal error: [File:Unknown] [Line: 0] GPU hang\n"
+            "[2024.10.10-12.00.00:000][  0]LogWindows: Error: [Callstack] 0x00007ffd1234abcd UnrealEditor-D3D12RHI.dll!FD3D12Queue::Wait() [D:\\UE\\Q.cpp:100]\n")
+        record = ct.parse_crash_folder(folderPath)
+        self.assertEqual((record.crashType, record.frames), ("Crash", ["UnrealEditor-D3D12RHI!FD3D12Queue::Wait"]))
+        self.assertEqual(record.message, "Fatal error: [File:Unknown] [Line: 0] GPU hang")
+
+    def test_build_crashes_path(self):
+        buildPath = os.path.join(self.tempDir.name, "Build")
+        for dirPath in ["Engine/Binaries", "Game/Binaries", "Game/Content/Maps"]:
+            os.makedirs(os.path.join(buildPath, dirPath))
+        for fileName in ["Game.sh", "Game.exe"]:
+            open(os.path.join(buildPath, fileName), 'w').close()
+        expectedPath = os.path.join(buildPath, "Game", "Saved", ct.CRASHES_DIR)
+        self.assertEqual(ct.get_crashes_path(os.path.join(buildPath, "Game", "Content", "Maps")), expectedPath)
+        self.assertEqual(ct.get_crashes_path(self.crashesPath), self.crashesPath)
+
+    def test_incremental_index(self):
+        for index in range(3):
+            self.write_assert(f"UECC-Windows-{index}_0000", 50 + index)
+        crashIndex = ct.CrashIndex(self.crashesPath)
+        self.assertTrue(crashIndex.filePath.endswith(os.path.join("Saved", "Uet", "CrashIndex.jsonl")))
+        records = crashIndex.update(jobs=2)
+        groups = ct.group_crashes(records)
+        self.assertEqual([len(group.records) for group in groups], [3])
+
+        self.write_crash("UECC-Windows-9_0000", ct.CRASH_CONTEXT_FILE_NAME,
+                         get_crash_context("Crash", "Unhandled Exception", ["UnrealEditor_Game!UComponent::Update() [C.cpp:1]"]))
+        with open(crashIndex.filePath) as f:
+            indexLines = f.readlines()
+        self.assertEqual(len(crashIndex.update(jobs=1)), 4)
+        # Only the new folder is appended
+        with open(crashIndex.filePath) as f:
+            self.assertEqual(f.readlines()[:3], indexLines)
+        self.assertEqual([len(group.records) for group in ct.group_crashes(crashIndex.read().values())], [3, 1])
+
+        # Removed folders are dropped from the index
+        shutil.rmtree(os.path.join(self.crashesPath, "UECC-Windows-0_0000"))
+        self.assertEqual(len(crashIndex.update()), 3)
+        self.assertEqual(len(crashIndex.read()), 3)
+
+if __name__ == '__main__':
+    unittest.main()
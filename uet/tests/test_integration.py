@@ -3,9 +3,11 @@ import os
 import tempfile
 import shutil
 import sys
+import io
 from unittest.mock import patch, MagicMock
 from build import ProjectBuilder, BuildError, get_real_arg_values_list
 from build_config import BuildConfig
+from build_matrix import BuildCell, CellStatus
 from argparse import Namespace
 import logging
 
@@ -205,15 +207,18 @@ class TestProjectBuilder(unittest.TestCase):
             )
             
     @patch('build.ProjectBuilder.get_target_arg')
+    @patch('build_runner.wait_process', new=lambda process: (process.wait(), None))
+    @patch('process_tree.is_proc_available', return_value=False)
     @patch('subprocess.Popen')
-    def test_run_single_build(self, mock_popen, mock_get_target):
+    def test_run_single_build(self, mock_popen, mock_proc_available, mock_get_target):
         # Mock the dependencies
         mock_get_target.return_value = "TestProjectEditor"
         
         # Mock successful process
         process_mock = MagicMock()
-        process_mock.returncode = 0
-        process_mock.communicate.return_value = (b"Build succeeded", b"")
+        process_mock.stdout = io.BytesIO(b"Build succeeded\n")
+        process_mock.stderr = io.BytesIO(b"")
+        process_mock.wait.return_value = 0
         mock_popen.return_value = process_mock
         
         builder = ProjectBuilder()
@@ -254,13 +259,19 @@ class TestProjectBuilder(unittest.TestCase):
         mock_popen.assert_called_once()
         actual_cmd = mock_popen.call_args[0][0]
         self.assertEqual(actual_cmd, expected_cmd)
+
+        # Output is teed to the per-cell build log
+        log_path = builder.get_build_log_path(self.uproject_path, "Win64_Development_Editor")
+        with open(log_path) as f:
+            self.assertEqual(f.read(), "Build succeeded\n")
         
         # Test failed build
         mock_popen.reset_mock()
-        process_mock.returncode = 1
-        process_mock.communicate.return_value = (b"", b"Build failed")
+        process_mock.stdout = io.BytesIO(b"")
+        process_mock.stderr = io.BytesIO(b"Build failed\n")
+        process_mock.wait.return_value = 1
         
-        with self.assertRaises(BuildError):
+        with self.assertRaisesRegex(BuildError, "Build failed"):
             builder.run_single_build(
                 "/fake/build.bat", 
                 self.uproject_path, 
@@ -283,4 +294,39 @@ class TestProjectBuilder(unittest.TestCase):
             "Win64"
         )
         
-        mock_popen.assert_not_called() 
\ No newline at end of file
+        mock_popen.assert_not_called()
+
+    @patch('build.ProjectBuilder.run_ubt')
+    def test_run_batch_build(self, mock_run_ubt):
+        builder = ProjectBuilder()
+        builder.config = BuildConfig(source_path=self.project_dir, force=True)
+        cells = [BuildCell("Win64", "Development", "Editor"), BuildCell("Win64", "Shipping", "Game")]
+
+        statuses = builder.run_batch_build("/fake/build.bat", self.uproject_path, "TestProject", cells)
+
+        self.assertEqual(statuses, [CellStatus.SUCCEEDED, CellStatus.SUCCEEDED])
+        command = mock_run_ubt.call_args[0][0]
+        self.assertEqual(command, [
+            "/fake/build.bat",
+            f'-Target=TestProjectEditor Win64 Development -Project="{self.uproject_path}"',
+            f'-Target=TestProject Win64 Shipping -Project="{self.uproject_path}"',
+        ])
+
+        # Failed batch does not tell which target failed, cells are left for separate builds
+        mock_run_ubt.side_effect = BuildError("Build failed with code 6")
+        statuses = builder.run_batch_build("/fake/build.bat", self.uproject_path, "TestProject", cells)
+        self.assertEqual(statuses, [None, None]) 
+
+    @patch('build.ProjectBuilder.finish_built_cell')
+    @patch('build.ProjectBuilder.run_ubt')
+    def test_single_pending_cell_of_batch_is_checked_once(self, mock_run_ubt, mock_finish_built_cell):
+        builder = ProjectBuilder()
+        builder.config = BuildConfig(source_path=self.project_dir, force=True)
+        cell = BuildCell("Win64", "Development", "Editor")
+
+        with patch.object(builder, 'check_cell', return_value=(None, "fingerprint", None)) as mock_check_cell:
+            self.assertEqual(builder.run_batch_build("/fake/build.bat", self.uproject_path, "TestProject", [cell]), [None])
+            builder.run_single_build("/fake/build.bat", self.uproject_path, "TestProject", cell.config, cell.target, cell.platform)
+        mock_check_cell.assert_called_once()
+        mock_run_ubt.assert_called_once()
+        mock_finish_built_cell.assert_called_once_with(self.uproject_path, cell, "fingerprint", None)
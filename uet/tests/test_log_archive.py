@@ -0,0 +1,79 @@
+import unittest
+import os
+import re
+import gzip
+import tempfile
+import logging
+import log_filter as lf
+import log_cache as lc
+import log_archive as la
+
+LOG_TEXT = (
+    "Log file open, 10/10/24 12:00:00\n"
+    "[2024.10.10-12.00.01:100][  0]LogInit: Display: Running engine\n"
+    "[2024.10.10-12.00.02:200][  1]LogTemp: Temp message\n"
+)
+RULES = [lf.compile_rule('.*LogTemp: .*\n', '', re.M)]
+
+class TestLogArchive(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.tempDir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def write_log(self, fileName, text=LOG_TEXT):
+        filePath = os.path.join(self.tempDir.name, fileName)
+        with open(filePath, 'w', newline='') as f:
+            f.write(text)
+        return filePath
+
+    def test_archive_logs(self):
+        rotatedFilePath = self.write_log("Game-backup-2024.10.10-12.00.00.log")
+        os.utime(rotatedFilePath, (1000, 1000))
+        self.write_log("Game.log")
+        archivePaths = la.archive_logs(self.tempDir.name, 2, la.GZIP_EXTENSION)
+        self.assertEqual(archivePaths, [rotatedFilePath + la.GZIP_EXTENSION])
+        self.assertEqual(sorted(os.listdir(self.tempDir.name)), ["Game-backup-2024.10.10-12.00.00.log.gz", "Game.log"])
+        self.assertEqual(os.path.getmtime(archivePaths[0]), 1000)
+        with la.open_log(archivePaths[0], 'r') as f:
+            self.assertEqual(f.read(), LOG_TEXT)
+        with la.open_log(archivePaths[0]) as f:
+            self.assertEqual(f.read(), LOG_TEXT.encode('utf-8'))
+        # Compressed logs are not archived again
+        self.assertEqual(la.archive_logs(self.tempDir.name), [])
+
+    def test_processed_logs_are_not_archived(self):
+        rotatedFilePath = self.write_log("Game-backup-2024.10.10-12.00.00.log")
+        processedFilePath = lc.ProcessedLogCache(rotatedFilePath, lf.LogFilter(RULES)).update()
+        archivePaths = la.archive_logs(self.tempDir.name, 1, la.GZIP_EXTENSION)
+        self.assertEqual(archivePaths, [rotatedFilePath + la.GZIP_EXTENSION])
+        self.assertTrue(os.path.isfile(processedFilePath))
+        self.assertTrue(os.path.isfile(processedFilePath + lc.METADATA_EXTENSION))
+
+    def test_processed_log_of_compressed_log(self):
+        filePath = la.compress_log(self.write_log("Game-backup-2024.10.10-12.00.00.log"), la.GZIP_EXTENSION)
+        cache = lc.ProcessedLogCache(filePath, lf.LogFilter(RULES))
+        processedFilePath = cache.update()
+        self.assertEqual(os.path.basename(processedFilePath), "_Processed_Game-backup-2024.10.10-12.00.00.log")
+        with open(processedFilePath, 'r') as f:
+            self.assertEqual(f.read(), LOG_TEXT.replace("[2024.10.10-12.00.02:200][  1]LogTemp: Temp message\n", ""))
+
+    def test_compressed_output(self):
+        filePath = self.write_log("Game.log")
+        processedFilePath = lc.ProcessedLogCache(filePath, lf.LogFilter(RULES), compressOutput=True).update()
+        self.assertTrue(processedFilePath.endswith("_Processed_Game.log.gz"))
+        appendedLine = "[2024.10.10-12.00.03:300][  2]LogNet: Client joined\n"
+        with open(filePath, 'a', newline='') as f:
+            f.write(appendedLine)
+        lc.ProcessedLogCache(filePath, lf.LogFilter(RULES), compressOutput=True).update()
+        # Appended lines are a new gzip member
+        with gzip.open(processedFilePath, 'rt') as f:
+            self.assertEqual(f.read(), lf.LogFilter(RULES).filter_text(LOG_TEXT + appendedLine))
+
+if __name__ == '__main__':
+    unittest.main()
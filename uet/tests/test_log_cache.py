@@ -0,0 +1,100 @@
+import unittest
+import os
+import re
+import tempfile
+import logging
+import log_filter as lf
+import log_cache as lc
+
+LOG_HEADER = "Log file open, 10/10/24 12:00:00\n"
+LOG_LINES = [
+    "[2024.10.10-12.00.01:100][  0]LogInit: Display: Running engine\n",
+    "[2024.10.10-12.00.02:200][  1]LogNet: Warning: Connection lost\n",
+    "[2024.10.10-12.00.03:300][  2]LogTemp: Temp message\n",
+    "[2024.10.10-12.00.04:400][  3]LogNet: Client joined\n",
+]
+RULES = [lf.compile_rule('.*LogTemp: .*\n', '', re.M), lf.compile_rule('.*LogNet: ', 'LogNet: ', re.M)]
+
+def get_filtered_text(text):
+    return lf.LogFilter(RULES).filter_text(text)
+
+class TestProcessedLogCache(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.logFilePath = os.path.join(self.tempDir.name, "Game.log")
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def write_log(self, text, mode='w'):
+        with open(self.logFilePath, mode, newline='') as f:
+            f.write(text)
+
+    def read_processed_log(self, filePath):
+        with open(filePath, 'r', newline='') as f:
+            return f.read()
+
+    def test_appended_lines_are_processed(self):
+        text = LOG_HEADER + "".join(LOG_LINES[:2])
+        self.write_log(text)
+        cache = lc.ProcessedLogCache(self.logFilePath, lf.LogFilter(RULES))
+        processedFilePath = cache.update()
+        self.assertEqual(os.path.basename(processedFilePath), "_Processed_Game.log")
+        self.assertEqual(self.read_processed_log(processedFilePath), get_filtered_text(text))
+        self.assertEqual(cache.load().end, len(text))
+
+        # Incomplete last line is shown, but processed again on the next update
+        self.write_log(LOG_LINES[2] + LOG_LINES[3][:20], 'a')
+        cache.update()
+        self.assertEqual(cache.load().end, len(text + LOG_LINES[2]))
+        self.assertEqual(self.read_processed_log(processedFilePath), get_filtered_text(text + LOG_LINES[2] + LOG_LINES[3][:20]))
+        self.assertGreater(cache.load().tailOutputSize, 0)
+        self.write_log(LOG_LINES[3][20:], 'a')
+        cache.update()
+        text += "".join(LOG_LINES[2:])
+        self.assertEqual(self.read_processed_log(processedFilePath), get_filtered_text(text))
+        self.assertEqual(cache.load().end, len(text))
+
+    def test_unterminated_last_line_of_whole_log(self):
+        # Crashed process does not finish its last line
+        text = LOG_HEADER + "".join(LOG_LINES[:3]) + LOG_LINES[3].rstrip("\n")
+        self.write_log(text)
+        processedFilePath = lc.ProcessedLogCache(self.logFilePath, lf.LogFilter(RULES)).update()
+        self.assertTrue(self.read_processed_log(processedFilePath).endswith("LogNet: Client joined"))
+        self.assertEqual(self.read_processed_log(processedFilePath), get_filtered_text(text))
+
+    def test_changes_process_log_again(self):
+        self.write_log(LOG_HEADER + "".join(LOG_LINES))
+        cache = lc.ProcessedLogCache(self.logFilePath, lf.LogFilter(RULES))
+        processedFilePath = cache.update()
+        # Unchanged log is not processed again
+        with open(processedFilePath, 'r+') as f:
+            f.write("X")
+        self.assertTrue(self.read_processed_log(cache.update()).startswith("X"))
+
+        # Rotated log starts with a new header
+        text = LOG_HEADER.replace("12:00:00", "13:00:00, rotated") + "".join(LOG_LINES)
+        self.write_log(text)
+        self.assertEqual(self.read_processed_log(cache.update()), get_filtered_text(text))
+
+        # Other rules make other processed log
+        cache = lc.ProcessedLogCache(self.logFilePath, lf.LogFilter(RULES[:1]))
+        self.assertNotEqual(cache.rulesHash, lc.get_rules_hash(lf.LogFilter(RULES)))
+        self.assertEqual(self.read_processed_log(cache.update()), lf.LogFilter(RULES[:1]).filter_text(text))
+
+    def test_bytes_filter(self):
+        text = LOG_HEADER + "".join(LOG_LINES).replace("\n", "\r\n")
+        self.write_log(text)
+        logFilter = lf.LogFilter(RULES).to_bytes()
+        processedFilePath = lc.ProcessedLogCache(self.logFilePath, logFilter).update()
+        self.write_log(LOG_LINES[2].replace("\n", "\r\n"), 'a')
+        lc.ProcessedLogCache(self.logFilePath, logFilter).update(jobs=2)
+        with open(processedFilePath, 'rb') as f:
+            self.assertEqual(f.read(), logFilter.filter_text((text + LOG_LINES[2].replace("\n", "\r\n")).encode('utf-8')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import re
+import tempfile
+import logging
+import log_filter as lf
+import log_diff as ld
+
+LOG_HEADER = "Log file open, 10/10/24 12:00:00\n"
+
+def get_line(second, frame, message):
+    return f"[2024.10.10-12.00.{second:02d}:000][{frame:3d}]{message}\n"
+
+class TestLogDiff(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.tempDir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def write_log(self, fileName, lines):
+        filePath = os.path.join(self.tempDir.name, fileName)
+        with open(filePath, 'w', newline='') as f:
+            f.write(LOG_HEADER + "".join(lines))
+        return filePath
+
+    def test_normalize_line(self):
+        self.assertEqual(ld.normalize_line(get_line(1, 10, "LogNet: Warning: Actor BP_Player_C_0 at 0x7ff6a1b2 lost 12.5 packets\n")),
+                         "LogNet: Warning: Actor BP_Player_C_# at # lost # packets")
+        self.assertEqual(ld.normalize_line(get_line(2, 11, "LogInit: UE5 build for x64")), "LogInit: Log: UE5 build for x64")
+        self.assertEqual(ld.normalize_line("\tcall stack 0x00007ff6\r\n"), "\tcall stack #")
+        self.assertEqual(ld.get_signature(ld.normalize_line(get_line(1, 1, "LogNet: Object_1"))),
+                         ld.get_signature(ld.normalize_line(get_line(9, 5, "LogNet: Object_27"))))
+
+    def test_diff_logs(self):
+        common = [get_line(1, 0, "LogInit: Display: Running engine")]
+        filePathA = self.write_log("A.log", common + [get_line(2, 1, "LogNet: Warning: Old warning")]
+                                   + [get_line(3, i, f"LogNet: Tick {i}") for i in range(10)]
+                                   + [get_line(4, 20, "LogTemp: Removed by rules")])
+        filePathB = self.write_log("B.log", common + [get_line(5, 2, "LogNet: Error: New error 0x1234")] * 2
+                                   + [get_line(6, i, f"LogNet: Tick {i}") for i in range(30)])
+        logFilter = lf.LogFilter([lf.compile_rule('.*LogTemp: .*\n', '', re.M)])
+        for jobs in (1, 2):
+            diff = ld.diff_logs(filePathA, filePathB, logFilter, jobs)
+            self.assertEqual(diff.new, [(2, "LogNet: Error: New error #")])
+            self.assertEqual(diff.vanished, [(1, "LogNet: Warning: Old warning")])
+            self.assertEqual(diff.changed, [(10, 30, "LogNet: Log: Tick #")])
+        self.assertTrue(ld.diff_logs(filePathA, filePathA, logFilter, 1).is_empty())
+
+    def test_frequency_change(self):
+        self.assertFalse(ld.is_frequency_changed(1, 4))
+        self.assertFalse(ld.is_frequency_changed(100, 150))
+        self.assertTrue(ld.is_frequency_changed(100, 200))
+        self.assertTrue(ld.is_frequency_changed(10, 0))
+
+if __name__ == '__main__':
+    unittest.main()
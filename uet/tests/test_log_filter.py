@@ -0,0 +1,194 @@
+import unittest
+import re
+import io
+import os
+import tempfile
+import random
+import logging
+import log_filter as lf
+
+SAMPLE_LOG = (
+    "Log file open, 10/10/24 12:00:00\n"
+    "[2024.10.10-12.00.01:100][  0]LogInit: Display: Running engine\n"
+    "[2024.10.10-12.00.01:200][  0]LogNet: Warning: Connection lost LogNet: again\n"
+    "[2024.10.10-12.00.02:300][  1]LogTemp: Verbose: spam\n"
+    "[2024.10.10-12.00.02:400][  1]LogBlueprintUserMessages: [BP_Player_C_0] Hello\n"
+    "last line without newline LogTemp: x"
+)
+
+# Same rules as view_logs helpers create
+HELPER_RULES = [
+    ('.*LogTemp: .*\n', '', re.M),
+    ('.*LogNet: ', 'LogNet: ', re.M),
+    ('.*LogBlueprintUserMessages: ', '', re.M),
+    ('.*Running engine.*\n', '', re.M),
+]
+
+def filter_whole_text(text, rules):
+    for pattern, repl, flags in rules:
+        text = re.sub(pattern, repl, text, flags=flags)
+    return text
+
+class TestLogFilter(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_line_local_rules(self):
+        for pattern, _, flags in HELPER_RULES:
+            self.assertTrue(lf.is_line_local_rule(pattern, flags), pattern)
+        self.assertTrue(lf.is_line_local_rule(r'(\w+Client) left', 0))
+        self.assertFalse(lf.is_line_local_rule('Begin\nEnd', 0))
+        self.assertFalse(lf.is_line_local_rule(r'Error\s+at', 0))
+        self.assertFalse(lf.is_line_local_rule('^Log', 0))
+        self.assertFalse(lf.is_line_local_rule('(?s)Begin.*End', 0))
+        self.assertFalse(lf.is_line_local_rule('x*', 0))
+
+    def test_streaming_matches_whole_text(self):
+        logFilter = lf.LogFilter([lf.compile_rule(*rule) for rule in HELPER_RULES])
+        self.assertTrue(logFilter.is_streaming())
+
+        output = io.StringIO()
+        logFilter.filter_file(io.StringIO(SAMPLE_LOG), output)
+
+        self.assertEqual(output.getvalue(), filter_whole_text(SAMPLE_LOG, HELPER_RULES))
+        self.assertNotIn("LogTemp: Verbose", output.getvalue())
+
+    def test_multiline_rule_filters_whole_text(self):
+        rules = HELPER_RULES + [('Display: Running engine\n\\[', '[', re.M)]
+        logFilter = lf.LogFilter([lf.compile_rule(*rule) for rule in rules])
+        self.assertFalse(logFilter.is_streaming())
+
+        output = io.StringIO()
+        logFilter.filter_file(io.StringIO(SAMPLE_LOG), output)
+
+        self.assertEqual(output.getvalue(), filter_whole_text(SAMPLE_LOG, rules))
+
+    def test_lines_are_filtered_lazily(self):
+        logFilter = lf.LogFilter([lf.compile_rule(*rule) for rule in HELPER_RULES])
+        def lines():
+            yield "[0][0]LogInit: first\n"
+            raise AssertionError("second line must not be read before the first one is consumed")
+
+        self.assertEqual(next(logFilter.filter_lines(lines())), "[0][0]LogInit: first\n")
+
+    def test_helper_rules_are_dispatched_by_category(self):
+        rules = [lf.compile_rule(*rule) for rule in HELPER_RULES]
+        self.assertEqual([rule.kind for rule in rules], [lf.RuleKind.REMOVE_LINE, lf.RuleKind.CUT_BEFORE, lf.RuleKind.CUT_BEFORE, lf.RuleKind.REMOVE_LINE])
+        self.assertEqual(rules[0].get_category(), "LogTemp")
+        self.assertIsNone(rules[3].get_category())
+
+        matcher = lf.RuleMatcher(rules)
+        self.assertEqual(matcher.otherRules, [])
+        self.assertEqual(matcher.get_rule_indices("[0][0]LogNet: Warning: lost\n"), [1])
+        self.assertEqual(matcher.get_rule_indices("[0][0]LogInit: Display: Running engine\n"), [3])
+        # Category text anywhere in line matches, as it does for the regular expression
+        self.assertEqual(matcher.get_rule_indices("[0][0]LogInit: from MyLogTemp: x\n"), [0])
+        self.assertEqual(matcher.get_rule_indices("[0][0]LogNet: again LogTemp: x\n", 1), [1])
+
+    def test_regex_rule_prefilter(self):
+        rule = lf.compile_rule(r'(\w+Client) left', r'\1 quit')
+        self.assertEqual((rule.kind, rule.literal), (lf.RuleKind.REGEX, "Client"))
+        self.assertIsNone(lf.compile_rule(r'(?i:client) left|joined', 'x').literal)
+        logFilter = lf.LogFilter([rule])
+        self.assertEqual(logFilter.filter_line("GameClient left\n"), "GameClient quit\n")
+        self.assertEqual(logFilter.matcher.get_rule_indices("GameServer joined\n"), [])
+
+    def test_random_logs_match_whole_text(self):
+        generator = random.Random(7)
+        categories = ["LogTemp", "LogNet", "MyLogNet", "LogInit", "LogBlueprintUserMessages"]
+        rules = HELPER_RULES + [(r'\[(\d+)\]', r'<\1>', 0), ('.*Init: ', 'Init: ', re.M), ('.*spam.*\n', '', re.M)]
+        logFilter = lf.LogFilter([lf.compile_rule(*rule) for rule in rules])
+        for _ in range(20):
+            lines = []
+            for _ in range(50):
+                parts = [generator.choice(categories) + ": " if generator.random() < 0.6 else generator.choice(["spam", "text", "x: y"]) for _ in range(generator.randint(0, 3))]
+                lines.append(f"[{generator.randint(0, 9)}][  0]" + " ".join(parts) + "\n")
+            text = "".join(lines) + generator.choice(["", "LogTemp: tail", "LogNet: tail"])
+
+            output = io.StringIO()
+            logFilter.filter_file(io.StringIO(text), output)
+            self.assertEqual(output.getvalue(), filter_whole_text(text, rules))
+
+    def test_bytes_rules(self):
+        for rule in HELPER_RULES + [('[^"]*"', "'", 0), ('Привет', 'Hi', 0), (r'(?a)\w+Client', 'x', 0)]:
+            self.assertIsNotNone(lf.to_bytes_rule(lf.compile_rule(*rule)), rule[0])
+        for rule in [(r'\w+Client', 'x', 0), ('(?i)client', 'x', 0), ('é+', 'e', 0), ('a.b', 'x', 0), (r'\u00e9', 'e', 0)]:
+            self.assertIsNone(lf.to_bytes_rule(lf.compile_rule(*rule)), rule[0])
+
+        rule = lf.to_bytes_rule(lf.compile_rule('.*LogNet: ', 'LogNet: ', re.M))
+        self.assertEqual((rule.kind, rule.literal, rule.get_category()), (lf.RuleKind.CUT_BEFORE, b"LogNet: ", b"LogNet"))
+
+    def test_buffer_matches_text(self):
+        text = SAMPLE_LOG.replace("Hello", "Привет, мир") + "\nLogNet: ünïcode LogNet: done\n"
+        # Rules with literal text are found by one search, rule without it makes every line checked
+        for rules in [HELPER_RULES + [(r'\[(\d+)\]', r'<\1>', re.A), ('Привет', 'Hi', 0)],
+                      HELPER_RULES + [(r'(?a)\d\d\d', 'N', 0)]]:
+            bytesFilter = lf.LogFilter([lf.compile_rule(*rule) for rule in rules]).to_bytes()
+            writes = []
+            class Output(io.BytesIO):
+                def write(self, data):
+                    writes.append(bytes(data))
+                    return super().write(data)
+            output = Output()
+            bytesFilter.filter_buffer(text.encode('utf-8'), output)
+
+            self.assertEqual(output.getvalue().decode('utf-8'), filter_whole_text(text, rules))
+            # Unchanged first line is written as a slice of the buffer
+            self.assertEqual(writes[0], b"Log file open, 10/10/24 12:00:00\n")
+
+    def test_mapped_file(self):
+        bytesFilter = lf.LogFilter([lf.compile_rule(*rule) for rule in HELPER_RULES]).to_bytes()
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "Game.log")
+            with open(filePath, 'wb') as f:
+                f.write(SAMPLE_LOG.replace("\n", "\r\n").encode('utf-8'))
+            output = io.BytesIO()
+            bytesFilter.filter_mapped_file(filePath, output)
+            expected = filter_whole_text(SAMPLE_LOG.replace("\n", "\r\n"), HELPER_RULES)
+            self.assertEqual(output.getvalue().decode('utf-8'), expected)
+
+            open(filePath, 'wb').close()
+            output = io.BytesIO()
+            bytesFilter.filter_mapped_file(filePath, output)
+            self.assertEqual(output.getvalue(), b"")
+
+    def test_line_ranges(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "Game.log")
+            with open(filePath, 'w') as f:
+                f.write(SAMPLE_LOG)
+            ranges = lf.get_line_ranges(filePath, 40)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], os.path.getsize(filePath))
+            with open(filePath, 'rb') as f:
+                data = f.read()
+            for (start, end), (nextStart, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, nextStart)
+                self.assertEqual(data[end - 1:end], b"\n")
+                self.assertGreaterEqual(end - start, 40)
+
+    def test_parallel_matches_sequential(self):
+        logFilter = lf.LogFilter([lf.compile_rule(*rule) for rule in HELPER_RULES])
+        text = SAMPLE_LOG.replace("Hello", "Привет") + "\n"
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "Game.log")
+            with open(filePath, 'wb') as f:
+                f.write((text * 50).encode('utf-8'))
+
+            output = io.StringIO()
+            logFilter.filter_file_parallel(filePath, output, 2, chunkSize=1000)
+            # Text is decoded with default encoding, same as sequential filtering does
+            with open(filePath, 'r') as f:
+                self.assertEqual(output.getvalue(), filter_whole_text(f.read(), HELPER_RULES))
+
+            output = io.BytesIO()
+            logFilter.to_bytes().filter_file_parallel(filePath, output, 2, chunkSize=1000)
+            self.assertEqual(output.getvalue().decode('utf-8'), filter_whole_text(text * 50, HELPER_RULES))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import os
+import tempfile
+import shutil
+import logging
+from log_follow import LogFollower, create_watcher
+
+class TestLogFollow(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.logs_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.logs_dir, "Game.log")
+        self.lines = []
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.logs_dir)
+
+    def append(self, data, path=None):
+        with open(path or self.log_path, 'ab') as f:
+            f.write(data)
+
+    def test_follows_appended_lines_from_end(self):
+        self.append(b"old line\n")
+        follower = LogFollower(self.log_path, self.lines.append)
+
+        self.assertEqual(follower.poll(), 0)
+        self.append(b"first\nsecond par")
+        self.assertEqual(follower.poll(), 1)
+        self.append(b"t\r\n")
+        follower.poll()
+        follower.close()
+
+        self.assertEqual(self.lines, ["first\n", "second part\n"])
+
+    def test_waits_for_log_creation(self):
+        follower = LogFollower(self.log_path, self.lines.append)
+        self.assertEqual(follower.poll(), 0)
+        self.append(b"\xef\xbb\xbfcreated\n")
+        follower.poll()
+        follower.close()
+        self.assertEqual(self.lines, ["created\n"])
+
+    def test_rotation(self):
+        self.append(b"before\n")
+        follower = LogFollower(self.log_path, self.lines.append, fromStart=True)
+        follower.poll()
+
+        # UE renames current log to backup and starts a new one
+        self.append(b"last old line")
+        os.rename(self.log_path, os.path.join(self.logs_dir, "Game-backup-2024.10.10-12.00.00.log"))
+        self.append(b"new\n")
+        follower.poll()
+        follower.close()
+
+        self.assertEqual(self.lines, ["before\n", "last old line", "new\n"])
+
+    def test_truncation(self):
+        self.append(b"long line of old log\n")
+        follower = LogFollower(self.log_path, self.lines.append, keepOpen=False)
+        with open(self.log_path, 'wb') as f:
+            f.write(b"short\n")
+        follower.poll()
+        self.assertEqual(self.lines, ["short\n"])
+
+    def test_watcher_wakes_up(self):
+        watcher = create_watcher(self.logs_dir)
+        try:
+            self.append(b"x\n")
+            watcher.wait(0.1)
+        finally:
+            watcher.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import os
+import tempfile
+import logging
+import log_parse as lp
+import log_index as li
+
+LOG_HEADER = "Log file open, 10/10/24 12:00:00\n"
+LOG_LINES = [
+    "[2024.10.10-12.00.01:100][  0]LogInit: Display: Running engine\n",
+    "[2024.10.10-12.01.30:200][ 10]LogNet: Warning: Connection lost\n",
+    "  continuation of the warning\n",
+    "[2024.10.10-12.02.00:300][ 20]LogNet: Client joined\n",
+    "[2024.10.10-12.03.00:400][ 30]LogTemp: Warning: Temp warning\n",
+    "[2024.10.10-12.06.00:500][ 40]LogNet: Warning: Timeout\n",
+]
+
+class TestLogParse(unittest.TestCase):
+    def test_parse_line(self):
+        line = lp.parse_line(LOG_LINES[1])
+        self.assertEqual((line.frame, line.category, line.verbosity), (10, "LogNet", "Warning"))
+        self.assertEqual(LOG_LINES[1][line.messageOffset:], "Connection lost\n")
+        self.assertEqual(lp.format_time(line.time), "2024.10.10-12.01.30:200")
+        self.assertEqual(lp.parse_line(LOG_LINES[3]).verbosity, lp.DEFAULT_VERBOSITY)
+        self.assertIsNone(lp.parse_line(LOG_LINES[2]))
+        self.assertIsNone(lp.parse_line(LOG_HEADER))
+
+    def test_parse_time(self):
+        reference = lp.parse_line(LOG_LINES[0]).time
+        self.assertEqual(lp.parse_time("12:01:30", reference), lp.parse_time("2024.10.10-12.01.30"))
+        self.assertEqual(lp.parse_time("12:01", reference) + 30.2, lp.parse_time("2024.10.10-12.01.30:200"))
+        self.assertIsNone(lp.parse_time("yesterday", reference))
+        self.assertEqual(lp.normalize_verbosity("warning"), "Warning")
+        self.assertIsNone(lp.normalize_verbosity("loud"))
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.logFilePath = os.path.join(self.tempDir.name, "Game.log")
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def write_log(self, text, mode='w'):
+        with open(self.logFilePath, mode, newline='') as f:
+            f.write(text)
+
+    def test_query(self):
+        self.write_log(LOG_HEADER + "".join(LOG_LINES))
+        logIndex = li.LogIndex(self.logFilePath)
+        self.assertEqual(logIndex.update(), 5)
+        self.assertTrue(os.path.isfile(self.logFilePath + li.INDEX_EXTENSION))
+
+        self.assertEqual(list(logIndex.query(categories=["LogNet"])), [LOG_LINES[1], LOG_LINES[3], LOG_LINES[5]])
+        self.assertEqual(list(logIndex.query(verbosities=["Warning"])), [LOG_LINES[1], LOG_LINES[4], LOG_LINES[5]])
+        self.assertEqual(list(logIndex.query(["LogNet", "LogTemp"], ["Warning"])), [LOG_LINES[1], LOG_LINES[4], LOG_LINES[5]])
+        first = logIndex.get_first_time()
+        since = lp.parse_time("12:01", first)
+        until = lp.parse_time("12:05", first)
+        self.assertEqual(list(logIndex.query(["LogNet"], ["Warning"], since, until)), [LOG_LINES[1]])
+        self.assertEqual(list(logIndex.query(since=since, until=until)), LOG_LINES[1:2] + LOG_LINES[3:5])
+        self.assertEqual(list(logIndex.query(categories=["LogAudio"])), [])
+        self.assertEqual(logIndex.get_counts(li.CATEGORY_KEY), {"LogInit": 1, "LogNet": 3, "LogTemp": 1})
+
+    def test_incremental_update(self):
+        # Incomplete last line waits until it is written completely
+        self.write_log(LOG_HEADER + "".join(LOG_LINES[:3]) + LOG_LINES[3][:20])
+        logIndex = li.LogIndex(self.logFilePath)
+        self.assertEqual(logIndex.update(), 2)
+        self.write_log(LOG_LINES[3][20:] + "".join(LOG_LINES[4:]), 'a')
+        self.assertEqual(logIndex.update(), 3)
+        self.assertEqual(logIndex.update(), 0)
+
+        logIndex = li.LogIndex(self.logFilePath)
+        self.assertEqual(len(logIndex.load()), 2)
+        self.assertEqual(list(logIndex.query(categories=["LogNet"])), [LOG_LINES[1], LOG_LINES[3], LOG_LINES[5]])
+
+    def test_replaced_log_is_indexed_again(self):
+        self.write_log(LOG_HEADER + "".join(LOG_LINES))
+        logIndex = li.LogIndex(self.logFilePath)
+        logIndex.update()
+        # Rotated log starts with a new header
+        self.write_log(LOG_HEADER.replace("12:00:00", "13:00:00") + LOG_LINES[3])
+        self.assertEqual(logIndex.update(), 1)
+        self.assertEqual(list(logIndex.query(categories=["LogNet"])), [LOG_LINES[3]])
+
+    def test_partially_written_block_is_ignored(self):
+        self.write_log(LOG_HEADER + "".join(LOG_LINES[:2]))
+        logIndex = li.LogIndex(self.logFilePath)
+        logIndex.update()
+        indexSize = os.path.getsize(logIndex.indexFilePath)
+        self.write_log("".join(LOG_LINES[2:]), 'a')
+        logIndex.update()
+        with open(logIndex.indexFilePath, 'r+b') as f:
+            f.truncate(os.path.getsize(logIndex.indexFilePath) - 4)
+
+        blocks, validSize = li.read_blocks(logIndex.indexFilePath)
+        self.assertEqual((len(blocks), validSize), (1, indexSize))
+        self.assertEqual(logIndex.update(), 3)
+        self.assertEqual(len(logIndex.load()), 2)
+
+    def test_checkpoints_limit_scanned_part(self):
+        block = li.IndexBlock(0, 1000, checkpoints=[[10.0, 0], [20.0, 300], [30.0, 600]])
+        self.assertEqual(block.get_range(25.0, None), (300, 1000))
+        self.assertEqual(block.get_range(None, 25.0), (0, 600))
+        block.ordered = False
+        self.assertEqual(block.get_range(25.0, 25.0), (0, 1000))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import logging
+import log_perf as lperf
+
+def get_line(milliseconds, frame, message):
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"[2024.10.10-12.00.{seconds:02d}:{milliseconds:03d}][{frame % 1000:3d}]{message}\n"
+
+class TestPerfReport(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def add_lines(self, report, lines):
+        for line in lines:
+            report.add_line(line)
+
+    def test_estimated_frame_times(self):
+        report = lperf.PerfReport(contextLines=1, worstCount=2)
+        lines = [get_line(0, 998, "LogTemp: tick")]
+        lines.append(get_line(20, 999, "LogTemp: tick"))
+        lines.append(get_line(220, 0, "LogTemp: tick"))
+        lines.append("\tcontinuation\n")
+        # Late line of the previous frame is not a frame change
+        lines.append(get_line(225, 999, "LogAudio: late"))
+        # Frames which log nothing share the time
+        lines.append(get_line(280, 3, "LogTemp: tick"))
+        self.add_lines(report, lines)
+        frameTimes, source = report.get_frame_times()
+        self.assertEqual(source, lperf.ESTIMATED_KIND)
+        self.assertEqual(list(frameTimes), [20.0, 200.0, 20.0, 20.0, 20.0])
+        worst = report.get_worst_events()[0]
+        self.assertEqual((worst.milliseconds, worst.frame, worst.line), (200.0, 999, lines[2]))
+        self.assertEqual((worst.before, worst.after), ([lines[1]], [lines[3]]))
+
+    def test_logging_gaps(self):
+        report = lperf.PerfReport(contextLines=0)
+        lines = []
+        frame, milliseconds = 0, 0
+        # Bursts of lines every frame at 60 fps with nothing logged for 600 and 900 frames between them
+        for gap in (600, 900, 0):
+            for _ in range(5):
+                lines.append(get_line(milliseconds, frame, "LogTemp: tick"))
+                frame, milliseconds = frame + 1, milliseconds + 16
+            frame, milliseconds = frame + gap, milliseconds + gap * 16
+        self.add_lines(report, lines)
+        frameTimes, source = report.get_frame_times()
+        self.assertEqual(source, lperf.ESTIMATED_KIND)
+        self.assertEqual(list(frameTimes), [16.0] * 12)
+
+    def test_hitches_and_stat_unit(self):
+        report = lperf.PerfReport(contextLines=2, worstCount=2)
+        self.add_lines(report, [
+            get_line(0, 1, "LogStats: Frame: 16.67 ms  Game: 8.10 ms  Draw: 4.00 ms  GPU: 12.30 ms"),
+            get_line(16, 2, "LogCore: Warning: Hitch detected on game thread (frame hasn't finished for 150.00ms)"),
+            get_line(170, 3, "LogStats: Frame: 150.10 ms  Game: 140.00 ms  Draw: 4.00 ms  GPU: 12.30 ms"),
+            get_line(180, 3, "LogStreaming: Warning: Long frame 90 ms while loading"),
+            get_line(190, 3, "LogCore: Warning: Hitch detected on render thread"),
+            get_line(200, 4, "LogTemp: Frame number is not a frame time"),
+        ])
+        frameTimes, source = report.get_frame_times()
+        self.assertEqual((list(frameTimes), source), ([16.67, 150.1], lperf.UNIT_KIND))
+        self.assertEqual(dict(report.hitchCounts), {"LogCore": 2, "LogStreaming": 1})
+        self.assertEqual(report.hitchMilliseconds["LogCore"], 150.0)
+        self.assertEqual([(event.milliseconds, event.kind) for event in report.get_worst_events()],
+                         [(154.0, lperf.ESTIMATED_KIND), (150.1, lperf.UNIT_KIND)])
+        self.assertEqual(len(report.get_worst_events()[1].after), 2)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual([lperf.get_percentile(values, percent) for percent in lperf.PERCENTILES], [50, 90, 95, 99])
+        self.assertEqual(lperf.get_percentile([5.0], 99), 5.0)
+
+if __name__ == '__main__':
+    unittest.main()
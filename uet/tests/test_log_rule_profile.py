@@ -0,0 +1,74 @@
+import unittest
+import re
+import os
+import tempfile
+import logging
+import log_filter as lf
+import log_rule_profile as lrp
+
+SAMPLE_LOG = (
+    "Log file open, 10/10/24 12:00:00\n"
+    "[2024.10.10-12.00.01:100][  0]LogInit: Display: Running engine\n"
+    "[2024.10.10-12.00.01:200][  0]LogNet: Warning: Connection lost LogNet: again\n"
+    "[2024.10.10-12.00.02:300][  1]LogTemp: Verbose: spam\n"
+    "[2024.10.10-12.00.02:400][  1]LogTemp: Verbose: more spam\n"
+    "[2024.10.10-12.00.02:500][  1]LogCore: Frame 10 took 33 ms\n"
+)
+
+class TestRuleProfile(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.filePath = os.path.join(self.tempDir.name, "Game.log")
+        with open(self.filePath, 'w', newline='') as f:
+            f.write(SAMPLE_LOG)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_backtracking_shapes(self):
+        self.assertEqual(len(lf.get_backtracking_shapes(lf.compile_rule(r'.*took \d+ ms', '', re.M))), 1)
+        self.assertEqual(len(lf.get_backtracking_shapes(lf.compile_rule(r'(\w+\s?)+$', '', re.M))), 1)
+        self.assertEqual(lf.get_backtracking_shapes(lf.compile_rule(r'^.*took \d+ ms', '', re.M)), [])
+        self.assertEqual(lf.get_backtracking_shapes(lf.compile_rule(r'(?:ab)+c', '')), [])
+        # Helper rules are applied with string operations unless whole log is filtered with regular expressions
+        helperRule = lf.compile_rule('.*LogTemp: .*\n', '', re.M)
+        self.assertEqual(lf.get_backtracking_shapes(helperRule), [])
+        self.assertEqual(len(lf.get_backtracking_shapes(helperRule, isStreaming=False)), 1)
+
+    def test_apply_counted(self):
+        for pattern, repl in [('.*LogTemp: .*\n', ''), ('.*LogNet: ', 'LogNet: '), (r'\d+', '#')]:
+            rule = lf.compile_rule(pattern, repl, re.M)
+            for line in SAMPLE_LOG.splitlines(keepends=True):
+                self.assertEqual(rule.apply_counted(line), re.subn(pattern, repl, line, flags=re.M))
+
+    def test_line_by_line_profile(self):
+        rules = [lf.compile_rule('.*LogTemp: .*\n', '', re.M), lf.compile_rule('.*LogNet: ', 'LogNet: ', re.M),
+                 lf.compile_rule(r'\d+ ms', '# ms', re.M), lf.compile_rule('.*LogMissing: .*\n', '', re.M)]
+        profiler = lrp.collect_rule_profile(self.filePath, rules)
+        self.assertTrue(profiler.is_streaming())
+        self.assertEqual(profiler.lines, 6)
+        removeRule, cutRule, regexRule, deadRule = profiler.profiles
+        self.assertEqual((removeRule.matches, removeRule.removedLines, removeRule.changedLines), (2, 2, 0))
+        self.assertEqual(removeRule.removedSize, len(SAMPLE_LOG.splitlines(keepends=True)[3]) * 2 + len("more "))
+        self.assertEqual((cutRule.matches, cutRule.changedLines), (1, 1))
+        self.assertEqual(cutRule.removedSize, len("[2024.10.10-12.00.01:200][  0]LogNet: Warning: Connection lost "))
+        self.assertEqual((regexRule.matches, regexRule.changedLines, regexRule.removedSize), (1, 1, 1))
+        # Rules are tried only on lines the matcher finds for them
+        self.assertEqual((deadRule.calls, deadRule.matches), (0, 0))
+        self.assertEqual(lf.LogFilter(rules).filter_text(SAMPLE_LOG), profiler.filter_text(SAMPLE_LOG))
+
+    def test_whole_log_profile(self):
+        rules = [lf.compile_rule(r'Verbose: spam\n.*', '', 0), lf.compile_rule('.*LogTemp: .*\n', '', re.M)]
+        profiler = lrp.collect_rule_profile(self.filePath, rules)
+        self.assertFalse(profiler.is_streaming())
+        multilineRule, removeRule = profiler.profiles
+        self.assertEqual((multilineRule.matches, multilineRule.removedLines), (1, 1))
+        self.assertEqual((removeRule.matches, removeRule.removedLines), (1, 1))
+        self.assertTrue(removeRule.shapes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import os
+import re
+import gzip
+import tempfile
+import logging
+import log_search
+
+def get_log_text(hour, label, count=3):
+    lines = ["Log file open\n"]
+    for i in range(count):
+        lines.append(f"[2024.10.10-{hour:02d}.00.{i * 2:02d}:000][{i:3d}]LogNet: Warning: {label} lost {i}\n")
+        lines.append("\tstack of lost connection\n")
+        lines.append(f"[2024.10.10-{hour:02d}.00.{i * 2 + 1:02d}:000][{i:3d}]LogTemp: {label} other {i}\n")
+    return "".join(lines)
+
+class TestLogSearch(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.tempDir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def write_log(self, fileName, text, compressed=False):
+        filePath = os.path.join(self.tempDir.name, fileName)
+        data = text.encode('utf-8')
+        with open(filePath, 'wb') as f:
+            f.write(gzip.compress(data) if compressed else data)
+        return filePath
+
+    def test_get_log_files(self):
+        self.write_log("Game.log", "")
+        self.write_log("Game-backup-2024.10.10-12.00.00.log.gz", "", True)
+        self.write_log("_Processed_2024.10.10-12.00.00.log", "")
+        self.write_log("Game.log" + ".uetidx", "")
+        fileNames = [os.path.basename(filePath) for filePath in log_search.get_log_files(self.tempDir.name)]
+        self.assertEqual(fileNames, ["Game-backup-2024.10.10-12.00.00.log.gz", "Game.log"])
+
+    def test_search_file(self):
+        filePath = self.write_log("Game.log.gz", get_log_text(12, "client"), True)
+        result = log_search.search_file(filePath, "lost")
+        self.assertEqual(len(result.lines), 6)
+        # Call stack gets time of the warning above it
+        self.assertEqual(result.lines[0][0], result.lines[1][0])
+        self.assertEqual(result.lines[1][1], "\tstack of lost connection\n")
+        self.assertEqual(result.lastTime, result.lines[0][0] + 5)
+
+        # Patterns which may span lines are matched line by line
+        self.assertEqual(log_search.search_file(filePath, r"lost\s+\d").lines, result.lines[0::2])
+        self.assertEqual(len(log_search.search_file(filePath, "^\t").lines), 3)
+
+    def test_search_logs(self):
+        filePaths = [
+            self.write_log("Game.log", get_log_text(14, "client")),
+            self.write_log("Server.log", get_log_text(14, "server").replace(":000]", ":500]")),
+            self.write_log("Game-backup.log.gz", get_log_text(12, "old"), True),
+        ]
+        for jobs in (1, 2):
+            lines = list(log_search.search_logs(filePaths, r"(old|client|server) lost", jobs=jobs))
+            self.assertEqual(len(lines), 9)
+            # Rotated log is printed first, logs written at the same time are merged by time
+            self.assertTrue(all(line.startswith("Game-backup.log.gz: ") for line in lines[:3]))
+            self.assertEqual([line.split(":")[0] for line in lines[3:]], ["Game.log", "Server.log"] * 3)
+        self.assertEqual(list(log_search.search_logs(filePaths, "missing", re.I)), [])
+
+if __name__ == '__main__':
+    unittest.main()
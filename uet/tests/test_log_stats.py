@@ -0,0 +1,87 @@
+import unittest
+import os
+import tempfile
+import logging
+import log_stats as ls
+
+LOG_TEXT = (
+    "Log file open, 10/10/24 12:00:00\n"
+    "[2024.10.10-12.00.01:100][  0]LogInit: Display: Running engine\n"
+    "[2024.10.10-12.00.01:200][  1]LogNet: Warning: Connection 17 lost for 'Player 1'\n"
+    "\tcall stack line\n"
+    "[2024.10.10-12.00.01:300][  2]LogNet: Warning: Connection 42 lost for 'Player 2'\n"
+    "[2024.10.10-12.00.03:400][  3]LogNet: Client joined\n"
+)
+
+class TestLogStats(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_parse_columns(self):
+        data = LOG_TEXT.encode('utf-8')
+        columns = ls.parse_columns(data)
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(columns.categories, ["LogInit", "LogNet"])
+        self.assertEqual(list(columns.categoryIds), [0, 1, 1, 1])
+        self.assertEqual([ls.lp.VERBOSITIES[verbosityId] for verbosityId in columns.verbosityIds], ["Display", "Warning", "Warning", "Log"])
+        self.assertEqual(list(columns.frames), [0, 1, 2, 3])
+        self.assertEqual(list(columns.milliseconds), [100, 200, 300, 400])
+        self.assertEqual(columns.seconds[3] - columns.seconds[0], 2)
+        # Call stack belongs to the warning before it
+        self.assertEqual(columns.sizes[1], len("[2024.10.10-12.00.01:200][  1]LogNet: Warning: Connection 17 lost for 'Player 1'\n\tcall stack line\n"))
+        self.assertEqual(sum(columns.sizes), len(data) - columns.offsets[0])
+        offset, messageOffset = columns.offsets[0], columns.messageOffsets[0]
+        self.assertEqual(data[offset + messageOffset:offset + messageOffset + 7], b"Running")
+
+    def test_templates(self):
+        messages = [b"Loaded 'Map' in 1.5 s at 0x7ff6A0, 12 ms", b"Id da1b2c3d-1234-5678-9abc-def012345678 of 3",
+                    b"x64 build 007 \"quoted\" 1. 2.5.6", b"No numbers"]
+        for message in messages:
+            self.assertEqual(ls.get_template(message), ls.VARIABLE_PATTERN.sub(ls.VARIABLE_PLACEHOLDER, message))
+        self.assertEqual(ls.get_template(messages[0]), b"Loaded # in # s at #, # ms")
+        # GUIDs starting with a letter need the full pattern
+        self.assertEqual(ls.get_template(messages[1]), b"Id # of #")
+        # Template keys of messages have the same templates
+        for message in messages + [b"1x5 0x9f 10 9.0", b"Id 2a1b2c3d-1234-5678-9abc-def012345678"]:
+            self.assertEqual(ls.get_template(message.translate(ls.TEMPLATE_KEY_TABLE)), ls.get_template(message))
+
+    def test_compute_stats(self):
+        data = LOG_TEXT.encode('utf-8')
+        stats = ls.compute_stats(ls.parse_columns(data))
+        self.assertEqual((stats.lines, stats.get_duration()), (4, 3))
+        self.assertEqual(stats.groups[("LogNet", "Warning")].lines, 2)
+        self.assertEqual(stats.categorySeconds["LogNet"].get_peak(), (stats.firstSecond, 2))
+        self.assertEqual(stats.templates[("LogNet", "Warning", b"Connection # lost for #")][0], 2)
+        self.assertEqual(sum(group.bytes for group in stats.groups.values()), stats.bytes)
+
+    def test_parts_give_the_same_stats(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "Game.log")
+            with open(filePath, 'w', newline='') as f:
+                f.write(LOG_TEXT * 20)
+            whole = ls.collect_stats(filePath)
+            for jobs in (1, 2):
+                parts = ls.collect_stats(filePath, jobs, chunkSize=300)
+                self.assertEqual((parts.lines, parts.bytes), (whole.lines, whole.bytes))
+                self.assertEqual(parts.groups, whole.groups)
+                self.assertEqual(parts.templates, whole.templates)
+                self.assertEqual(parts.categorySeconds["LogNet"].get_peak(), whole.categorySeconds["LogNet"].get_peak())
+
+    def test_second_counts(self):
+        counts = ls.SecondCounts()
+        counts.add(100)
+        counts.add(103, 2)
+        counts.add(98, 5)
+        self.assertEqual((counts.start, list(counts.counts)), (98, [5, 0, 1, 0, 0, 2]))
+        self.assertEqual(counts.get_peak(), (98, 5))
+        # Broken timestamps far from the others are not counted
+        counts.add(98 + ls.MAX_RATE_SECONDS)
+        self.assertEqual(len(counts.counts), 6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import os
+import shutil
+import tempfile
+import logging
+import ue.path.plugins as plugins
+
+class TestPluginsCache(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.test_dir = tempfile.mkdtemp()
+        self.plugins_path = os.path.join(self.test_dir, plugins.PLUGINS_DIR)
+        plugins.PLUGINS_CACHE.clear()
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.test_dir)
+        plugins.PLUGINS_CACHE.clear()
+
+    def add_plugin(self, relativePath, text="{}"):
+        pluginPath = os.path.join(self.plugins_path, relativePath)
+        os.makedirs(os.path.join(pluginPath, "Source"), exist_ok=True)
+        with open(os.path.join(pluginPath, os.path.basename(relativePath) + plugins.PLUGIN_FILE_EXTENSION), 'w') as f:
+            f.write(text)
+        return pluginPath
+
+    def test_nested_changes_invalidate_cache(self):
+        self.add_plugin("Runtime/Online/OnlineBase")
+        self.assertEqual(list(plugins.read_plugins_from_directory_cached(self.plugins_path)), ["OnlineBase"])
+        # Plugin added deeper than child directories of the plugins directory
+        self.add_plugin("Runtime/Online/OnlineSubsystem")
+        self.assertEqual(sorted(plugins.read_plugins_from_directory_cached(self.plugins_path)), ["OnlineBase", "OnlineSubsystem"])
+
+        signature = plugins.PLUGINS_CACHE[(self.plugins_path, False, None)][0]
+        self.assertTrue(plugins.is_signature_valid(signature))
+        self.add_plugin("Runtime/Online/OnlineBase", '{"EnabledByDefault": true}')
+        self.assertFalse(plugins.is_signature_valid(signature))
+
+        shutil.rmtree(os.path.join(self.plugins_path, "Runtime", "Online", "OnlineSubsystem"))
+        self.assertEqual(list(plugins.read_plugins_from_directory_cached(self.plugins_path)), ["OnlineBase"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import os
+import tempfile
+import shutil
+import logging
+from unittest.mock import patch
+import uet_client as uc
+import ue
+
+class TestUetClient(unittest.TestCase):
+    def setUp(self):
+        # Suppress logging during tests
+        logging.disable(logging.CRITICAL)
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Re-enable logging
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.temp_dir)
+
+    def test_socket_path_from_environment(self):
+        socket_path = os.path.join(self.temp_dir, "daemon.sock")
+        with patch.dict(os.environ, {uc.SOCKET_PATH_ENV: socket_path}):
+            self.assertEqual(uc.get_socket_path(), socket_path)
+            self.assertFalse(uc.is_running())
+            # No daemon, caller runs the command in its own process
+            self.assertIsNone(uc.run_in_daemon("status", []))
+
+    def test_run_in_process_exit_code(self):
+        script_path = os.path.join(self.temp_dir, "failing.py")
+        with open(script_path, 'w') as f:
+            f.write("import sys\nsys.exit(3)\n")
+        with patch('uet_client.get_script_path', return_value=script_path), patch('sys.argv', ["uet_client.py"]):
+            self.assertEqual(uc.run_in_process("status", []), 3)
+
+    def test_root_path_cache_is_validated(self):
+        project_dir = os.path.join(self.temp_dir, "Proj")
+        source_dir = os.path.join(project_dir, "Source", "Proj")
+        os.makedirs(source_dir)
+        project_file_path = os.path.join(project_dir, "Proj.uproject")
+        with open(project_file_path, 'w') as f:
+            f.write("{}")
+
+        self.assertEqual(ue.path.project.get_root_path_from_path(source_dir), project_dir)
+        self.assertEqual(ue.path.project.ROOT_PATH_CACHE[source_dir], project_dir)
+
+        # Cached root is not a project anymore
+        os.remove(project_file_path)
+        self.assertIsNone(ue.path.project.get_root_path_from_path(source_dir))
+
+if __name__ == '__main__':
+    unittest.main()
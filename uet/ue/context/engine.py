@@ -37,4 +37,4 @@ class UeContextEngine(UeContextBase):
 
     def get_all_plugins(self):
         pluginsDirectory = ue.path.engine.get_plugins_path(self.rootPath)
-        return ue.path.plugins.read_plugins_from_directory(pluginsDirectory, False, 'Engine')
+        return ue.path.plugins.read_plugins_from_directory_cached(pluginsDirectory, False, 'Engine')
@@ -1,13 +1,44 @@
 import os
+import copy
 import logging
 from .common import *
 
 PLUGINS_DIR = "Plugins"
 PLUGIN_FILE_EXTENSION = ".uplugin"
 
-def read_plugins_from_directory(parentDirPath, ebabledByDefault = False, source = None):
+# Plugins by directory, valid while directories and plugin files read by the walk are not changed
+PLUGINS_CACHE = {}
+
+def get_path_signature(path):
+    pathStat = os.stat(path)
+    return (path, pathStat.st_mtime_ns, pathStat.st_size)
+
+def is_signature_valid(signature):
+    try:
+        return all(get_path_signature(pathSignature[0]) == pathSignature for pathSignature in signature)
+    except OSError:
+        return False
+
+def read_plugins_from_directory_cached(parentDirPath, ebabledByDefault = False, source = None):
+    """Same as `read_plugins_from_directory`, but avoids walking big unchanged trees like engine plugins again"""
+    if not os.path.isdir(parentDirPath):
+        return {}
+    cacheKey = (parentDirPath, ebabledByDefault, source)
+    cached = PLUGINS_CACHE.get(cacheKey)
+    if cached and is_signature_valid(cached[0]):
+        return copy.deepcopy(cached[1])
+
+    signature = []
+    plugins = read_plugins_from_directory(parentDirPath, ebabledByDefault, source, signature)
+    PLUGINS_CACHE[cacheKey] = (signature, copy.deepcopy(plugins))
+    return plugins
+
+def read_plugins_from_directory(parentDirPath, ebabledByDefault = False, source = None, signature = None):
+    """Plugins in the directory tree, every listed directory and found plugin file is added to `signature` list if given"""
     plugins = {}
     if os.path.isdir(parentDirPath):
+        if signature is not None:
+            signature.append(get_path_signature(parentDirPath))
         for pluginDir in get_child_dirs(parentDirPath):
             pluginPath = os.path.join(parentDirPath, pluginDir)
             pluginFiles = [fn for fn in get_files(pluginPath) if fn.endswith(PLUGIN_FILE_EXTENSION)]
@@ -15,6 +46,9 @@ def read_plugins_from_directory(parentDirPath, ebabledByDefault = False, source
             if len(pluginFiles) > 1:
                 logging.warning("More then one plugin file in directory '" + str(pluginPath) + "', choosing '" + str(pluginFiles[0]) + "'")
             if pluginFiles:
+                if signature is not None:
+                    signature.append(get_path_signature(pluginPath))
+                    signature.extend(get_path_signature(os.path.join(pluginPath, pluginFile)) for pluginFile in pluginFiles)
                 pluginName = os.path.splitext(os.path.basename(pluginFiles[0]))[0]
                 plugins[pluginName] = { 'Path' : pluginFiles[0], 'Enabled' : ebabledByDefault }
                 if source:
@@ -22,7 +56,7 @@ def read_plugins_from_directory(parentDirPath, ebabledByDefault = False, source
                 if not is_valid_plugin_directory(pluginPath):
                     logging.warning("Plugin directory seems broken: " + str(pluginPath))
             else:
-                plugins = {**plugins, **read_plugins_from_directory(pluginPath, ebabledByDefault, source)}
+                plugins = {**plugins, **read_plugins_from_directory(pluginPath, ebabledByDefault, source, signature)}
     return plugins
 
 def is_valid_plugin_directory(pluginPath):
@@ -38,10 +38,20 @@ def get_project_file_path(projectPath):
     if fileName:
         return os.path.join(projectPath, fileName)
 
+# Project root directories found for paths, checked before use. Saves walking up the parent directories
+# in long-lived processes like uet daemon.
+ROOT_PATH_CACHE = {}
+
 def get_root_path_from_path(somePath):
-    currentPath = os.path.abspath(somePath)
+    startPath = os.path.abspath(somePath)
+    cachedRootPath = ROOT_PATH_CACHE.get(startPath)
+    if cachedRootPath and os.path.isdir(cachedRootPath) and is_valid_root_path(cachedRootPath):
+        return cachedRootPath
+
+    currentPath = startPath
     while True:
         if is_valid_root_path(currentPath):
+            ROOT_PATH_CACHE[startPath] = currentPath
             return currentPath
         prevPath = currentPath
         currentPath = os.path.abspath(os.path.join(currentPath, os.pardir))
@@ -4,6 +4,20 @@ import json
 import ue
 import common as cm
 
+# Engine installations by platform name, valid while installation config files are not changed.
+# Matters for long-lived processes like uet daemon, which would re-read and re-validate them for every request.
+ENGINE_INSTALLATIONS_CACHE = {}
+
+def get_files_signature(filePaths):
+    signature = []
+    for filePath in filePaths:
+        try:
+            fileStat = os.stat(filePath)
+            signature.append((filePath, fileStat.st_mtime_ns, fileStat.st_size))
+        except OSError:
+            signature.append((filePath, None, None))
+    return tuple(signature)
+
 # See in UE code:
 # FDesktopPlatformModule::EnumerateEngineInstallations()
 # FPlatformProcess::ApplicationSettingsDir()
@@ -20,11 +34,21 @@ class UePlatformBase:
         logging.error(f"{cm.get_func_name()} is NOT IMPLEMENTED for platform `{self.get_name()}`")
         return {}
 
+    def get_installations_config_file_paths(self):
+        return [self.get_launcher_installations_file_path()]
+
     def get_all_engine_installations(self):
+        signature = get_files_signature(self.get_installations_config_file_paths())
+        cached = ENGINE_INSTALLATIONS_CACHE.get(self.get_name())
+        if cached and cached[0] == signature:
+            logging.debug("All engine installations (cached): " + str(cached[1]))
+            return dict(cached[1])
+
         launcherEngineInstallations = self.get_launcher_engine_installations()
         sourceEngineInstallations = self.get_source_engine_installations()
         engineInstallations = {**launcherEngineInstallations, **sourceEngineInstallations}
         logging.debug("All engine installations: " + str(engineInstallations))
+        ENGINE_INSTALLATIONS_CACHE[self.get_name()] = (signature, dict(engineInstallations))
         return engineInstallations
 
     def read_launcher_installations(self):
@@ -68,3 +92,7 @@ class UePlatformBase:
 
     def get_default_build_platform(self):
         raise NotImplementedError(f"Default build platform is NOT IMPLEMENTED for platform `{self.get_name()}`")
+
+    def get_supported_build_platforms(self):
+        """Build platforms UBT can build for on this host"""
+        return [self.get_default_build_platform()]
@@ -25,12 +25,17 @@ class UePlatformUnix(UePlatformBase):
     def get_launcher_installations_file_path(self):
         return os.path.join(self.get_epic_settings_path(), UE_LAUNCHER_DIR_NAME, UE_LAUNCHER_CONFIG_NAME)
 
+    def get_source_installations_file_path(self):
+        return os.path.join(self.get_epic_settings_path(), UE_DIR_NAME, UE_CONFIG_NAME)
+
+    def get_installations_config_file_paths(self):
+        return [self.get_launcher_installations_file_path(), self.get_source_installations_file_path()]
+
     def get_source_engine_installations(self):
         engineInstallations = {}
         uniqueDirectories = []
 
-        epicConfigDir = self.get_epic_settings_path()
-        ueConfigPath = os.path.join(epicConfigDir, UE_DIR_NAME, UE_CONFIG_NAME)
+        ueConfigPath = self.get_source_installations_file_path()
         logging.debug("Config: " + str(ueConfigPath))
 
         config = configparser.ConfigParser()
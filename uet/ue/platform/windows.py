@@ -68,3 +68,7 @@ class UePlatformWindows(UePlatformBase):
 
     def get_default_build_platform(self):
         return "Win64"
+
+    def get_supported_build_platforms(self):
+        # Linux is built with cross-compile toolchain
+        return ["Win64", "Linux"]
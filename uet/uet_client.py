@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import array
+import socket
+import runpy
+
+# Thin client for uet commands: runs the command in uet daemon if it is running, in this process otherwise.
+# Usage: uet_client.py COMMAND SHELL_SOURCE [ARGS...]
+
+SOCKET_PATH_ENV = "UET_DAEMON_SOCKET"
+SOCKET_FILE_NAME = "uet-daemon.sock"
+INTERRUPT_MESSAGE = b"INT\n"
+SHUTDOWN_COMMAND = "shutdown"
+PING_COMMAND = "ping"
+
+COMMAND_SCRIPTS = {
+    "build": "build.py",
+    "build-history": "build_history.py",
+    "crash": "crash_triage.py",
+    "info": "info.py",
+    "status": "status.py",
+    "vl": "view_logs.py",
+}
+
+def get_socket_path():
+    socketPath = os.environ.get(SOCKET_PATH_ENV)
+    if socketPath:
+        return socketPath
+    runtimeDir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtimeDir and os.path.isdir(runtimeDir):
+        return os.path.join(runtimeDir, SOCKET_FILE_NAME)
+    return os.path.join("/tmp", f"uet-daemon-{os.getuid()}.sock")
+
+def get_script_path(command):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), COMMAND_SCRIPTS[command])
+
+def connect(socketPath=None):
+    """Connect to running daemon, None if there is no daemon"""
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socketPath or get_socket_path())
+    except OSError:
+        connection.close()
+        return None
+    return connection
+
+def is_running(socketPath=None):
+    connection = connect(socketPath)
+    if connection is None:
+        return False
+    connection.close()
+    return True
+
+def send_request(connection, request, fds=()):
+    """Send json request line, file descriptors are passed with it as SCM_RIGHTS ancillary data"""
+    data = (json.dumps(request) + '\n').encode('utf-8')
+    ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))] if fds else []
+    sent = connection.sendmsg([data], ancillary)
+    if sent < len(data):
+        connection.sendall(data[sent:])
+
+def read_response(connection):
+    """Read json response line sent by daemon, None if connection was closed before it"""
+    data = b''
+    while not data.endswith(b'\n'):
+        chunk = connection.recv(4096)
+        if not chunk:
+            return None
+        data += chunk
+    return json.loads(data.decode('utf-8'))
+
+def run_in_daemon(command, args):
+    """Return exit code of the command run by daemon, None if daemon is not available"""
+    connection = connect()
+    if connection is None:
+        return None
+
+    with connection:
+        request = {'command': command, 'args': args, 'cwd': os.getcwd(), 'env': dict(os.environ)}
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            send_request(connection, request, [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()])
+        except OSError:
+            return None
+
+        while True:
+            try:
+                response = read_response(connection)
+                return response.get('exit_code', 1) if response else 1
+            except KeyboardInterrupt:
+                # Terminal interrupts only this process, pass it to the command
+                connection.sendall(INTERRUPT_MESSAGE)
+
+def run_in_process(command, args):
+    scriptPath = get_script_path(command)
+    sys.argv = [scriptPath] + args
+    try:
+        runpy.run_path(scriptPath, run_name='__main__')
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMAND_SCRIPTS:
+        print(f"Usage: {os.path.basename(__file__)} {{{'|'.join(sorted(COMMAND_SCRIPTS))}}} SHELL_SOURCE [ARGS...]")
+        return 2
+
+    command, args = sys.argv[1], sys.argv[2:]
+    exitCode = run_in_daemon(command, args)
+    if exitCode is None:
+        exitCode = run_in_process(command, args)
+    return exitCode
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+import os
+import sys
+import json
+import time
+import array
+import signal
+import queue
+import socket
+import runpy
+import logging
+import threading
+import traceback
+from argparse import ArgumentParser
+import common as cm
+import ue
+import uet_client as uc
+
+# Long-lived local daemon keeping project, engine and plugin discovery warm for uet commands.
+# Every request is run in a forked child, so the command gets the warm state of the daemon,
+# but never changes it, and output goes straight to the file descriptors passed by the client.
+
+LOG_FILE_NAME = "uet-daemon.log"
+MAX_REQUEST_SIZE = 1024 * 1024
+MAX_PASSED_FDS = 3
+ACCEPT_TIMEOUT = 1.0
+REQUEST_TIMEOUT = 5.0
+
+def receive_request(connection):
+    """Read json request line and file descriptors passed with it"""
+    data = b''
+    fds = array.array('i')
+    while not data.endswith(b'\n'):
+        chunk, ancillary, flags, address = connection.recvmsg(65536, socket.CMSG_SPACE(MAX_PASSED_FDS * fds.itemsize))
+        for level, messageType, messageData in ancillary:
+            if level == socket.SOL_SOCKET and messageType == socket.SCM_RIGHTS:
+                fds.frombytes(messageData[:len(messageData) - (len(messageData) % fds.itemsize)])
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_REQUEST_SIZE:
+            break
+    try:
+        request = json.loads(data.decode('utf-8'))
+    except ValueError:
+        request = None
+    return request, list(fds)
+
+def warm(cwd):
+    """Fill discovery caches of this process for the directory, children forked later inherit them"""
+    try:
+        context = ue.context.get_context_interface(cwd)
+        if isinstance(context, (ue.context.UeContextProject, ue.context.UeContextEngine)):
+            context.get_all_plugins()
+    except Exception as e:
+        logging.debug(f"Unable to warm state for '{cwd}': {e}")
+
+def interrupt_on_message(connection):
+    """Turn client messages into SIGINT for this process, client disconnect means interruption too"""
+    try:
+        while True:
+            data = connection.recv(64)
+            if data.startswith(uc.INTERRUPT_MESSAGE) or not data:
+                os.kill(os.getpid(), signal.SIGINT)
+                if not data:
+                    return
+    except OSError:
+        pass
+
+def run_request(connection, request, fds):
+    """Run the command in forked child, return its exit code"""
+    stdinFd, stdoutFd, stderrFd = fds
+    os.dup2(stdinFd, 0)
+    os.dup2(stdoutFd, 1)
+    os.dup2(stderrFd, 2)
+    for fd in fds:
+        os.close(fd)
+
+    # Daemon output goes to its log file, so streams were block buffered, command output should appear live
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.stderr.reconfigure(line_buffering=True)
+
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request.get('env', {}))
+    # Command configures logging itself
+    logging.root.handlers = []
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    threading.Thread(target=interrupt_on_message, args=(connection,), daemon=True).start()
+
+    scriptPath = uc.get_script_path(request['command'])
+    sys.argv = [scriptPath] + list(request.get('args', []))
+    exitCode = 0
+    try:
+        runpy.run_path(scriptPath, run_name='__main__')
+    except SystemExit as e:
+        exitCode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        # Same output as uncaught exception of standalone command
+        traceback.print_exc()
+        exitCode = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return exitCode
+
+class UetDaemon:
+    def __init__(self, socketPath, warmPaths=()):
+        self.socketPath = socketPath
+        self.children = set()
+        # Directories warmed in background, the daemon start directory first, then directories of requests
+        self.warmQueue = queue.Queue()
+        for warmPath in warmPaths:
+            self.warmQueue.put(warmPath)
+
+    def warm_requested(self):
+        while True:
+            cwd = self.warmQueue.get()
+            try:
+                warm(cwd)
+            finally:
+                self.warmQueue.task_done()
+
+    def serve(self):
+        if os.path.exists(self.socketPath):
+            if uc.is_running(self.socketPath):
+                logging.error(f"uet daemon is already running on {self.socketPath}")
+                return 1
+            os.remove(self.socketPath)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socketPath)
+        os.chmod(self.socketPath, 0o600)
+        server.listen(16)
+        server.settimeout(ACCEPT_TIMEOUT)
+        logging.info(f"uet daemon is listening on {self.socketPath}")
+        threading.Thread(target=self.warm_requested, daemon=True).start()
+
+        try:
+            while self.serve_one(server):
+                pass
+        finally:
+            server.close()
+            if os.path.exists(self.socketPath):
+                os.remove(self.socketPath)
+        return 0
+
+    def serve_one(self, server):
+        """Handle one connection, return False when daemon should stop"""
+        self.reap_children()
+        try:
+            connection, _ = server.accept()
+        except socket.timeout:
+            return True
+        connection.settimeout(REQUEST_TIMEOUT)
+        try:
+            request, fds = receive_request(connection)
+        except OSError as e:
+            logging.warning(f"Unable to read request: {e}")
+            connection.close()
+            return True
+        connection.settimeout(None)
+        if not request or request.get('command') not in uc.COMMAND_SCRIPTS or len(fds) != MAX_PASSED_FDS:
+            isShutdown = request and request.get('command') == uc.SHUTDOWN_COMMAND
+            if request and request.get('command') in (uc.SHUTDOWN_COMMAND, uc.PING_COMMAND):
+                connection.sendall((json.dumps({'exit_code': 0, 'pid': os.getpid()}) + '\n').encode('utf-8'))
+            for fd in fds:
+                os.close(fd)
+            connection.close()
+            if isShutdown:
+                logging.info("uet daemon is stopped by request")
+                return False
+            return True
+
+        logging.info(f"Request {request['command']} {request.get('args')} in '{request['cwd']}'")
+        self.warmQueue.put(request['cwd'])
+        # Child must not be forked while warming holds logging or import locks, it gets the filled caches instead
+        self.warmQueue.join()
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            exitCode = 1
+            try:
+                server.close()
+                exitCode = run_request(connection, request, fds)
+                # Client disconnects after the response, which must not interrupt the exiting child
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                connection.sendall((json.dumps({'exit_code': exitCode}) + '\n').encode('utf-8'))
+            except BaseException:
+                pass
+            finally:
+                os._exit(exitCode)
+
+        self.children.add(pid)
+        for fd in fds:
+            os.close(fd)
+        connection.close()
+        return True
+
+    def reap_children(self):
+        for pid in list(self.children):
+            try:
+                finishedPid, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                finishedPid = pid
+            if finishedPid:
+                self.children.discard(pid)
+
+def get_log_file_path():
+    return os.path.join(os.path.expanduser("~"), ".cache", "uet", LOG_FILE_NAME)
+
+def start(socketPath):
+    """Start daemon in background, detached from terminal"""
+    if uc.is_running(socketPath):
+        logging.info(f"uet daemon is already running on {socketPath}")
+        return 0
+
+    logFilePath = get_log_file_path()
+    os.makedirs(os.path.dirname(logFilePath), exist_ok=True)
+    if os.fork() > 0:
+        # Wait for the socket, so commands called right after start already use the daemon
+        for _ in range(50):
+            if uc.is_running(socketPath):
+                logging.info(f"uet daemon is started on {socketPath}, log: {logFilePath}")
+                return 0
+            time.sleep(0.1)
+        logging.error(f"uet daemon did not start, see {logFilePath}")
+        return 1
+
+    os.setsid()
+    if os.fork() > 0:
+        os._exit(0)
+
+    devNull = os.open(os.devnull, os.O_RDWR)
+    logFd = os.open(logFilePath, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    os.dup2(devNull, 0)
+    os.dup2(logFd, 1)
+    os.dup2(logFd, 2)
+    startPath = os.getcwd()
+    os.chdir("/")
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    os._exit(UetDaemon(socketPath, [startPath]).serve())
+
+def stop(socketPath):
+    connection = uc.connect(socketPath)
+    if connection is None:
+        logging.info("uet daemon is not running")
+        return 0
+    with connection:
+        uc.send_request(connection, {'command': uc.SHUTDOWN_COMMAND})
+        uc.read_response(connection)
+    logging.info("uet daemon is stopped")
+    return 0
+
+def status(socketPath):
+    connection = uc.connect(socketPath)
+    if connection is None:
+        logging.info("uet daemon is not running")
+        return 1
+    with connection:
+        uc.send_request(connection, {'command': uc.PING_COMMAND})
+        response = uc.read_response(connection) or {}
+    logging.info(f"uet daemon is running on {socketPath}, pid {response.get('pid')}")
+    return 0
+
+class DaemonControl:
+    def run(self):
+        settings = self.process_args()
+        if not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'fork'):
+            logging.error("uet daemon is supported only on Unix-like systems")
+            return 1
+
+        socketPath = settings.socket or uc.get_socket_path()
+        if settings.action == "start":
+            return start(socketPath)
+        elif settings.action == "stop":
+            return stop(socketPath)
+        elif settings.action == "status":
+            return status(socketPath)
+        return UetDaemon(socketPath, [os.getcwd()]).serve()
+
+    def process_args(self):
+        parser = ArgumentParser()
+        cm.init_arg_parser(parser)
+        parser.add_argument("action", choices=["start", "stop", "status", "serve"],
+                            help="start daemon in background, stop it, check whether it runs or serve in foreground")
+        parser.add_argument("--socket", dest="socket",
+                            help=f"daemon socket path, default is ${uc.SOCKET_PATH_ENV} or {uc.get_socket_path()}",
+                            metavar="SOCKET")
+
+        parsedArgs = parser.parse_args()
+        self.onlyDebug = cm.process_parsed_args(parsedArgs)
+
+        logging.debug("Parsing arguments: '" + ' '.join(sys.argv[1:]) + "'")
+        logging.debug("Result is: " + str(parsedArgs))
+        return parsedArgs
+
+def main():
+    daemonControl = DaemonControl()
+    return daemonControl.run()
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print('Interrupted by user')
+        try:
+            sys.exit(0)
+        except SystemExit:
+            os._exit(0)
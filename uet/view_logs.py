@@ -1,19 +1,29 @@
 import re
+import io
 import os
 import sys
-from time import gmtime, strftime
 import subprocess as sp
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 import logging
 import common as cm
 import ue
+import log_filter as lf
+import log_follow
+import log_parse as lp
+import log_index as li
+import log_stats as ls
+import log_search
+import log_cache as lc
+import log_archive as la
+import log_diff as ld
+import log_perf
+import log_rule_profile as lrp
 
 cm.add_parent_dir_to_sys_path(__file__)
 import config as cfg
 
 
 LOG_EXTENSION = ".log"
-ProcessedLogLabel = "_processed"
 
 
 def get_log_path_from_dir(somePath):
@@ -29,7 +39,7 @@ def get_log_path_from_dir(somePath):
         buildRootPath = ue.path.build.get_root_path_from_path(somePath)
         if buildRootPath:
             logging.debug("Found UE build root directory, using it '" + buildRootPath + "'")
-            projectName = ue.project.split_build_name(ue.path.build.build.get_name_from_path(buildRootPath))[0]
+            projectName = ue.project.split_build_name(ue.path.build.get_name_from_path(buildRootPath))[0]
             logsPath = ue.path.build.get_logs_path(buildRootPath, projectName)
 
     if projectName is not None:
@@ -93,28 +103,125 @@ def filter_remove_lines_with(someText):
 def filter_remove_data_before_category(logCategory):
     return filter_rule_to_config('.*' + logCategory + ': ', logCategory + ': ', re.M)
 
-def process_log_file(FilePath):
-    with open (FilePath, 'r' ) as f:
-        content = f.read()
-
+def get_filter_rules():
+    """Compiled ViewLogs.FILTER_RULES from config"""
+    rules = []
     try:
         for rule in cfg.ViewLogs.FILTER_RULES:
             pattern, repl, flags = filter_rule_from_config(rule)
-            content = apply_rule(pattern, repl, content, flags = flags)
-    except AttributeError:
+            logging.info("Changing " + "%r"%pattern + " to " + "%r"%repl + "")
+            rules.append(lf.compile_rule(pattern, repl, flags))
+    except (AttributeError, KeyError, TypeError, re.error):
         logging.warning("Error when applying rules. Wrong ViewLogs.FILTER_RULES in config?")
+    return rules
+
+def filter_log_file(filePath, outFile, logFilter=None):
+    """Write filtered log to `outFile` as it is read, line by line when rules allow it"""
+    if logFilter is None:
+        logFilter = lf.LogFilter(get_filter_rules())
+    with la.open_log(filePath, 'r') as f:
+        logFilter.filter_file(f, outFile)
+
+def get_bytes_filter(logFilter):
+    """Filter for log mapped to memory, None when rules need decoded text"""
+    if not logFilter.is_streaming():
+        logging.warning("Not all rules are line local, log is not mapped to memory")
+        return None
+    bytesFilter = logFilter.to_bytes()
+    if bytesFilter is None:
+        logging.warning("Some rules depend on Unicode text, log is not mapped to memory")
+    return bytesFilter
+
+def get_jobs(logFilter, jobs):
+    """Number of processes filtering parts of the log, only line local rules can be applied to parts"""
+    if jobs > 1 and not logFilter.is_streaming():
+        logging.warning("Not all rules are line local, log is filtered in one process")
+        return 1
+    return jobs
+
+def write_filtered_log(filePath, outFile, logFilter, jobs=1):
+    """Write filtered log to `outFile`, binary one for bytes filter"""
+    if jobs > 1:
+        logFilter.filter_file_parallel(filePath, outFile, jobs)
+    elif logFilter.isBytes:
+        logFilter.filter_mapped_file(filePath, outFile)
+    else:
+        filter_log_file(filePath, outFile, logFilter)
 
-    return content
-
-def save_processed_log(processedLogContents, savePath):
-    if processedLogContents is not None:
-        fileName = "_Processed_" + strftime("%Y.%m.%d-%H.%M.%S", gmtime()) + ".log"
-        filePath = os.path.join(savePath, fileName)
-        print ("Saving log to '" + filePath + "'")
+def filter_log_to_path(filePath, outFilePath, logFilter, jobs=1):
+    with open(outFilePath, 'wb' if logFilter.isBytes else 'w') as f:
+        write_filtered_log(filePath, f, logFilter, jobs)
 
-        with open (filePath, 'w' ) as f:
-            f.write(processedLogContents)
-        return filePath
+def process_log_file(FilePath):
+    content = io.StringIO()
+    filter_log_file(FilePath, content)
+    return content.getvalue()
+
+def follow_log(filePath, logFilter, fromStart=False):
+    """Print filtered lines appended to the log until interrupted"""
+    if not logFilter.is_streaming():
+        logging.warning("Not all rules are line local, following log applies them to every line separately")
+
+    def print_line(line):
+        filteredLine = logFilter.filter_line(line)
+        if filteredLine:
+            sys.stdout.write(filteredLine)
+
+    logging.info("Following log, press Ctrl+C to stop")
+    log_follow.LogFollower(filePath, print_line, fromStart).run(outFile=sys.stdout)
+
+def get_time_arg(text, referenceTime):
+    if text is None:
+        return None
+    seconds = lp.parse_time(text, referenceTime)
+    if seconds is None:
+        logging.error(f"Unknown time '{text}', use HH:MM[:SS] or {lp.TIME_FORMAT.replace('%', '')}")
+    return seconds
+
+def query_log(filePath, categories=None, verbosities=None, since=None, until=None):
+    """Update index of the log and print lines matching the query, time of day is on the day the log starts"""
+    logIndex = li.LogIndex(filePath)
+    logging.debug(f"Indexed {logIndex.update()} new lines")
+    firstTime = logIndex.get_first_time()
+    sinceTime = get_time_arg(since, firstTime)
+    untilTime = get_time_arg(until, firstTime)
+    if (since and sinceTime is None) or (until and untilTime is None):
+        return False
+    for line in logIndex.query(categories, verbosities, sinceTime, untilTime):
+        sys.stdout.write(line)
+    return True
+
+def print_index_summary(filePath):
+    logIndex = li.LogIndex(filePath)
+    logIndex.update()
+    for key in (li.CATEGORY_KEY, li.VERBOSITY_KEY):
+        counts = logIndex.get_counts(key)
+        print(f"{key.capitalize()}:")
+        for name, count in sorted(counts.items(), key=lambda item: item[1], reverse=True):
+            print(f"\t{name}: {count}")
+
+def search_logs(filePath, pattern, jobs):
+    """Print lines matching the pattern from all logs in the directory of the log, including rotated and compressed ones"""
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        logging.error(f"Invalid search pattern '{pattern}': {e}")
+        return
+    logsPath = os.path.dirname(filePath)
+    filePaths = log_search.get_log_files(logsPath)
+    logging.info(f"Searching {len(filePaths)} logs in '{logsPath}'")
+    for line in log_search.search_logs(filePaths, pattern, jobs=jobs):
+        sys.stdout.write(line)
+
+def diff_logs(filePaths, jobs):
+    """Print report of messages which differ between two runs, return exit code 1 when they differ like `diff` does"""
+    for filePath in filePaths:
+        if not os.path.isfile(filePath):
+            logging.error(f"Log file does not exist '{filePath}'")
+            return 2
+    diff = ld.diff_logs(*filePaths, lf.LogFilter(get_filter_rules()), jobs)
+    ld.print_diff(diff, *(os.path.basename(filePath) for filePath in filePaths))
+    return 0 if diff.is_empty() else 1
 
 def get_log_editor_path():
     try:
@@ -132,21 +239,93 @@ def get_log_editor_path():
 class LogViewer:
     def run(self):
         filePath = self.init()
+        if self.settings.diff:
+            return diff_logs(self.settings.diff, self.settings.jobs or 2)
         if filePath:
-            processedFileContents = process_log_file(filePath)
+            logFilter = lf.LogFilter(get_filter_rules())
+            if self.settings.archive:
+                la.archive_logs(os.path.dirname(filePath), self.settings.jobs)
+                return
+            if self.settings.follow:
+                follow_log(filePath, logFilter, self.settings.fromStart)
+                return
+            isCompressed = la.is_compressed(filePath)
+            if self.settings.perfReport:
+                try:
+                    log_perf.print_perf_report(log_perf.collect_perf_report(filePath))
+                    sys.stdout.flush()
+                except BrokenPipeError:
+                    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                return
+            if self.settings.profileRules:
+                try:
+                    lrp.print_rule_profile(lrp.collect_rule_profile(filePath, logFilter.rules))
+                    sys.stdout.flush()
+                except BrokenPipeError:
+                    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                return
+            if isCompressed and (self.settings.index or self.settings.stats or self.is_query()):
+                logging.error("Index, stats and queries need uncompressed log, use --search for compressed ones")
+                return
+            if self.settings.search or self.settings.index or self.settings.stats or self.is_query():
+                try:
+                    if self.settings.search:
+                        search_logs(filePath, self.settings.search, self.settings.jobs or os.cpu_count() or 1)
+                    elif self.settings.stats:
+                        ls.print_stats(ls.collect_stats(filePath, self.settings.jobs or os.cpu_count() or 1))
+                    elif self.settings.index:
+                        print_index_summary(filePath)
+                    else:
+                        query_log(filePath, self.settings.categories, self.settings.verbosities, self.settings.since, self.settings.until)
+                    sys.stdout.flush()
+                except BrokenPipeError:
+                    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                return
+            jobs = get_jobs(logFilter, self.settings.jobs or 1)
+            if isCompressed:
+                if self.settings.mmap or jobs > 1:
+                    logging.warning("Compressed log is filtered as it is decompressed, without --mmap and --jobs")
+                jobs = 1
+            elif self.settings.mmap:
+                logFilter = get_bytes_filter(logFilter) or logFilter
+            if self.settings.stdout:
+                self.print_processed_log(filePath, logFilter, jobs)
+                return
+
             logEditorPath = get_log_editor_path()
-            if not self.onlyDebug:
-                processedFilePath = save_processed_log(processedFileContents, os.path.dirname(filePath))
+            if self.onlyDebug:
+                filter_log_to_path(filePath, os.devnull, logFilter, jobs)
+            else:
+                processedFilePath = lc.ProcessedLogCache(filePath, logFilter, compressOutput=self.settings.compressOutput).update(jobs)
+                print ("Processed log is saved to '" + processedFilePath + "'")
                 if logEditorPath:
                     sp.Popen([logEditorPath, processedFilePath])
                 else:
                     logging.info("Unable to run editor.")
 
+    def print_processed_log(self, filePath, logFilter, jobs=1):
+        try:
+            sys.stdout.flush()
+            write_filtered_log(filePath, sys.stdout.buffer if logFilter.isBytes else sys.stdout, logFilter, jobs)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Reader like `head` is done, nothing to report
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+    def is_query(self):
+        settings = self.settings
+        return bool(settings.categories or settings.verbosities or settings.since or settings.until)
+
     def init(self):
         sourcePath = self.process_args()
         logging.debug("SourcePath: " + str(sourcePath))
+        # Compared logs are given explicitly
+        if self.settings.diff:
+            return None
         filePath = get_log_path(sourcePath)
-        if filePath and os.path.isfile(filePath):
+        # Followed log may be created later by starting game or editor, rotated logs are searched and archived without current one
+        isDirectoryMode = (self.settings.search or self.settings.archive) and os.path.isdir(os.path.dirname(filePath or ""))
+        if filePath and (os.path.isfile(filePath) or self.settings.follow or isDirectoryMode):
             return filePath
 
     def process_args(self):
@@ -157,9 +336,68 @@ class LogViewer:
         parser.add_argument("-s", "--source", dest="source",
                             help="directory inside of UE project or build, set by user, overrides value of 'shellsource' aurgument",
                             metavar="SOURCE")
+        parser.add_argument("-o", "--stdout",
+                            action="store_true", dest="stdout", default=False,
+                            help="print processed log as it is filtered instead of saving it and opening editor")
+        parser.add_argument("-f", "--follow",
+                            action="store_true", dest="follow", default=False,
+                            help="print filtered lines as they are appended to the log, follow rotated log")
+        parser.add_argument("--from-start",
+                            action="store_true", dest="fromStart", default=False,
+                            help="with --follow, print the whole log before following it")
+        parser.add_argument("--mmap",
+                            action="store_true", dest="mmap", default=False,
+                            help="map big log to memory and filter its bytes without decoding, keeps line endings as they are")
+        parser.add_argument("-j", "--jobs", dest="jobs", type=int,
+                            help="number of processes filtering parts of big log in parallel, 1 by default, "
+                                 "all cores for --search and --stats",
+                            metavar="JOBS")
+        parser.add_argument("--search", dest="search",
+                            help="print lines matching regular expression from all logs in the log directory, "
+                                 "including rotated and gzip compressed ones, merged by time",
+                            metavar="PATTERN")
+        parser.add_argument("--archive",
+                            action="store_true", dest="archive", default=False,
+                            help="compress rotated logs in the log directory with zstd when 'zstandard' package is "
+                                 "installed or gzip otherwise, compressed logs are read by all other modes")
+        parser.add_argument("--diff", dest="diff", nargs=2,
+                            help="print messages new in log B, vanished from log A and ones with changed frequency, "
+                                 "ignoring time, frames, numbers and addresses, exit code is 1 when logs differ",
+                            metavar=("A", "B"))
+        parser.add_argument("--perf-report",
+                            action="store_true", dest="perfReport", default=False,
+                            help="print frame time percentiles, hitches by category and worst frames with lines around them, "
+                                 "frame times come from 'stat unit' values or are estimated from line prefixes")
+        parser.add_argument("--profile-rules",
+                            action="store_true", dest="profileRules", default=False,
+                            help="filter the log without saving it and print time, match count and removed lines of every "
+                                 "rule of ViewLogs.FILTER_RULES, warn about rules which never match or backtrack a lot")
+        parser.add_argument("--compress-output",
+                            action="store_true", dest="compressOutput", default=False,
+                            help="write processed log compressed with gzip")
+
+        parser.add_argument("--index",
+                            action="store_true", dest="index", default=False,
+                            help=f"update log index stored next to it as <log>{li.INDEX_EXTENSION} and print line counts")
+        parser.add_argument("--stats",
+                            action="store_true", dest="stats", default=False,
+                            help="print line and byte counts by category and verbosity, line rates and top message templates")
+        parser.add_argument("--category", dest="categories", action="append",
+                            help="print only lines of the category found with log index, can be repeated",
+                            metavar="CATEGORY")
+        parser.add_argument("--verbosity", dest="verbosities", action="append", type=get_verbosity_arg,
+                            help=f"print only lines with the verbosity, can be repeated, one of: {', '.join(lp.VERBOSITIES)}",
+                            metavar="VERBOSITY")
+        parser.add_argument("--since", dest="since",
+                            help="print only lines written since the time, HH:MM[:SS] means the day the log starts",
+                            metavar="TIME")
+        parser.add_argument("--until", dest="until",
+                            help="print only lines written until the time, same format as --since",
+                            metavar="TIME")
 
         parsedArgs = parser.parse_args()
         self.onlyDebug = cm.process_parsed_args(parsedArgs)
+        self.settings = parsedArgs
 
         logging.debug("Parsing arguments: '" + ' '.join(sys.argv[1:]) + "'")
         logging.debug("Result is: " + str(parsedArgs))
@@ -169,15 +407,21 @@ class LogViewer:
 
         return parsedArgs.source
 
+def get_verbosity_arg(text):
+    verbosity = lp.normalize_verbosity(text)
+    if verbosity is None:
+        raise ArgumentTypeError(f"unknown verbosity '{text}'")
+    return verbosity
+
 def main():
     print("View logs for Unreal Engine")
     logViewer = LogViewer()
-    logViewer.run()
+    return logViewer.run()
 
 
 if __name__ == '__main__':
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt:
         print('Interrupted by user')
         try:
@@ -5,4 +5,4 @@ BASEDIR=$(dirname "$0")
 #echo "$PWD"
 
 #View logs for Unreal Engine script
-python3 "$BASEDIR/uet/view_logs.py" "$PWD" "$@"
+python3 "$BASEDIR/uet/uet_client.py" vl "$PWD" "$@"